@@ -24,7 +24,55 @@ class Settings(BaseSettings):
     
     # File Configuration
     upload_dir: str = "./uploads"
-    template_dir: str = "./templates"
+    template_dir: str = "./templates"  # Bank-specific RTGS form templates (*.json)
+    template_reload_interval: float = 2.0  # Seconds between checks for changed templates
+    pdf_cache_dir: str = "./pdf_cache"
+    pdf_bulk_max_forms: int = 500
+    pdf_fast_text: bool = True  # Draw one-line form values without Paragraph layout
+    pdf_compact_output: bool = True  # Deterministic, compressed PDFs without ASCII85 streams
+    # Fill this blank copy of the bank's official form instead of drawing the
+    # built-in layout (needs pypdf); field coordinates default to OVERLAY_FIELDS
+    pdf_overlay_form: str = ""
+    pdf_overlay_fields: str = ""
+    pdf_prerender: bool = False  # Render a transaction's PDF in the background when it is created
+    pdf_precompress: bool = False  # Keep a .gz copy of stored PDFs for nginx gzip_static
+    
+    # Let nginx send stored files: downloads return an X-Accel-Redirect to
+    # <accel_redirect_prefix>/{pdf_cache,pdf_jobs,uploads}/ (see frontend/nginx.conf)
+    accel_redirect: bool = False
+    accel_redirect_prefix: str = "/_protected"
+    
+    # PDF rendering pool (0 workers renders in-process on a thread)
+    pdf_pool_workers: int = 2
+    pdf_pool_max_pending: int = 16
+    pdf_pool_queue_timeout: float = 5.0
+    pdf_render_timeout: float = 30.0
+    
+    # Per-stage PDF timing: Server-Timing headers and histograms (and logs)
+    pdf_timing_enabled: bool = False
+    pdf_timing_log: bool = False
+    
+    # Background PDF jobs (0 workers when a separate worker process runs them)
+    pdf_job_dir: str = "./pdf_jobs"
+    pdf_job_workers: int = 1
+    pdf_job_max_forms: int = 10000
+    pdf_job_max_attempts: int = 3
+    pdf_job_retry_delay: float = 10.0
+    pdf_job_poll_interval: float = 1.0
+    pdf_job_lease_seconds: int = 300
+    pdf_job_ttl_hours: int = 24
+    
+    # Where job artifacts are stored: "local" (sharded under pdf_job_dir) or
+    # "s3" (an S3-compatible bucket, needs boto3). Retention limits of 0 keep
+    # everything; the age limit should not be below pdf_job_ttl_hours.
+    artifact_storage: str = "local"
+    artifact_s3_bucket: str = ""
+    artifact_s3_prefix: str = "rtgs/artifacts"
+    artifact_s3_endpoint_url: str = ""  # e.g. a MinIO server
+    artifact_max_bytes: int = 0
+    artifact_max_age_hours: int = 48
+    pdf_cache_max_bytes: int = 0
+    pdf_cache_max_age_hours: int = 0
     
     # Security Configuration
     allowed_hosts: List[str] = ["localhost", "127.0.0.1"]
@@ -22,6 +22,13 @@ def get_db():
         db.close()
 
 
-def create_tables():
-    """Create all tables"""
-    Base.metadata.create_all(bind=engine)
+def create_tables(bind=None):
+    """Create all tables, bring existing ones up to date and set up the search index"""
+    from .migrations import run_migrations
+    from .services.search import install_search_index
+
+    bind = bind or engine
+    Base.metadata.create_all(bind=bind)
+    run_migrations(bind)
+    with bind.begin() as conn:
+        install_search_index(conn)
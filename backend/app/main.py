@@ -5,9 +5,14 @@ import os
 
 from .config import settings
 from .database import create_tables
+from .services.pdf_pool import get_render_pool
+from .services.pdf_jobs import get_job_queue
+from .services.pdf_timing import PdfTimingMiddleware
 # Create uploads directory if it doesn't exist
 os.makedirs(settings.upload_dir, exist_ok=True)
 os.makedirs(settings.template_dir, exist_ok=True)
+os.makedirs(settings.pdf_cache_dir, exist_ok=True)
+os.makedirs(settings.pdf_job_dir, exist_ok=True)
 
 app = FastAPI(
     title=settings.app_name,
@@ -23,8 +28,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Next-Cursor"],
 )
 
+# Per-stage timing of PDF requests (enabled with PDF_TIMING_ENABLED)
+app.add_middleware(PdfTimingMiddleware, prefix="/api/pdf")
+
 # Mount static files
 app.mount("/uploads", StaticFiles(directory=settings.upload_dir), name="uploads")
 
@@ -44,8 +53,16 @@ app.include_router(remitter_router, prefix="/api/remitter", tags=["remitter"])
 
 @app.on_event("startup")
 async def startup_event():
-    """Create database tables on startup"""
+    """Create database tables, warm up the PDF render pool and start the job workers"""
     create_tables()
+    get_render_pool().start()
+    get_job_queue().start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    get_job_queue().stop()
+    get_render_pool().shutdown()
 
 
 @app.get("/")
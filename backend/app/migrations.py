@@ -0,0 +1,75 @@
+"""
+Schema changes for existing databases.
+
+``create_all`` only creates missing tables, so changes to tables that
+already exist are applied here. Each migration checks the live schema and
+does nothing when it is already applied, so they run on every startup.
+"""
+import logging
+
+from sqlalchemy import inspect, text
+
+logger = logging.getLogger(__name__)
+
+
+def _columns(conn, table):
+    return {column["name"] for column in inspect(conn).get_columns(table)}
+
+
+def amounts_to_paise(conn):
+    """Move transactions.amount (REAL rupees) to transactions.amount_paise (integer paise)"""
+    columns = _columns(conn, "transactions")
+    if "amount" not in columns:
+        return False
+    if "amount_paise" not in columns:
+        conn.execute(text("ALTER TABLE transactions ADD COLUMN amount_paise BIGINT NOT NULL DEFAULT 0"))
+    conn.execute(text("UPDATE transactions SET amount_paise = CAST(ROUND(amount * 100) AS BIGINT)"))
+    conn.execute(text("ALTER TABLE transactions DROP COLUMN amount"))
+    return True
+
+
+def _create_index(conn, table, name, columns):
+    if name in {index["name"] for index in inspect(conn).get_indexes(table)}:
+        return False
+    conn.execute(text(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"))
+    return True
+
+
+def transactions_user_date_index(conn):
+    """Index transactions by (user_id, transaction_date) for date-range history queries"""
+    return _create_index(conn, "transactions", "ix_transactions_user_date", ("user_id", "transaction_date"))
+
+
+def transactions_sort_indexes(conn):
+    """Index transactions for history sorted by amount and filtered by beneficiary"""
+    created = _create_index(conn, "transactions", "ix_transactions_user_amount", ("user_id", "amount_paise"))
+    return _create_index(
+        conn, "transactions", "ix_transactions_user_beneficiary_date", ("user_id", "beneficiary_id", "transaction_date")
+    ) or created
+
+
+# Applied in order
+MIGRATIONS = [
+    amounts_to_paise,
+    transactions_user_date_index,
+    transactions_sort_indexes,
+]
+
+
+def run_migrations(engine):
+    """Apply pending migrations; returns the names of those that changed the schema"""
+    applied = []
+    for migration in MIGRATIONS:
+        with engine.begin() as conn:
+            if migration(conn):
+                applied.append(migration.__name__)
+                logger.info("Applied migration %s", migration.__name__)
+    return applied
+
+
+if __name__ == "__main__":
+    # Apply migrations without starting the API: python -m app.migrations
+    from .database import engine
+
+    logging.basicConfig(level=logging.INFO)
+    print(", ".join(run_migrations(engine)) or "Nothing to migrate")
@@ -2,5 +2,6 @@ from .user import User
 from .remitter import Remitter
 from .beneficiary import Beneficiary
 from .transaction import Transaction
+from .pdf_job import PdfJob
 
-__all__ = ["User", "Remitter", "Beneficiary", "Transaction"]
\ No newline at end of file
+__all__ = ["User", "Remitter", "Beneficiary", "Transaction", "PdfJob"]
\ No newline at end of file
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from ..database import Base
+
+
+class PdfJob(Base):
+    __tablename__ = "pdf_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    kind = Column(String(50), nullable=False)
+    params = Column(Text, nullable=False)  # JSON encoded job parameters
+
+    # Lifecycle: queued -> running -> succeeded | failed (running -> queued on retry)
+    status = Column(String(20), nullable=False, default="queued", index=True)
+    progress = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    error = Column(Text)
+    result_path = Column(String(500))  # Artifact storage key of the finished PDF
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # Earliest (re)try time
+
+    # Audit fields
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    expires_at = Column(DateTime)  # Artifact and job are removed after this
+
+    # Relationships
+    user = relationship("User")
+
+    def __repr__(self):
+        return f"<PdfJob(id={self.id}, kind='{self.kind}', status='{self.status}')>"
@@ -1,18 +1,26 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Text
+from sqlalchemy import BigInteger, Column, Index, Integer, String, DateTime, ForeignKey, Text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..database import Base
+from ..utils.amount_to_words import from_paise, to_paise
 
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # History, statements and the dashboard select a user's transactions by date
+        Index("ix_transactions_user_date", "user_id", "transaction_date"),
+        # History sorted by amount, and one beneficiary's history by date
+        Index("ix_transactions_user_amount", "user_id", "amount_paise"),
+        Index("ix_transactions_user_beneficiary_date", "user_id", "beneficiary_id", "transaction_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     beneficiary_id = Column(Integer, ForeignKey("beneficiaries.id"), nullable=False)
     
     # Transaction details
-    amount = Column(Float, nullable=False)
+    amount_paise = Column(BigInteger, nullable=False)  # Exact amount; sum and compare this in SQL
     amount_in_words = Column(Text, nullable=False)
     cheque_number = Column(String(50))
     transaction_date = Column(DateTime, nullable=False)
@@ -31,5 +39,14 @@ class Transaction(Base):
     user = relationship("User", back_populates="transactions")
     beneficiary = relationship("Beneficiary", back_populates="transactions")
 
+    @property
+    def amount(self):
+        """Amount in rupees, as an exact Decimal"""
+        return None if self.amount_paise is None else from_paise(self.amount_paise)
+
+    @amount.setter
+    def amount(self, value):
+        self.amount_paise = to_paise(value)
+
     def __repr__(self):
         return f"<Transaction(id={self.id}, amount={self.amount}, date='{self.transaction_date}')>"
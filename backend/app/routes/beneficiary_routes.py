@@ -1,17 +1,24 @@
+import csv
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, File, HTTPException, status, Query, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 import httpx
 
 from ..database import get_db
 from ..models.user import User
 from ..models.beneficiary import Beneficiary
+from ..models.transaction import Transaction
 from ..schemas.beneficiary_schema import (
     BeneficiaryCreate, 
     BeneficiaryUpdate, 
     BeneficiaryResponse
 )
 from ..services.auth_service import get_current_active_user
+from ..services.beneficiary_csv import validate_beneficiary_csv
+from ..services.pdf_cache import invalidate_cached_pdfs
+from ..services.search import search_beneficiaries
+from ..utils.pagination import decode_cursor, encode_cursor
 from ..utils.validators import validate_ifsc_code, validate_account_number
 
 router = APIRouter()
@@ -19,23 +26,71 @@ router = APIRouter()
 
 @router.get("/", response_model=List[BeneficiaryResponse])
 async def get_beneficiaries(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page; replaces skip"),
     active_only: bool = Query(True),
+    q: Optional[str] = Query(None, max_length=200, description="Words of the name, bank or branch"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get all beneficiaries for current user"""
+    """
+    Get all beneficiaries for current user, oldest first. When there are
+    more, the X-Next-Cursor header holds the cursor for the next page.
+    
+    ``q`` searches the name, bank and branch, matching word prefixes, best
+    match first; page search results with skip.
+    """
     
     query = db.query(Beneficiary).filter(Beneficiary.user_id == current_user.id)
     
     if active_only:
         query = query.filter(Beneficiary.is_active == True)
     
-    beneficiaries = query.offset(skip).limit(limit).all()
+    query, rank = search_beneficiaries(query, q)
+    if rank is not None:
+        if cursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Search results ordered by relevance are paged with skip"
+            )
+        return query.order_by(rank, Beneficiary.id).offset(skip).limit(limit).all()
+    
+    if cursor:
+        try:
+            last_id = int(decode_cursor(cursor, 1)[0])
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        query = query.filter(Beneficiary.id > last_id)
+        skip = 0
+    
+    beneficiaries = query.order_by(Beneficiary.id).offset(skip).limit(limit + 1).all()
+    if len(beneficiaries) > limit:
+        beneficiaries = beneficiaries[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor([beneficiaries[-1].id])
     return beneficiaries
 
 
+@router.post("/validate-csv")
+async def validate_beneficiaries_csv(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Check a beneficiary CSV before import and report every invalid field by line"""
+    
+    try:
+        return await run_in_threadpool(validate_beneficiary_csv, file.file)
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
 @router.get("/{beneficiary_id}", response_model=BeneficiaryResponse)
 async def get_beneficiary(
     beneficiary_id: int,
@@ -144,6 +199,9 @@ async def update_beneficiary(
     for field, value in update_data.items():
         setattr(db_beneficiary, field, value)
     
+    # Cached RTGS forms print the old beneficiary details
+    invalidate_cached_pdfs(db, Transaction.beneficiary_id == db_beneficiary.id)
+    
     db.commit()
     db.refresh(db_beneficiary)
     
@@ -1,62 +1,114 @@
 import os
-import uuid
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import FileResponse, StreamingResponse
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, RedirectResponse, Response, StreamingResponse
+from sqlalchemy.orm import Session
 
 from ..database import get_db
 from ..models.user import User
-from ..models.transaction import Transaction
-from ..models.beneficiary import Beneficiary
-from ..models.remitter import Remitter
+from ..models.pdf_job import PdfJob
 from ..services.auth_service import get_current_active_user
-from ..services.pdf_generator import generate_rtgs_pdf, download_pdf
+from ..schemas.pdf_schema import BulkPdfRequest, PdfJobResponse, PdfPreviewRequest, PdfPreviewResponse
+from ..services.form_data import RenderContext, count_selected_transactions, load_bulk_form_data, load_render_context
+from ..services.artifact_storage import get_artifact_storage
+from ..services.file_serving import file_response
+from ..services.form_preview import load_preview_form_data, preview_fields, render_preview_html
+from ..services.pdf_cache import get_cached_transaction_pdf_async, make_etag, etag_matches
+from ..services.pdf_timing import histograms_snapshot
+from ..services.statement_pdf import statement_period, write_statement_file
+from ..services.pdf_jobs import get_job_queue, JOB_SUCCEEDED
+from ..services.pdf_pool import get_render_pool, PdfRenderBusy, PdfRenderTimeout
 from ..config import settings
 
 router = APIRouter()
 
 
+def get_render_context(db: Session, transaction_id: int, user: User) -> RenderContext:
+    """Load a transaction's render context in one query, or raise 404"""
+    context = load_render_context(db, user, transaction_id)
+
+    if context is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Transaction not found"
+        )
+
+    return context
+
+
+def iter_temp_file(path, chunk_size=64 * 1024):
+    """Stream a temporary file in chunks and remove it when done"""
+    try:
+        with open(path, 'rb') as fileobj:
+            while True:
+                chunk = fileobj.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.remove(path)
+
+
+def iter_artifact(storage, key, chunk_size=64 * 1024):
+    """Stream a stored artifact in chunks"""
+    fileobj = storage.open(key)
+    try:
+        while True:
+            chunk = fileobj.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        fileobj.close()
+
+
+def render_error(e: Exception) -> HTTPException:
+    """Map render pool back-pressure errors to HTTP responses"""
+    if isinstance(e, PdfRenderBusy):
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "5"}
+        )
+    return HTTPException(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        detail=str(e)
+    )
+
+
+async def cached_pdf_response(context: RenderContext, db: Session, if_none_match: Optional[str]):
+    """Serve a transaction's PDF from the cache with a strong ETag, or 304"""
+    try:
+        key, path = await get_cached_transaction_pdf_async(context, db)
+    except (PdfRenderBusy, PdfRenderTimeout) as e:
+        raise render_error(e)
+
+    etag = make_etag(key)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return file_response(path, filename=context.filename, headers=headers)
+
+
 @router.post("/generate/{transaction_id}")
 async def generate_pdf(
     transaction_id: int,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Generate RTGS PDF for a transaction"""
     
-    # Get transaction with beneficiary
-    transaction = db.query(Transaction).options(
-        joinedload(Transaction.beneficiary)
-    ).filter(
-        Transaction.id == transaction_id,
-        Transaction.user_id == current_user.id
-    ).first()
-    
-    if not transaction:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Transaction not found"
-        )
+    context = get_render_context(db, transaction_id, current_user)
     
     try:
-        # Generate PDF using updated function
-        pdf_buffer = generate_rtgs_pdf(transaction, current_user, db)
-        
-        # Create filename for download
-        beneficiary_name = transaction.beneficiary.name.replace(' ', '_') if transaction.beneficiary.name else 'Unknown'
-        filename = f"RTGS_{beneficiary_name}_{transaction.transaction_date.strftime('%Y%m%d')}.pdf"
-        
-        # Return PDF as streaming response
-        pdf_buffer.seek(0)
-        
-        return StreamingResponse(
-            iter([pdf_buffer.getvalue()]),
-            media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
+        return await cached_pdf_response(context, db, if_none_match)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -67,43 +119,259 @@ async def generate_pdf(
 @router.get("/download/{transaction_id}")
 async def download_pdf_route(
     transaction_id: int,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Download RTGS PDF for a transaction"""
     
+    context = get_render_context(db, transaction_id, current_user)
+    
     try:
-        # Use the download_pdf function from pdf_generator
-        pdf_buffer = await download_pdf(transaction_id, current_user, db)
-        
-        if not pdf_buffer:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Transaction not found"
-            )
-        
-        # Get transaction for filename
-        transaction = db.query(Transaction).options(
-            joinedload(Transaction.beneficiary)
-        ).filter(
-            Transaction.id == transaction_id,
-            Transaction.user_id == current_user.id
-        ).first()
-        
-        beneficiary_name = transaction.beneficiary.name.replace(' ', '_') if transaction.beneficiary and transaction.beneficiary.name else 'Unknown'
-        filename = f"RTGS_{beneficiary_name}_{transaction.transaction_date.strftime('%Y%m%d')}.pdf"
-        
-        # Return PDF as streaming response
-        pdf_buffer.seek(0)
-        
-        return StreamingResponse(
-            iter([pdf_buffer.getvalue()]),
-            media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
+        return await cached_pdf_response(context, db, if_none_match)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to download PDF: {str(e)}"
         )
+
+
+@router.post("/preview", response_model=PdfPreviewResponse)
+async def preview_pdf(
+    request: PdfPreviewRequest,
+    format: str = Query("json", pattern="^(json|html)$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    What the RTGS form will print for unsaved form data, as JSON or an HTML
+    fragment. Built from the same form data as the PDF, without rendering it.
+    """
+    
+    form_data = load_preview_form_data(
+        db,
+        current_user,
+        beneficiary_id=request.beneficiary_id,
+        amount=request.amount,
+        cheque_number=request.cheque_number
+    )
+    
+    if form_data is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Beneficiary not found"
+        )
+    
+    remitter_data, transaction_data = form_data
+    fields = preview_fields(remitter_data, transaction_data)
+    if format == "html":
+        return HTMLResponse(render_preview_html(fields))
+    
+    return {"remitter": remitter_data, "transaction": transaction_data, "fields": fields}
+
+
+@router.post("/bulk")
+async def bulk_pdf(
+    request: BulkPdfRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Generate one multi-page RTGS PDF for many transactions"""
+    
+    limit = settings.pdf_bulk_max_forms
+    forms = load_bulk_form_data(
+        db,
+        current_user,
+        transaction_ids=request.transaction_ids,
+        filters=request.filters,
+        limit=limit + 1
+    )
+    
+    if not forms:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No transactions found"
+        )
+    
+    if len(forms) > limit:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many transactions for one PDF (maximum {limit})"
+        )
+    
+    try:
+        path = await get_render_pool().render_many(forms)
+    except (PdfRenderBusy, PdfRenderTimeout) as e:
+        raise render_error(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to generate PDF: {str(e)}"
+        )
+    
+    filename = f"RTGS_bulk_{datetime.now().strftime('%Y%m%d')}.pdf"
+    return StreamingResponse(
+        iter_temp_file(path),
+        media_type="application/pdf",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+@router.get("/statement")
+async def statement_pdf(
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    year: Optional[int] = Query(None, ge=2000, le=2100),
+    month: Optional[int] = Query(None, ge=1, le=12),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Statement of all RTGS transactions in a period with per-beneficiary totals"""
+    
+    try:
+        start, end, label = statement_period(start_date, end_date, year, month)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    try:
+        path = await run_in_threadpool(write_statement_file, db, current_user, start, end, label)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to generate statement: {str(e)}"
+        )
+    
+    filename = f"RTGS_statement_{start.strftime('%Y%m%d')}_{(end - timedelta(days=1)).strftime('%Y%m%d')}.pdf"
+    return StreamingResponse(
+        iter_temp_file(path),
+        media_type="application/pdf",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+@router.get("/timings")
+async def pdf_timings(
+    current_user: User = Depends(get_current_active_user)
+):
+    """Per-stage PDF timing histograms (milliseconds) since the server started"""
+    
+    return {
+        "enabled": settings.pdf_timing_enabled,
+        "stages": histograms_snapshot()
+    }
+
+
+def get_user_job(db: Session, job_id: int, user: User) -> PdfJob:
+    """Load a PDF job owned by the user, or raise 404"""
+    job = db.query(PdfJob).filter(
+        PdfJob.id == job_id,
+        PdfJob.user_id == user.id
+    ).first()
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="PDF job not found"
+        )
+
+    return job
+
+
+@router.post("/jobs", response_model=PdfJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_pdf_job(
+    request: BulkPdfRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Queue a multi-page RTGS PDF for many transactions as a background job"""
+    
+    count = count_selected_transactions(
+        db,
+        current_user,
+        transaction_ids=request.transaction_ids,
+        filters=request.filters
+    )
+    
+    if not count:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No transactions found"
+        )
+    
+    limit = settings.pdf_job_max_forms
+    if count > limit:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many transactions for one PDF (maximum {limit})"
+        )
+    
+    return get_job_queue().submit(
+        db,
+        current_user,
+        "bulk_forms",
+        request.model_dump(mode="json", exclude_none=True)
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=PdfJobResponse)
+async def get_pdf_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get the status and progress of a PDF job"""
+    
+    return get_user_job(db, job_id, current_user)
+
+
+@router.get("/jobs/{job_id}/download")
+async def download_pdf_job(
+    job_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Download the PDF produced by a finished job"""
+    
+    job = get_user_job(db, job_id, current_user)
+    
+    if job.status != JOB_SUCCEEDED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"PDF job is {job.status}"
+        )
+    
+    storage = get_artifact_storage()
+    if not job.result_path or not await run_in_threadpool(storage.exists, job.result_path):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="PDF job result has expired"
+        )
+    
+    # A finished job's artifact never changes, so it can be cached until it expires
+    etag = make_etag(f"job-{job.id}-{job.finished_at.strftime('%Y%m%d%H%M%S%f')}")
+    max_age = max(int((job.expires_at - datetime.utcnow()).total_seconds()), 0) if job.expires_at else 0
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={max_age}, immutable"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    filename = f"RTGS_bulk_{job.created_at.strftime('%Y%m%d')}_{job.id}.pdf"
+    path = storage.local_path(job.result_path)
+    if path is not None:
+        return file_response(path, filename=filename, headers=headers)
+    
+    # Remote storage: the client downloads straight from the bucket
+    url = storage.download_url(job.result_path, filename)
+    if url is not None:
+        return RedirectResponse(url, headers={"Cache-Control": "private, no-store"})
+    return StreamingResponse(
+        iter_artifact(storage, job.result_path),
+        media_type="application/pdf",
+        headers={**headers, "Content-Disposition": f"attachment; filename={filename}"}
+    )
@@ -5,7 +5,9 @@ from typing import Optional
 from ..database import get_db
 from ..models.remitter import Remitter
 from ..models.user import User
+from ..models.transaction import Transaction
 from ..schemas.remitter_schema import RemitterCreate, RemitterUpdate, RemitterResponse
+from ..services.pdf_cache import invalidate_cached_pdfs
 
 router = APIRouter(tags=["remitter"])
 
@@ -73,6 +75,9 @@ async def update_bank_details(
     for field, value in update_data.items():
         setattr(remitter, field, value)
     
+    # Cached RTGS forms print the old remitter details
+    invalidate_cached_pdfs(db, Transaction.user_id == current_user.id)
+    
     db.commit()
     db.refresh(remitter)
     
@@ -93,6 +98,7 @@ async def delete_bank_details(
         )
     
     db.delete(remitter)
+    invalidate_cached_pdfs(db, Transaction.user_id == current_user.id)
     db.commit()
     
     return {"message": "Bank details deleted successfully"}
\ No newline at end of file
@@ -1,9 +1,12 @@
 from typing import List, Optional
 from datetime import datetime, date
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from decimal import Decimal
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Body
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, extract
+from sqlalchemy import and_, func
 
+from ..config import settings
 from ..database import get_db
 from ..models.user import User
 from ..models.beneficiary import Beneficiary
@@ -16,8 +19,19 @@ from ..schemas.transaction_schema import (
     TransactionFilter
 )
 from ..services.auth_service import get_current_active_user
-from ..services.transaction_service import create_transaction_record
-from ..utils.amount_to_words import amount_to_words
+from ..services.pdf_cache import prerender_transaction_pdf
+from ..services.search import search_transactions
+from ..services.transaction_service import (
+    after_transaction_cursor,
+    apply_transaction_filter,
+    create_transaction_record,
+    period_criteria,
+    query_transaction_rows,
+    transaction_cursor,
+    transaction_order,
+    transaction_row_dict
+)
+from ..utils.amount_to_words import amount_to_words, from_paise
 
 router = APIRouter()
 
@@ -26,54 +40,107 @@ router = APIRouter()
 async def get_transactions(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page; replaces skip"),
+    include_total: bool = Query(True),
+    q: Optional[str] = Query(None, max_length=200, description="Words of the beneficiary name, purpose or remarks"),
+    sort: Optional[str] = Query(None, pattern="^(relevance|date|amount|beneficiary)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
     month: Optional[int] = Query(None, ge=1, le=12),
     year: Optional[int] = Query(None, ge=2020, le=2030),
     beneficiary_id: Optional[int] = Query(None),
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    min_amount: Optional[Decimal] = Query(None, ge=0),
+    max_amount: Optional[Decimal] = Query(None, ge=0),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Get transactions for current user with filters"""
-    
-    query = db.query(Transaction).filter(Transaction.user_id == current_user.id)
+    """
+    Get transactions for current user with filters, newest first unless
+    ``sort``/``order`` say otherwise. ``total`` and ``total_amount`` cover
+    every matching transaction, not just the page.
     
-    # Apply filters
-    if month:
-        query = query.filter(extract('month', Transaction.transaction_date) == month)
+    ``q`` searches the beneficiary name, purpose and remarks, matching word
+    prefixes; results come best match first unless ``sort`` is given.
     
-    if year:
-        query = query.filter(extract('year', Transaction.transaction_date) == year)
+    Page with ``cursor`` (the previous page's ``next_cursor``): rows inserted
+    meanwhile don't shift pages and deep pages cost the same as the first.
+    ``skip`` still works for old clients and is the only way to page
+    relevance-ordered results.
+    """
     
-    if beneficiary_id:
-        query = query.filter(Transaction.beneficiary_id == beneficiary_id)
+    try:
+        filters = TransactionFilter(
+            month=month,
+            year=year,
+            beneficiary_id=beneficiary_id,
+            start_date=start_date,
+            end_date=end_date,
+            min_amount=min_amount,
+            max_amount=max_amount
+        )
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="; ".join(error["msg"] for error in e.errors())
+        )
     
-    # Get total count
-    total = query.count()
+    query = apply_transaction_filter(query_transaction_rows(db, current_user.id), filters)
+    query, rank = search_transactions(query, q)
+    if sort is None:
+        sort = "relevance" if rank is not None else "date"
+    if sort == "relevance":
+        if rank is None:
+            sort = "date"
+        elif cursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Search results ordered by relevance are paged with skip"
+            )
     
-    # Get paginated results
-    transactions = query.order_by(Transaction.transaction_date.desc()).offset(skip).limit(limit).all()
+    matching = query
+    if cursor:
+        try:
+            query = query.filter(after_transaction_cursor(cursor, sort, order))
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        skip = 0
+    elif include_total:
+        # Counted and summed in the page query itself
+        query = query.add_columns(
+            func.count().over().label("total_count"),
+            func.sum(Transaction.amount_paise).over().label("total_paise")
+        )
     
-    # Add beneficiary details to each transaction
-    transactions_with_beneficiary = []
-    for transaction in transactions:
-        beneficiary = db.query(Beneficiary).filter(Beneficiary.id == transaction.beneficiary_id).first()
-        transaction_dict = {
-            **transaction.__dict__,
-            "beneficiary": {
-                "id": beneficiary.id,
-                "name": beneficiary.name,
-                "bank_name": beneficiary.bank_name
-            } if beneficiary else None
-        }
-        transactions_with_beneficiary.append(transaction_dict)
+    # One extra row tells whether there is a next page
+    ordering = [rank, Transaction.id.desc()] if sort == "relevance" else transaction_order(sort, order)
+    rows = query.order_by(*ordering).offset(skip).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit and sort != "relevance":
+        next_cursor = transaction_cursor(rows[limit - 1], sort, order)
+    rows = rows[:limit]
     
-    pages = (total + limit - 1) // limit
+    total = total_amount = None
+    if include_total:
+        if rows and not cursor:
+            total, total_paise = rows[0].total_count, rows[0].total_paise
+        else:
+            total, total_paise = matching.with_entities(
+                func.count(Transaction.id), func.coalesce(func.sum(Transaction.amount_paise), 0)
+            ).one()
+        total_amount = from_paise(total_paise)
     
     return TransactionList(
-        transactions=transactions_with_beneficiary,
+        transactions=[transaction_row_dict(row) for row in rows],
         total=total,
-        page=(skip // limit) + 1,
+        total_amount=total_amount,
+        page=None if cursor else (skip // limit) + 1,
         size=limit,
-        pages=pages
+        pages=None if total is None else (total + limit - 1) // limit,
+        next_cursor=next_cursor
     )
 
 
@@ -85,35 +152,21 @@ async def get_transaction(
 ):
     """Get specific transaction by ID"""
     
-    transaction = db.query(Transaction).filter(
-        Transaction.id == transaction_id,
-        Transaction.user_id == current_user.id
-    ).first()
+    row = query_transaction_rows(db, current_user.id).filter(Transaction.id == transaction_id).first()
     
-    if not transaction:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Transaction not found"
         )
     
-    # Get beneficiary details
-    beneficiary = db.query(Beneficiary).filter(Beneficiary.id == transaction.beneficiary_id).first()
-    
-    return {
-        **transaction.__dict__,
-        "beneficiary": {
-            "id": beneficiary.id,
-            "name": beneficiary.name,
-            "bank_name": beneficiary.bank_name,
-            "account_number": beneficiary.account_number,
-            "ifsc_code": beneficiary.ifsc_code
-        } if beneficiary else None
-    }
+    return transaction_row_dict(row, ("id", "name", "bank_name", "account_number", "ifsc_code"))
 
 
 @router.post("/", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
 async def create_transaction(
     transaction: TransactionCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -152,6 +205,12 @@ async def create_transaction(
     db.commit()
     db.refresh(db_transaction)
     
+    # Render the PDF after the response is sent so the first download is a cache hit
+    if settings.pdf_prerender:
+        background_tasks.add_task(
+            prerender_transaction_pdf, db.get_bind(), db_transaction.id, current_user.id
+        )
+    
     return db_transaction
 
 
@@ -165,20 +224,17 @@ async def get_dashboard_stats(
     # Total transactions
     total_transactions = db.query(Transaction).filter(Transaction.user_id == current_user.id).count()
     
-    # Total amount transferred
-    total_amount = db.query(Transaction).filter(Transaction.user_id == current_user.id).with_entities(
-        Transaction.amount
-    ).all()
-    total_amount_sum = sum([t.amount for t in total_amount]) if total_amount else 0
+    # Total amount transferred, summed exactly in paise
+    total_paise = db.query(func.coalesce(func.sum(Transaction.amount_paise), 0)).filter(
+        Transaction.user_id == current_user.id
+    ).scalar()
     
     # Transactions this month
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-    monthly_transactions = db.query(Transaction).filter(
+    now = datetime.now()
+    monthly_transactions = db.query(func.count(Transaction.id)).filter(
         Transaction.user_id == current_user.id,
-        extract('month', Transaction.transaction_date) == current_month,
-        extract('year', Transaction.transaction_date) == current_year
-    ).count()
+        *period_criteria(now.month, now.year)
+    ).scalar()
     
     # Active beneficiaries
     active_beneficiaries = db.query(Beneficiary).filter(
@@ -188,7 +244,7 @@ async def get_dashboard_stats(
     
     return {
         "total_transactions": total_transactions,
-        "total_amount": total_amount_sum,
+        "total_amount": str(from_paise(total_paise)),
         "monthly_transactions": monthly_transactions,
         "active_beneficiaries": active_beneficiaries
     }
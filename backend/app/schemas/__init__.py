@@ -8,10 +8,12 @@ from .transaction_schema import (
     TransactionBase, TransactionCreate, TransactionUpdate, TransactionResponse,
     TransactionWithBeneficiary, TransactionFilter, TransactionList
 )
+from .pdf_schema import BulkPdfRequest, PdfJobResponse
 
 __all__ = [
     "UserBase", "UserCreate", "UserLogin", "UserUpdate", "UserResponse", "Token", "TokenData",
     "BeneficiaryBase", "BeneficiaryCreate", "BeneficiaryUpdate", "BeneficiaryResponse",
     "TransactionBase", "TransactionCreate", "TransactionUpdate", "TransactionResponse",
-    "TransactionWithBeneficiary", "TransactionFilter", "TransactionList"
+    "TransactionWithBeneficiary", "TransactionFilter", "TransactionList",
+    "BulkPdfRequest", "PdfJobResponse"
 ]
\ No newline at end of file
@@ -0,0 +1,51 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Dict, Optional, List
+from datetime import datetime
+
+from .transaction_schema import Amount, TransactionFilter
+
+
+class BulkPdfRequest(BaseModel):
+    transaction_ids: Optional[List[int]] = Field(None, min_length=1)
+    filters: Optional[TransactionFilter] = None
+
+    @model_validator(mode='after')
+    def validate_selection(self):
+        if not self.transaction_ids and self.filters is None:
+            raise ValueError('Provide transaction_ids or filters')
+        return self
+
+
+class PdfJobResponse(BaseModel):
+    id: int
+    kind: str
+    status: str
+    progress: int
+    total: int
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class PdfPreviewRequest(BaseModel):
+    beneficiary_id: Optional[int] = None
+    amount: Optional[Amount] = None
+    cheque_number: Optional[str] = Field(None, max_length=50)
+
+
+class PdfPreviewField(BaseModel):
+    section: str
+    label: str
+    field: str
+    value: str
+
+
+class PdfPreviewResponse(BaseModel):
+    remitter: Dict[str, str]
+    transaction: Dict[str, str]
+    fields: List[PdfPreviewField]
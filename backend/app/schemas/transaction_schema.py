@@ -1,24 +1,24 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from typing import Annotated, Optional, List
 from datetime import datetime
+from decimal import Decimal
+
+# Largest amount a single RTGS form accepts, in rupees
+MAX_TRANSACTION_AMOUNT = Decimal("99999999.99")
+
+# An exact transaction amount in rupees, with at most two decimal places;
+# the only place the amount bounds are checked
+Amount = Annotated[Decimal, Field(gt=0, le=MAX_TRANSACTION_AMOUNT, decimal_places=2)]
 
 
 class TransactionBase(BaseModel):
     beneficiary_id: int
-    amount: float = Field(..., gt=0, le=99999999.99)
+    amount: Amount
     cheque_number: Optional[str] = Field(None, max_length=50)
     transaction_date: datetime
     purpose: Optional[str] = Field(None, max_length=200)
     remarks: Optional[str] = Field(None, max_length=1000)
 
-    @validator('amount')
-    def validate_amount(cls, v):
-        if v <= 0:
-            raise ValueError('Amount must be greater than 0')
-        if v > 99999999.99:
-            raise ValueError('Amount cannot exceed 9,99,99,999.99')
-        return round(v, 2)
-
 
 class TransactionCreate(TransactionBase):
     pass
@@ -26,22 +26,12 @@ class TransactionCreate(TransactionBase):
 
 class TransactionUpdate(BaseModel):
     beneficiary_id: Optional[int] = None
-    amount: Optional[float] = Field(None, gt=0, le=99999999.99)
+    amount: Optional[Amount] = None
     cheque_number: Optional[str] = Field(None, max_length=50)
     transaction_date: Optional[datetime] = None
     purpose: Optional[str] = Field(None, max_length=200)
     remarks: Optional[str] = Field(None, max_length=1000)
 
-    @validator('amount')
-    def validate_amount(cls, v):
-        if v is not None:
-            if v <= 0:
-                raise ValueError('Amount must be greater than 0')
-            if v > 99999999.99:
-                raise ValueError('Amount cannot exceed 9,99,99,999.99')
-            return round(v, 2)
-        return v
-
 
 class TransactionResponse(TransactionBase):
     id: int
@@ -66,13 +56,27 @@ class TransactionFilter(BaseModel):
     beneficiary_id: Optional[int] = None
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
-    min_amount: Optional[float] = Field(None, ge=0)
-    max_amount: Optional[float] = Field(None, ge=0)
+    min_amount: Optional[Decimal] = Field(None, ge=0)
+    max_amount: Optional[Decimal] = Field(None, ge=0)
+
+    @validator('end_date')
+    def validate_date_range(cls, v, values):
+        if v is not None and values.get('start_date') is not None and v < values['start_date']:
+            raise ValueError('end_date cannot be before start_date')
+        return v
+
+    @validator('max_amount')
+    def validate_amount_range(cls, v, values):
+        if v is not None and values.get('min_amount') is not None and v < values['min_amount']:
+            raise ValueError('max_amount cannot be less than min_amount')
+        return v
 
 
 class TransactionList(BaseModel):
     transactions: List[TransactionWithBeneficiary]
-    total: int
-    page: int
+    total: Optional[int] = None  # Matching transactions; None when include_total=false
+    total_amount: Optional[Decimal] = None  # Sum of the matching transactions; None when include_total=false
+    page: Optional[int] = None  # None for cursor pages
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # Pass as ``cursor`` for the next page; None on the last page
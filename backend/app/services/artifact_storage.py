@@ -0,0 +1,315 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from ..config import settings
+from .file_serving import PRECOMPRESSED_SUFFIX, remove_stored_file, write_precompressed
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fileobj:
+        for chunk in iter(lambda: fileobj.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArtifactStorage(ABC):
+    """
+    Where generated artifacts (PDF job results, cached forms) are kept.
+
+    Artifacts are addressed by key. ``store`` derives the key from the
+    content (its SHA-256), so storing the same bytes twice keeps one copy; an
+    explicit key can be given instead for artifacts addressed by their inputs.
+    Backends implement the abstract primitives below; retention is shared.
+    """
+
+    @abstractmethod
+    def store(self, write, key=None, suffix=".pdf"):
+        """
+        Store an artifact produced by ``write(fileobj)`` and return its key.
+        Readers never see a partial artifact.
+        """
+
+    def store_bytes(self, data, key=None, suffix=".pdf"):
+        return self.store(lambda output: output.write(data), key, suffix)
+
+    @abstractmethod
+    def exists(self, key):
+        """Whether an artifact is stored under ``key``"""
+
+    @abstractmethod
+    def open(self, key):
+        """Open an artifact for reading (binary)"""
+
+    @abstractmethod
+    def delete(self, key):
+        """Delete an artifact; deleting a missing one is not an error"""
+
+    def local_path(self, key):
+        """Filesystem path of an artifact, or None when it is not stored locally"""
+        return None
+
+    def download_url(self, key, filename=None):
+        """A URL the client can download the artifact from directly, or None"""
+        return None
+
+    @abstractmethod
+    def iter_artifacts(self):
+        """Yield (key, size in bytes, last stored as a Unix timestamp)"""
+
+    def apply_retention(self, max_bytes=None, max_age_seconds=None, now=None):
+        """
+        Delete artifacts last stored more than ``max_age_seconds`` ago, then
+        the oldest ones until at most ``max_bytes`` remain. Returns the number
+        of artifacts deleted.
+        """
+        now = time.time() if now is None else now
+        artifacts = sorted(self.iter_artifacts(), key=lambda artifact: artifact[2])
+        total = sum(size for _, size, _ in artifacts)
+        deleted = 0
+        for key, size, modified in artifacts:
+            expired = max_age_seconds and now - modified > max_age_seconds
+            over_size = max_bytes and total > max_bytes
+            if not expired and not over_size:
+                break
+            self.delete(key)
+            total -= size
+            deleted += 1
+        return deleted
+
+
+class LocalArtifactStorage(ArtifactStorage):
+    """
+    Artifacts in a directory tree sharded by key (``ab/cd/abcd....pdf``), so no
+    directory grows past a few hundred entries. Files are written to a
+    temporary name in the tree and renamed into place. Storing content that
+    is already there only refreshes its timestamp for retention.
+    """
+
+    TMP_DIR = ".tmp"
+
+    def __init__(self, root, precompress=True):
+        self.root = root
+        self.precompress = precompress
+
+    def path(self, key):
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def store(self, write, key=None, suffix=".pdf"):
+        tmp_dir = os.path.join(self.root, self.TMP_DIR)
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, suffix=suffix)
+        try:
+            with os.fdopen(fd, "wb") as output:
+                write(output)
+            if key is None:
+                key = _file_digest(tmp_path) + suffix
+            path = self.path(key)
+            if os.path.exists(path):
+                os.remove(tmp_path)
+                os.utime(path)
+                return key
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if self.precompress:
+            write_precompressed(path)
+        return key
+
+    def exists(self, key):
+        return os.path.exists(self.path(key))
+
+    def open(self, key):
+        return open(self.path(key), "rb")
+
+    def delete(self, key):
+        remove_stored_file(self.path(key))
+
+    def local_path(self, key):
+        return self.path(key)
+
+    def _walk(self):
+        """Yield (path, name, stat) of every stored file, precompressed copies excluded"""
+        for directory, subdirs, files in os.walk(self.root):
+            if self.TMP_DIR in subdirs:
+                subdirs.remove(self.TMP_DIR)
+            for name in files:
+                if name.endswith(PRECOMPRESSED_SUFFIX):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    yield path, name, os.stat(path)
+                except FileNotFoundError:
+                    continue
+
+    def iter_artifacts(self):
+        for path, name, stat in self._walk():
+            if path != self.path(name):
+                continue
+            size = stat.st_size
+            try:
+                size += os.path.getsize(path + PRECOMPRESSED_SUFFIX)
+            except FileNotFoundError:
+                pass
+            yield name, size, stat.st_mtime
+
+    def remove_stray_files(self, max_age_seconds=3600, now=None):
+        """
+        Remove temporary files left by writers that died mid-write, and files
+        outside the sharded layout (e.g. from an older layout), once they are
+        ``max_age_seconds`` old. Returns the number of files removed.
+        """
+        cutoff = (time.time() if now is None else now) - max_age_seconds
+        stray = [path for path, name, stat in self._walk() if path != self.path(name) and stat.st_mtime < cutoff]
+        try:
+            with os.scandir(os.path.join(self.root, self.TMP_DIR)) as entries:
+                stray += [entry.path for entry in entries if entry.stat().st_mtime < cutoff]
+        except FileNotFoundError:
+            pass
+        for path in stray:
+            remove_stored_file(path)
+        return len(stray)
+
+
+def _import_boto3():
+    try:
+        import boto3
+    except ImportError:
+        raise RuntimeError("S3 artifact storage needs the boto3 package: pip install boto3")
+    return boto3
+
+
+class S3ArtifactStorage(ArtifactStorage):
+    """
+    Artifacts in an S3-compatible bucket (AWS S3, MinIO, ...) under
+    ``prefix``, sharded like the local backend. Content is spooled to a local
+    temporary file to compute its key, and only uploaded when the bucket does
+    not have it yet. Downloads go straight to the bucket through presigned
+    URLs.
+    """
+
+    def __init__(self, bucket, prefix="", client=None, endpoint_url=None, url_expiry=3600):
+        if client is None:
+            client = _import_boto3().client("s3", endpoint_url=endpoint_url or None)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.url_expiry = url_expiry
+
+    def object_name(self, key):
+        name = f"{key[:2]}/{key[2:4]}/{key}"
+        return f"{self.prefix}/{name}" if self.prefix else name
+
+    def _is_missing(self, error):
+        response = getattr(error, "response", None) or {}
+        return str(response.get("Error", {}).get("Code")) in ("404", "NoSuchKey", "NotFound")
+
+    def store(self, write, key=None, suffix=".pdf"):
+        with tempfile.TemporaryFile(suffix=suffix) as spool:
+            write(spool)
+            if key is None:
+                spool.seek(0)
+                digest = hashlib.sha256()
+                for chunk in iter(lambda: spool.read(HASH_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                key = digest.hexdigest() + suffix
+            if not self.exists(key):
+                spool.seek(0)
+                self.client.upload_fileobj(spool, self.bucket, self.object_name(key))
+        return key
+
+    def exists(self, key):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.object_name(key))
+        except Exception as e:
+            if self._is_missing(e):
+                return False
+            raise
+        return True
+
+    def open(self, key):
+        return self.client.get_object(Bucket=self.bucket, Key=self.object_name(key))["Body"]
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self.object_name(key))
+
+    def download_url(self, key, filename=None):
+        params = {"Bucket": self.bucket, "Key": self.object_name(key)}
+        if filename:
+            params["ResponseContentDisposition"] = f"attachment; filename={filename}"
+        return self.client.generate_presigned_url("get_object", Params=params, ExpiresIn=self.url_expiry)
+
+    def iter_artifacts(self):
+        paginator = self.client.get_paginator("list_objects_v2")
+        prefix = f"{self.prefix}/" if self.prefix else ""
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for item in page.get("Contents", []):
+                yield item["Key"].rsplit("/", 1)[-1], item["Size"], item["LastModified"].timestamp()
+
+
+_storage = None
+_storage_key = None
+_storage_lock = threading.Lock()
+
+
+def create_artifact_storage():
+    """Build the storage backend selected by ``settings.artifact_storage``"""
+    if settings.artifact_storage == "local":
+        return LocalArtifactStorage(settings.pdf_job_dir)
+    if settings.artifact_storage == "s3":
+        return S3ArtifactStorage(
+            settings.artifact_s3_bucket,
+            settings.artifact_s3_prefix,
+            endpoint_url=settings.artifact_s3_endpoint_url
+        )
+    raise ValueError(f"Unknown artifact storage: {settings.artifact_storage}")
+
+
+def get_artifact_storage():
+    """Return the process-wide artifact storage"""
+    global _storage, _storage_key
+    key = (settings.artifact_storage, settings.pdf_job_dir, settings.artifact_s3_bucket, settings.artifact_s3_prefix)
+    if _storage_key != key:
+        with _storage_lock:
+            if _storage_key != key:
+                _storage = create_artifact_storage()
+                _storage_key = key
+    return _storage
+
+
+def apply_artifact_retention():
+    """Apply the configured retention policy to the artifact storage and the PDF cache"""
+    from .pdf_cache import get_cache_storage
+
+    deleted = get_artifact_storage().apply_retention(
+        settings.artifact_max_bytes or None,
+        settings.artifact_max_age_hours * 3600 or None
+    )
+    deleted += get_cache_storage().apply_retention(
+        settings.pdf_cache_max_bytes or None,
+        settings.pdf_cache_max_age_hours * 3600 or None
+    )
+    for storage in (get_artifact_storage(), get_cache_storage()):
+        if isinstance(storage, LocalArtifactStorage):
+            storage.remove_stray_files()
+    if deleted:
+        logger.info("Retention removed %s stored artifact(s)", deleted)
+    return deleted
+
+
+if __name__ == "__main__":
+    # Apply the retention policy once, e.g. from cron: python -m app.services.artifact_storage
+    logging.basicConfig(level=logging.INFO)
+    print(f"Removed {apply_artifact_retention()} artifact(s)")
@@ -0,0 +1,42 @@
+import csv
+import io
+
+from ..utils.validators import validate_rows
+
+# Columns a beneficiary CSV must have; mobile and email are checked when present
+REQUIRED_COLUMNS = ("name", "account_number", "bank_name", "branch_name", "ifsc_code")
+VALIDATED_FIELDS = ("ifsc_code", "account_number", "mobile", "email")
+
+
+def validate_beneficiary_csv(fileobj, max_errors=1000):
+    """
+    Validate an uploaded beneficiary CSV (binary file object, UTF-8 with an
+    optional BOM) while it is read, without stopping at the first bad row.
+
+    Returns:
+        dict: Row count, valid row count and up to ``max_errors`` error
+        entries of {"line": CSV line number, "errors": {field: message}}.
+
+    Raises:
+        ValueError: When required columns are missing.
+    """
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+        fields = [field for field in VALIDATED_FIELDS if field in reader.fieldnames]
+        rows = valid = 0
+        errors = []
+        for row_errors in validate_rows(reader, fields, required=("ifsc_code", "account_number")):
+            rows += 1
+            if not row_errors:
+                valid += 1
+            elif len(errors) < max_errors:
+                errors.append({"line": reader.line_num, "errors": row_errors})
+        return {"rows": rows, "valid_rows": valid, "errors": errors}
+    finally:
+        # Leave the underlying upload open for its owner
+        text.detach()
@@ -0,0 +1,90 @@
+import gzip
+import os
+import shutil
+import tempfile
+from urllib.parse import quote
+
+from fastapi.responses import FileResponse, Response
+
+from ..config import settings
+
+# Suffix of the precompressed copy nginx's gzip_static serves to clients
+# that accept gzip
+PRECOMPRESSED_SUFFIX = ".gz"
+
+
+def _served_roots():
+    """Directories nginx can serve, keyed by their internal location name"""
+    return {
+        "pdf_cache": settings.pdf_cache_dir,
+        "pdf_jobs": settings.pdf_job_dir,
+        "uploads": settings.upload_dir,
+    }
+
+
+def accel_uri(path):
+    """
+    Internal nginx URI for a stored file (``<accel_redirect_prefix>/<root>/<path>``),
+    or None when the file is not under one of the served directories.
+    """
+    real_path = os.path.realpath(path)
+    for name, root in _served_roots().items():
+        root = os.path.realpath(root)
+        if os.path.commonpath([real_path, root]) == root and real_path != root:
+            relative = os.path.relpath(real_path, root).replace(os.sep, "/")
+            return f"{settings.accel_redirect_prefix.rstrip('/')}/{name}/{quote(relative)}"
+    return None
+
+
+def file_response(path, media_type="application/pdf", filename=None, headers=None):
+    """
+    Send a stored file. With ``settings.accel_redirect`` the response is
+    empty and carries an X-Accel-Redirect, so nginx sends the file (with Range
+    requests and precompressed variants) and the worker returns at once.
+    Otherwise the file is streamed from Python.
+    """
+    headers = dict(headers or {})
+    if filename:
+        headers["Content-Disposition"] = f"attachment; filename={filename}"
+
+    uri = accel_uri(path) if settings.accel_redirect else None
+    if uri is None:
+        return FileResponse(path, media_type=media_type, headers=headers)
+
+    headers["X-Accel-Redirect"] = uri
+    headers["Accept-Ranges"] = "bytes"
+    return Response(media_type=media_type, headers=headers)
+
+
+def write_precompressed(path):
+    """
+    Store a gzip copy next to ``path`` when ``settings.pdf_precompress`` is on
+    and it is smaller. Written atomically and without a timestamp, so the same
+    file always compresses to the same bytes.
+    """
+    if not settings.pdf_precompress:
+        return None
+    target = path + PRECOMPRESSED_SUFFIX
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as raw, open(path, "rb") as source:
+            with gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as compressed:
+                shutil.copyfileobj(source, compressed)
+        if os.path.getsize(tmp_path) >= os.path.getsize(path):
+            os.remove(tmp_path)
+            return None
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return target
+
+
+def remove_stored_file(path):
+    """Delete a stored file and its precompressed copy, if present"""
+    for candidate in (path, path + PRECOMPRESSED_SUFFIX):
+        try:
+            os.remove(candidate)
+        except FileNotFoundError:
+            pass
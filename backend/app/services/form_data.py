@@ -0,0 +1,197 @@
+from sqlalchemy import func
+
+from ..models.beneficiary import Beneficiary
+from ..models.remitter import Remitter
+from ..models.transaction import Transaction
+from ..utils.amount_to_words import amount_to_words, amounts_to_words, format_indian
+from . import pdf_timing
+from .transaction_service import apply_transaction_filter
+
+
+def build_remitter_data(remitter, user, cheque_number=None):
+    """Prepare the remitter half of the RTGS form"""
+    if remitter:
+        return {
+            "account_with_branch": f'{remitter.bank_name} - {remitter.branch_name}' if remitter.bank_name and remitter.branch_name else '',
+            "name": remitter.account_name or '',
+            "account_no": remitter.account_number or '',
+            "mobile": remitter.mobile or '',
+            "pan": remitter.pan_number or '',
+            "cheque_no": cheque_number or '',
+            # Not printed; select the bank's form template
+            "bank": remitter.bank_name or '',
+            "ifsc": remitter.ifsc_code or ''
+        }
+    return {
+        "account_with_branch": '',
+        "name": user.name or '',
+        "account_no": '',
+        "mobile": '',
+        "pan": '',
+        "cheque_no": cheque_number or ''
+    }
+
+
+def build_transaction_data(beneficiary, amount, amount_in_words=None):
+    """
+    Prepare the beneficiary and amount half of the RTGS form. For a form that
+    is still being filled in either may be None; its fields are left blank.
+    ``amount_in_words`` may be passed when already converted.
+    """
+    amount_fig = ''
+    if amount is not None:
+        if amount_in_words is None:
+            with pdf_timing.stage("words"):
+                amount_in_words = amount_to_words(amount)
+        amount_fig = format_indian(amount)
+    amount_in_words = amount_in_words or ''
+
+    if beneficiary is None:
+        return {
+            "beneficiary_name": '',
+            "beneficiary_bank": '',
+            "beneficiary_account_no": '',
+            "beneficiary_address": '',
+            "beneficiary_ifsc": '',
+            "amount_fig": amount_fig,
+            "amount_words": amount_in_words,
+            "beneficiary_mobile": ''
+        }
+
+    beneficiary_address = f'{beneficiary.branch_name}'
+    if hasattr(beneficiary, 'bank_address') and beneficiary.bank_address:
+        beneficiary_address += f', {beneficiary.bank_address}'
+
+    return {
+        "beneficiary_name": beneficiary.name or '',
+        "beneficiary_bank": beneficiary.bank_name or '',
+        "beneficiary_account_no": beneficiary.account_number or '',
+        "beneficiary_address": beneficiary_address,
+        "beneficiary_ifsc": beneficiary.ifsc_code or '',
+        "amount_fig": amount_fig,
+        "amount_words": amount_in_words,
+        "beneficiary_mobile": beneficiary.mobile or ''
+    }
+
+
+def build_form_data(transaction, beneficiary, remitter, user, amount_in_words=None):
+    """
+    Build the (remitter_data, transaction_data) dictionaries the RTGS form
+    template is rendered from.
+
+    Only plain values are read, so this is shared by PDF rendering, caching
+    and anything else that needs the form's field mapping.
+    """
+    remitter_data = build_remitter_data(remitter, user, transaction.cheque_number)
+    transaction_data = build_transaction_data(beneficiary, transaction.amount, amount_in_words)
+    return remitter_data, transaction_data
+
+
+def prepare_form_data(transaction, user, db):
+    """Load the remitter for ``user`` and build the form data for a transaction"""
+    with pdf_timing.stage("db"):
+        remitter = db.query(Remitter).filter(Remitter.user_id == user.id).first()
+    return build_form_data(transaction, transaction.beneficiary, remitter, user)
+
+
+class RenderContext:
+    """Everything needed to render and serve one transaction's RTGS form"""
+
+    __slots__ = ('transaction', 'remitter_data', 'transaction_data', 'filename')
+
+    def __init__(self, transaction, remitter_data, transaction_data, filename):
+        self.transaction = transaction
+        self.remitter_data = remitter_data
+        self.transaction_data = transaction_data
+        self.filename = filename
+
+    @property
+    def form_data(self):
+        """The (remitter_data, transaction_data) pair the template renders"""
+        return self.remitter_data, self.transaction_data
+
+
+def pdf_filename(transaction, beneficiary):
+    """Download filename for a transaction's RTGS form"""
+    beneficiary_name = beneficiary.name.replace(' ', '_') if beneficiary and beneficiary.name else 'Unknown'
+    return f"RTGS_{beneficiary_name}_{transaction.transaction_date.strftime('%Y%m%d')}.pdf"
+
+
+def _select_transactions(query, transaction_ids=None, filters=None):
+    """Restrict a Transaction query to explicit ids and/or TransactionFilter criteria"""
+    if transaction_ids:
+        query = query.filter(Transaction.id.in_(transaction_ids))
+
+    if filters is not None:
+        query = apply_transaction_filter(query, filters)
+
+    return query
+
+
+def count_selected_transactions(db, user, transaction_ids=None, filters=None):
+    """How many transactions load_render_contexts would load, with one COUNT query"""
+    query = db.query(func.count(Transaction.id)).join(
+        Beneficiary, Beneficiary.id == Transaction.beneficiary_id
+    ).filter(Transaction.user_id == user.id)
+    return _select_transactions(query, transaction_ids, filters).scalar()
+
+
+def load_render_contexts(db, user, transaction_ids=None, filters=None, limit=None):
+    """
+    Load the render contexts of transactions of ``user``, ordered by date.
+
+    Transactions, their beneficiaries and the remitter come back from a single
+    joined query, however many transactions are selected. Shared by the
+    single-form and bulk PDF paths.
+
+    Args:
+        transaction_ids (list): Explicit transactions to include.
+        filters (TransactionFilter): Criteria selecting the transactions.
+        limit (int): Maximum number of rows to load.
+
+    Returns:
+        list: RenderContext objects.
+    """
+    query = db.query(Transaction, Beneficiary, Remitter).join(
+        Beneficiary, Beneficiary.id == Transaction.beneficiary_id
+    ).outerjoin(
+        Remitter, Remitter.user_id == Transaction.user_id
+    ).filter(Transaction.user_id == user.id)
+    query = _select_transactions(query, transaction_ids, filters)
+
+    query = query.order_by(Transaction.transaction_date, Transaction.id)
+    if limit is not None:
+        query = query.limit(limit)
+
+    with pdf_timing.stage("db"):
+        rows = query.all()
+    with pdf_timing.stage("words"):
+        words = amounts_to_words([transaction.amount for transaction, _, _ in rows])
+    return [
+        RenderContext(
+            transaction,
+            *build_form_data(transaction, beneficiary, remitter, user, amount_in_words),
+            pdf_filename(transaction, beneficiary)
+        )
+        for (transaction, beneficiary, remitter), amount_in_words in zip(rows, words)
+    ]
+
+
+def load_render_context(db, user, transaction_id):
+    """The RenderContext of one transaction of ``user``, or None"""
+    contexts = load_render_contexts(db, user, transaction_ids=[transaction_id])
+    return contexts[0] if contexts else None
+
+
+def load_bulk_form_data(db, user, transaction_ids=None, filters=None, limit=None):
+    """
+    Load the form data for many transactions of ``user``, ordered by date,
+    with one query (see load_render_contexts).
+
+    Returns:
+        list: (remitter_data, transaction_data) pairs.
+    """
+    return [
+        context.form_data
+        for context in load_render_contexts(db, user, transaction_ids, filters, limit)
+    ]
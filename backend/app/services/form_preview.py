@@ -0,0 +1,70 @@
+import html
+import re
+
+from ..models.beneficiary import Beneficiary
+from ..models.remitter import Remitter
+from .form_data import build_remitter_data, build_transaction_data
+from .pdf_generator import get_template_registry
+
+_TAG = re.compile(r'<[^>]+>')
+
+
+def load_preview_form_data(db, user, beneficiary_id=None, amount=None, cheque_number=None):
+    """
+    Build the form data for a transaction that has not been saved yet, with
+    the same builders the PDF is rendered from.
+
+    Returns:
+        tuple: (remitter_data, transaction_data), or None when the
+        beneficiary does not belong to ``user``.
+    """
+    beneficiary = None
+    if beneficiary_id is not None:
+        beneficiary = db.query(Beneficiary).filter(
+            Beneficiary.id == beneficiary_id,
+            Beneficiary.user_id == user.id
+        ).first()
+        if beneficiary is None:
+            return None
+
+    remitter = db.query(Remitter).filter(Remitter.user_id == user.id).first()
+    remitter_data = build_remitter_data(remitter, user, cheque_number)
+    transaction_data = build_transaction_data(beneficiary, amount)
+    return remitter_data, transaction_data
+
+
+def plain_label(label):
+    """Layout label markup (``<br/>``, ``<u>``) as plain text"""
+    return ' '.join(_TAG.sub(' ', label).split())
+
+
+def preview_fields(remitter_data, transaction_data):
+    """
+    The printed fields in form order, as dicts with ``section``, ``label``,
+    ``field`` and ``value``. Labels come from the layout of the remitter's bank
+    template; nothing is drawn.
+    """
+    layout = get_template_registry().resolve(remitter_data).layout
+    data = {"remitter": remitter_data, "transaction": transaction_data}
+    fields = []
+    for section in layout["sections"]:
+        values = data.get(section["source"], {})
+        for row in section["rows"]:
+            if "field" in row:
+                fields.append({
+                    "section": section["source"],
+                    "label": plain_label(row["label"]),
+                    "field": row["field"],
+                    "value": values.get(row["field"]) or '',
+                })
+    return fields
+
+
+def render_preview_html(fields):
+    """A small HTML table fragment of the preview fields"""
+    rows = ''.join(
+        f'<tr data-field="{html.escape(field["field"])}"><th>{html.escape(field["label"])}</th>'
+        f'<td>{html.escape(field["value"])}</td></tr>'
+        for field in fields
+    )
+    return f'<table class="rtgs-preview">{rows}</table>'
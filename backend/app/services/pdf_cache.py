@@ -0,0 +1,225 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import Future
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.transaction import Transaction
+from ..models.user import User
+from .artifact_storage import LocalArtifactStorage
+from .file_serving import remove_stored_file
+from .form_data import load_render_context
+from .pdf_generator import template_fingerprint
+from .pdf_pool import get_render_pool
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the rendered output changes for the same inputs (template
+# layout, fonts, ...) so old cache entries are no longer addressed.
+CACHE_VERSION = 2
+
+# Renders in flight, keyed by cache key: one concurrent.futures.Future per
+# key, shared by threads (get_or_render) and the event loop (get_or_render_async)
+_inflight_guard = threading.Lock()
+_inflight = {}
+
+
+def form_cache_key(remitter_data, transaction_data):
+    """Content address of a form: a hash over the template and everything printed on it"""
+    payload = json.dumps(
+        {
+            "v": CACHE_VERSION,
+            "template": template_fingerprint(remitter_data),
+            "remitter": remitter_data,
+            "transaction": transaction_data,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+_cache_storage = None
+
+
+def get_cache_storage():
+    """Local storage of the PDF cache, sharded by the first four hex digits of the key"""
+    global _cache_storage
+    if _cache_storage is None or _cache_storage.root != settings.pdf_cache_dir:
+        _cache_storage = LocalArtifactStorage(settings.pdf_cache_dir)
+    return _cache_storage
+
+
+def cache_path(key):
+    """Location of a cached PDF"""
+    return get_cache_storage().path(f"{key}.pdf")
+
+
+def make_etag(key):
+    """Strong ETag for a cached PDF"""
+    return f'"{key}"'
+
+
+def etag_matches(if_none_match, etag):
+    """Check an If-None-Match header value against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+def _store(key, data):
+    """Store a rendered PDF under its cache key; readers never observe a partial file"""
+    get_cache_storage().store_bytes(data, key=f"{key}.pdf")
+
+
+def _claim(key):
+    """Return the render in flight for ``key`` and whether the caller has to do it"""
+    with _inflight_guard:
+        pending = _inflight.get(key)
+        if pending is not None:
+            return pending, False
+        pending = _inflight[key] = Future()
+        return pending, True
+
+
+def _settle(key, pending, error=None):
+    """End a claimed render, handing its outcome to everyone waiting on it"""
+    with _inflight_guard:
+        if _inflight.get(key) is pending:
+            del _inflight[key]
+    if error is None:
+        pending.set_result(None)
+    else:
+        pending.set_exception(error)
+
+
+def get_or_render(remitter_data, transaction_data):
+    """
+    Return (key, path) of the cached PDF for the given form data, rendering it
+    first if needed.
+
+    Concurrent callers asking for the same uncached form share one render,
+    whether they run on threads or on the event loop: the first renders
+    while the rest wait for it and then find the file in place.
+    """
+    key = form_cache_key(remitter_data, transaction_data)
+    path = cache_path(key)
+    if os.path.exists(path):
+        return key, path
+
+    pending, owner = _claim(key)
+    if not owner:
+        pending.result()
+        return key, path
+    try:
+        if not os.path.exists(path):
+            _store(key, get_render_pool().render_sync(remitter_data, transaction_data))
+    except BaseException as e:
+        _settle(key, pending, e)
+        raise
+    _settle(key, pending)
+    return key, path
+
+
+async def _render_to_cache(remitter_data, transaction_data, key, path):
+    if os.path.exists(path):
+        return
+    data = await get_render_pool().render(remitter_data, transaction_data)
+    await run_in_threadpool(_store, key, data)
+
+
+def _settle_from_task(key, pending, task):
+    _settle(key, pending, asyncio.CancelledError() if task.cancelled() else task.exception())
+
+
+async def get_or_render_async(remitter_data, transaction_data):
+    """
+    Event-loop counterpart of get_or_render: renders through the process pool
+    and joins a render of the same uncached form already in flight, from
+    another request or from a background thread.
+    """
+    key = form_cache_key(remitter_data, transaction_data)
+    path = cache_path(key)
+    if os.path.exists(path):
+        return key, path
+
+    pending, owner = _claim(key)
+    if owner:
+        task = asyncio.ensure_future(_render_to_cache(remitter_data, transaction_data, key, path))
+        task.add_done_callback(lambda done: _settle_from_task(key, pending, done))
+    # Shielded so one caller going away does not cancel the others' render
+    await asyncio.shield(asyncio.wrap_future(pending))
+    return key, path
+
+
+def _record_pdf_path(transaction, path, db):
+    if transaction.pdf_path != path:
+        transaction.pdf_path = path
+        db.commit()
+
+
+async def get_cached_transaction_pdf_async(context, db):
+    """Event-loop counterpart of get_cached_transaction_pdf"""
+    key, path = await get_or_render_async(*context.form_data)
+    _record_pdf_path(context.transaction, path, db)
+    return key, path
+
+
+def get_cached_transaction_pdf(context, db):
+    """
+    Return (key, path) of the PDF for a transaction's RenderContext, rendering
+    on a cache miss and recording the location in ``Transaction.pdf_path``.
+    """
+    key, path = get_or_render(*context.form_data)
+    _record_pdf_path(context.transaction, path, db)
+    return key, path
+
+
+def prerender_transaction_pdf(bind, transaction_id, user_id):
+    """
+    Background task: render a new transaction's PDF into the cache ahead of
+    its first download. Uses its own session on ``bind`` because the request
+    session is closed by then. Failures are only logged; the download then
+    renders on demand as usual.
+    """
+    db = Session(bind=bind, autoflush=False)
+    try:
+        user = db.get(User, user_id)
+        context = load_render_context(db, user, transaction_id) if user is not None else None
+        if context is None:
+            return
+        get_cached_transaction_pdf(context, db)
+    except Exception:
+        logger.exception("Pre-rendering PDF for transaction %s failed", transaction_id)
+    finally:
+        db.close()
+
+
+def invalidate_cached_pdfs(db, *criteria):
+    """
+    Drop cached PDFs of the transactions matching ``criteria`` and clear their
+    ``pdf_path``. Call before committing an edit to data printed on the form.
+    """
+    rows = db.query(Transaction.id, Transaction.pdf_path).filter(
+        Transaction.pdf_path.isnot(None),
+        *criteria
+    ).all()
+    if not rows:
+        return 0
+
+    for path in {row.pdf_path for row in rows}:
+        remove_stored_file(path)
+
+    db.query(Transaction).filter(
+        Transaction.id.in_([row.id for row in rows])
+    ).update({Transaction.pdf_path: None}, synchronize_session=False)
+    return len(rows)
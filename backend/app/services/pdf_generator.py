@@ -1,15 +1,680 @@
 # rtgs_dynamic_form.py
 # This version is updated to accept and display dynamic data in the specified template.
+import copy
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from reportlab import rl_config
 from reportlab.pdfgen import canvas
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import inch
-from reportlab.platypus import Table, TableStyle, Paragraph
+from reportlab.platypus import Paragraph
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from io import BytesIO
-from ..models.remitter import Remitter
-from ..utils.amount_to_words import amount_to_words
+from ..config import settings
+from . import pdf_timing
+from .form_data import load_render_context, prepare_form_data
+from .pdf_overlay import get_overlay_form, overlay_version
+
+logger = logging.getLogger(__name__)
+
+if settings.pdf_compact_output:
+    # Flate-compressed streams are written as binary; ASCII85 on top of them
+    # only makes every stream a quarter larger. (A process-wide ReportLab
+    # option: it is read when a document is saved.)
+    rl_config.useA85 = 0
+
+def new_canvas(output, pagesize=A4):
+    """
+    Canvas for form output. In compact mode (``settings.pdf_compact_output``)
+    the document has invariant metadata and ID, so the same form always
+    produces the same bytes, and its page streams are compressed.
+    """
+    if settings.pdf_compact_output:
+        return canvas.Canvas(output, pagesize=pagesize, invariant=1, pageCompression=1)
+    return canvas.Canvas(output, pagesize=pagesize)
+
+
+PAGE_WIDTH, PAGE_HEIGHT = A4
+COL_WIDTHS = (2.7 * inch, 4.3 * inch)
+TABLE_WIDTH = sum(COL_WIDTHS)
+CELL_LEFT_PADDING = 5
+CELL_RIGHT_PADDING = 5
+CELL_TOP_PADDING = 3
+CELL_BOTTOM_PADDING = 3
+GRID_WEIGHT = 0.5
+# Height ReportLab gives an empty plain-string table cell (default cell leading)
+EMPTY_CELL_HEIGHT = 12
+
+# Declarative description of the RTGS form. Everything except the ``field``
+# values is static and is compiled once by RTGSFormTemplate.
+RTGS_FORM_LAYOUT = {
+    "header": [
+        ("RTGS", "Helvetica-Bold", 10),
+        ("Prime Co-op. Bank Ltd", "Helvetica-Bold", 10),
+        ("JAHANGIRPURA Branch", "Helvetica-Bold", 9),
+    ],
+    "title": "<u>NEFT/RTGS Applications From</u>",
+    "subtitle": "Remitter's/Initiator's Information",
+    "sections": [
+        {
+            "source": "remitter",
+            "rows": [
+                {"label": "Account with Branch", "field": "account_with_branch"},
+                {"label": "Name of Remitter/s", "field": "name"},
+                {"label": "A/C No. of Remitter/s", "field": "account_no"},
+                {"label": "Mobile No of Remitter/s", "field": "mobile"},
+                {"label": "Pan No", "field": "pan"},
+                {"label": "Signature of Remitter/s", "text": "[X]<br/>[X]"},
+                {"label": "Cheque No.", "field": "cheque_no"},
+            ],
+        },
+        {
+            "source": "transaction",
+            "checkbox": True,
+            "rows": [
+                {"span": "Beneficiary's Information", "style": "section"},
+                {"label": "Beneficiary Party's Name", "field": "beneficiary_name"},
+                {"label": "Beneficiary Bank", "field": "beneficiary_bank"},
+                {"label": "Beneficiary A/C No", "field": "beneficiary_account_no"},
+                {"label": "Beneficiary Bank's Branch & its<br/>Address", "field": "beneficiary_address"},
+                {"label": "Beneficiary Bank's IFSC Code", "field": "beneficiary_ifsc"},
+                {"label": "Amount In Figure", "field": "amount_fig"},
+                {"label": "Amount In Words", "field": "amount_words"},
+                {"label": "if available, please submit<br/>Beneficiary party's Pan Card No", "blank": True},
+                {"label": "Mobile No", "field": "beneficiary_mobile"},
+                {"span": "--> Please ensure all above information filled correctly bank is not responsible for it <--", "style": "disclaimer"},
+                {"span": """All the input provided above including beneficiary's name are as per bank record & I/We here by
+                   authorize you to debit my account and proceed further for NEFT/RTGS/Electronic Fund Trf.""", "style": "footer", "top_padding": 10},
+                {"span": "[X]__________________<br/><br/>[X]__________________", "style": "footer", "bottom_padding": 10},
+                {"span": "For Bank Use Only", "style": "section"},
+                {"labels": ["Posted By", "Verified By"]},
+            ],
+        },
+    ],
+}
+
+
+def build_form_styles():
+    """Build the paragraph styles used by the RTGS form"""
+    styles = getSampleStyleSheet()
+    underlined_style = ParagraphStyle('underline_header', parent=styles['Normal'], fontName='Helvetica', fontSize=12, alignment=TA_CENTER, leading=15)
+    underlined_style.textColor = colors.blue
+    footer_style = ParagraphStyle('footer', parent=styles['Normal'], fontName='Helvetica', fontSize=8, alignment=TA_LEFT)
+    return {
+        "title": underlined_style,
+        "section": ParagraphStyle('section', parent=styles['Normal'], fontName='Helvetica-Bold', fontSize=9, alignment=TA_CENTER, spaceBefore=6, spaceAfter=6),
+        "label": ParagraphStyle('label', parent=styles['Normal'], fontName='Helvetica', fontSize=9, alignment=TA_LEFT),
+        "footer": footer_style,
+        "disclaimer": ParagraphStyle('disclaimer', parent=footer_style, alignment=TA_CENTER),
+        # Style for the dynamic data, making it bold
+        "data": ParagraphStyle('data', parent=styles['Normal'], fontName='Helvetica-Bold', fontSize=9, alignment=TA_LEFT),
+    }
+
+
+def _wrapped(paragraph, width):
+    """Wrap a paragraph once so it can be drawn repeatedly without re-parsing"""
+    paragraph.wrap(width, PAGE_HEIGHT)
+    return paragraph
+
+
+def _draw_paragraph(c, paragraph, x, y):
+    if isinstance(paragraph, _TextLine):
+        paragraph.drawOn(c, x, y)
+        return
+    # drawOn() stores the canvas on the flowable, so draw a shallow copy to keep
+    # the shared pre-wrapped paragraphs safe to use from several threads.
+    copy.copy(paragraph).drawOn(c, x, y)
+
+
+# Characters that make Paragraph interpret its text as markup or entities
+_MARKUP_CHARS = frozenset('<>&')
+
+
+class _TextLine:
+    """
+    A value that fits on one line, drawn with drawString instead of a
+    Paragraph. It has the height and baseline a one-line Paragraph in the same
+    style would have, so the page looks the same without running the markup
+    parser and line breaker.
+    """
+
+    __slots__ = ('text', 'style', 'height')
+
+    def __init__(self, text, style):
+        self.text = text
+        self.style = style
+        self.height = style.leading if text else 0
+
+    @classmethod
+    def fit(cls, value, style, width):
+        """Return a _TextLine for ``value`` if it is plain text that fits in
+        ``width`` on one line of a left-aligned style, else None (the caller
+        uses a Paragraph)"""
+        if style.alignment != TA_LEFT or style.leftIndent or style.firstLineIndent:
+            return None
+        if _MARKUP_CHARS.intersection(value):
+            return None
+        # Paragraph collapses runs of whitespace into single spaces
+        text = ' '.join(value.split())
+        # Leave a small margin so values right at the edge go to Paragraph
+        if stringWidth(text, style.fontName, style.fontSize) > width - 0.01:
+            return None
+        return cls(text, style)
+
+    def drawOn(self, c, x, y):
+        batch = _TextBatch()
+        batch.add(self, x, y)
+        batch.draw(c)
+
+
+class _TextBatch:
+    """
+    Collects _TextLines and draws them as one text object, switching font and
+    colour only when they change, instead of a save/colour/font/text/restore
+    sequence per line.
+    """
+
+    __slots__ = ('items',)
+
+    def __init__(self):
+        self.items = []
+
+    def add(self, line, x, y):
+        if line.text:
+            self.items.append((line, x, y))
+
+    def draw(self, c):
+        if not self.items:
+            return
+        c.saveState()
+        text = c.beginText()
+        font = color = None
+        for line, x, y in self.items:
+            style = line.style
+            if (style.fontName, style.fontSize) != font:
+                font = (style.fontName, style.fontSize)
+                text.setFont(style.fontName, style.fontSize)
+            if style.textColor != color:
+                color = style.textColor
+                text.setFillColor(color)
+            text.setTextOrigin(x, y + line.height - style.fontSize)
+            text.textOut(line.text)
+        c.drawText(text)
+        c.restoreState()
+
+
+class _FormRow:
+    """One compiled table row: its cells and, for static rows, its height"""
+
+    def __init__(self, cells, field=None, spanned=False, top_padding=CELL_TOP_PADDING, bottom_padding=CELL_BOTTOM_PADDING):
+        # cells: list of (x offset, column width, pre-wrapped paragraph or None)
+        self.cells = cells
+        self.field = field
+        self.spanned = spanned
+        self.top_padding = top_padding
+        self.bottom_padding = bottom_padding
+        self.height = None if field else self.measure(None)
+
+    def measure(self, value_paragraph):
+        """Row height the way ReportLab's Table sizes a row of flowables"""
+        height = 0
+        for _, _, paragraph in self.cells:
+            content = EMPTY_CELL_HEIGHT if paragraph is None else paragraph.height
+            height = max(height, content + self.top_padding + self.bottom_padding)
+        if value_paragraph is not None:
+            height = max(height, value_paragraph.height + self.top_padding + self.bottom_padding)
+        return height
+
+    def draw(self, c, x, y, height, value_paragraph=None, batch=None):
+        """Draw the row's cells with the bottom edge at ``y`` (VALIGN MIDDLE).
+        One-line cells are added to ``batch`` when one is given."""
+        cells = self.cells
+        if value_paragraph is not None:
+            cells = cells + [(COL_WIDTHS[0], COL_WIDTHS[1], value_paragraph)]
+        for offset, _, paragraph in cells:
+            if paragraph is None:
+                continue
+            cell_y = y + (height + self.bottom_padding - self.top_padding - paragraph.height) / 2.0
+            if batch is not None and isinstance(paragraph, _TextLine):
+                batch.add(paragraph, x + offset + CELL_LEFT_PADDING, cell_y)
+            else:
+                _draw_paragraph(c, paragraph, x + offset + CELL_LEFT_PADDING, cell_y)
+
+
+class _FormSection:
+    """A compiled table of the form: static rows are measured once, and the
+    trailing run of static rows is drawn from a form XObject (or inline)."""
+
+    def __init__(self, name, spec, styles, fast_text=True):
+        self.name = name
+        self.fast_text = fast_text
+        self.source = spec["source"]
+        self.checkbox = spec.get("checkbox", False)
+        self.rows = [self._compile_row(row, styles) for row in spec["rows"]]
+        # Rows after the last dynamic one never move relative to each other
+        dynamic = [i for i, row in enumerate(self.rows) if row.field]
+        split = dynamic[-1] + 1 if dynamic else 0
+        self.body_rows = self.rows[:split]
+        self.footer_rows = self.rows[split:]
+        self.footer_height = sum(row.height for row in self.footer_rows)
+
+    def _static_cell(self, text, style, width):
+        """Compile a static cell: a _TextLine when it fits on one line, else a wrapped Paragraph"""
+        line = _TextLine.fit(text, style, width) if self.fast_text else None
+        return line or _wrapped(Paragraph(text, style), width)
+
+    def _compile_row(self, spec, styles):
+        label_width = COL_WIDTHS[0] - CELL_LEFT_PADDING - CELL_RIGHT_PADDING
+        value_width = COL_WIDTHS[1] - CELL_LEFT_PADDING - CELL_RIGHT_PADDING
+        if "span" in spec:
+            paragraph = self._static_cell(spec["span"], styles[spec.get("style", "label")],
+                                          TABLE_WIDTH - CELL_LEFT_PADDING - CELL_RIGHT_PADDING)
+            return _FormRow(
+                [(0, TABLE_WIDTH, paragraph)],
+                spanned=True,
+                top_padding=spec.get("top_padding", CELL_TOP_PADDING),
+                bottom_padding=spec.get("bottom_padding", CELL_BOTTOM_PADDING),
+            )
+        if "labels" in spec:
+            left, right = spec["labels"]
+            return _FormRow([
+                (0, COL_WIDTHS[0], self._static_cell(left, styles["label"], label_width)),
+                (COL_WIDTHS[0], COL_WIDTHS[1], self._static_cell(right, styles["label"], value_width)),
+            ])
+        cells = [(0, COL_WIDTHS[0], self._static_cell(spec["label"], styles["label"], label_width))]
+        if "field" in spec:
+            return _FormRow(cells, field=spec["field"])
+        if "text" in spec:
+            cells.append((COL_WIDTHS[0], COL_WIDTHS[1], self._static_cell(spec["text"], styles["data"], value_width)))
+        else:
+            cells.append((COL_WIDTHS[0], COL_WIDTHS[1], None))
+        return _FormRow(cells)
+
+    def layout(self, values, style):
+        """Wrap the dynamic values and return (value paragraphs, row heights)"""
+        value_width = COL_WIDTHS[1] - CELL_LEFT_PADDING - CELL_RIGHT_PADDING
+        paragraphs = []
+        heights = []
+        for row in self.body_rows:
+            if row.field:
+                value = values.get(row.field, '')
+                paragraph = _TextLine.fit(value, style, value_width) if self.fast_text else None
+                if paragraph is None:
+                    paragraph = _wrapped(Paragraph(value, style), value_width)
+                paragraphs.append(paragraph)
+                heights.append(row.measure(paragraph))
+            else:
+                paragraphs.append(None)
+                heights.append(row.height)
+        return paragraphs, heights
+
+    def draw_footer_form(self, c):
+        """Define the XObject holding the static trailing rows and their grid"""
+        c.beginForm(self.name, lowerx=-GRID_WEIGHT, lowery=-GRID_WEIGHT,
+                    upperx=TABLE_WIDTH + GRID_WEIGHT, uppery=self.footer_height + GRID_WEIGHT)
+        self._draw_footer(c)
+        c.endForm()
+
+    def _draw_footer(self, c):
+        """Draw the static trailing rows and their grid with the bottom edge at 0"""
+        y = self.footer_height
+        positions = []
+        batch = _TextBatch()
+        for row in self.footer_rows:
+            y -= row.height
+            row.draw(c, 0, y, row.height, batch=batch)
+            positions.append(y)
+        batch.draw(c)
+        self._draw_grid(c, 0, self.footer_rows, positions, self.footer_height, top_line=False)
+
+    @staticmethod
+    def _draw_grid(c, x, rows, positions, top, top_line=True):
+        """Draw a GRID table style: every row boundary, outer edges, and the
+        column divider wherever the row is not spanned"""
+        if not rows:
+            return
+        bottom = positions[-1]
+        c.saveState()
+        c.setLineCap(1)
+        c.setLineJoin(1)
+        c.setStrokeColor(colors.black)
+        c.setLineWidth(GRID_WEIGHT)
+        if top_line:
+            c.line(x, top, x + TABLE_WIDTH, top)
+        for y in positions:
+            c.line(x, y, x + TABLE_WIDTH, y)
+        c.line(x, bottom, x, top)
+        c.line(x + TABLE_WIDTH, bottom, x + TABLE_WIDTH, top)
+        divider = x + COL_WIDTHS[0]
+        row_top = top
+        segment_top = None
+        for row, y in zip(rows, positions):
+            if row.spanned:
+                if segment_top is not None:
+                    c.line(divider, row_top, divider, segment_top)
+                    segment_top = None
+            elif segment_top is None:
+                segment_top = row_top
+            row_top = y
+        if segment_top is not None:
+            c.line(divider, row_top, divider, segment_top)
+        c.restoreState()
+
+    def draw(self, c, x, top, values, style, shared=True):
+        """Draw the section with its top edge at ``top``; returns its bottom.
+        Without ``shared`` the static rows are drawn inline, not from the XObject."""
+        with pdf_timing.stage("layout"):
+            paragraphs, heights = self.layout(values, style)
+        with pdf_timing.stage("draw"):
+            body_height = sum(heights)
+            table_height = body_height + self.footer_height
+            y = top
+            positions = []
+            batch = _TextBatch()
+            for row, height, paragraph in zip(self.body_rows, heights, paragraphs):
+                y -= height
+                row.draw(c, x, y, height, paragraph, batch)
+                positions.append(y)
+            batch.draw(c)
+            self._draw_grid(c, x, self.body_rows, positions, top)
+            bottom = top - table_height
+            if self.footer_rows:
+                c.saveState()
+                c.translate(x, bottom)
+                if shared:
+                    c.doForm(self.name)
+                else:
+                    self._draw_footer(c)
+                c.restoreState()
+            if self.checkbox:
+                checkbox_y = bottom + table_height - (table_height / len(self.rows)) * 0.5
+                c.rect(x + TABLE_WIDTH + 0.1*inch, checkbox_y, 0.15*inch, 0.15*inch)
+        return bottom
+
+
+class RTGSFormTemplate:
+    """
+    Compiled RTGS form.
+
+    Styles, labels, static rows and their heights are built once; the header
+    and each table's trailing static rows become form XObjects that are
+    defined once per PDF document and reused by every page in it. A
+    single-page render draws them inline instead, since an XObject only pays
+    for itself once it is shared. Rendering a form only wraps and draws the
+    dynamic values. With ``fast_text`` (the default,
+    ``settings.pdf_fast_text``), values that fit on one line are drawn
+    directly and only longer ones go through Paragraph layout.
+    """
+
+    header_form = 'RTGSFormHeader'
+    section_gap = 0.25 * inch
+
+    def __init__(self, layout=RTGS_FORM_LAYOUT, name='rtgs', fast_text=None):
+        self.name = name
+        self.fast_text = settings.pdf_fast_text if fast_text is None else fast_text
+        self.styles = build_form_styles()
+        self.header = layout["header"]
+        self.title = _wrapped(Paragraph(layout["title"], self.styles["title"]), PAGE_WIDTH)
+        self.subtitle = layout["subtitle"]
+        self.sections = [
+            _FormSection(f'{name}Section{i}', spec, self.styles, self.fast_text)
+            for i, spec in enumerate(layout["sections"])
+        ]
+        # Header lines are 0.2in apart, followed by the title, subtitle and gap
+        self.body_top = PAGE_HEIGHT - 1 * inch - 0.2 * inch * (len(self.header) + 1) - 0.35 * inch
+
+    def _define_forms(self, c):
+        """Define this template's XObjects on the canvas's document, once"""
+        header_form = f'{self.name}{self.header_form}'
+        if c.hasForm(header_form):
+            return header_form
+        c.beginForm(header_form)
+        self._draw_header(c)
+        c.endForm()
+        for section in self.sections:
+            if section.footer_rows:
+                section.draw_footer_form(c)
+        return header_form
+
+    def _draw_header(self, c):
+        """Draw the header lines, title and subtitle in page coordinates"""
+        y_pos = PAGE_HEIGHT - 1 * inch
+        for text, font_name, font_size in self.header:
+            c.setFont(font_name, font_size)
+            c.drawCentredString(PAGE_WIDTH / 2.0, y_pos, text)
+            y_pos -= 0.2 * inch
+        _draw_paragraph(c, self.title, 0, y_pos)
+        y_pos -= 0.2 * inch
+        c.setFont('Helvetica-Bold', 9)
+        c.drawCentredString(PAGE_WIDTH / 2.0, y_pos, self.subtitle)
+
+    def draw_page(self, c, remitter_data, transaction_data, shared=True):
+        """
+        Draw one form onto the current page of ``c`` (does not call showPage).
+        With ``shared`` the static layer comes from the document's XObjects;
+        without it, it is drawn inline on the page.
+        """
+        c.setPageSize(A4)
+        with pdf_timing.stage("draw"):
+            if shared:
+                c.doForm(self._define_forms(c))
+            else:
+                c.saveState()
+                self._draw_header(c)
+                c.restoreState()
+        data = {"remitter": remitter_data, "transaction": transaction_data}
+        x_pos = (PAGE_WIDTH - TABLE_WIDTH) / 2
+        y_pos = self.body_top
+        for i, section in enumerate(self.sections):
+            if i:
+                y_pos -= self.section_gap
+            y_pos = section.draw(c, x_pos, y_pos, data[section.source], self.styles["data"], shared)
+
+    def render(self, remitter_data, transaction_data):
+        """Render a single-page PDF and return it in a BytesIO buffer"""
+        buffer = BytesIO()
+        c = new_canvas(buffer)
+        self.draw_page(c, remitter_data, transaction_data, shared=False)
+        c.showPage()
+        with pdf_timing.stage("save"):
+            c.save()
+        buffer.seek(0)
+        return buffer
+
+
+DEFAULT_TEMPLATE_ID = 'default'
+
+
+class _TemplateEntry:
+    """A registered layout; compiled into an RTGSFormTemplate on first use"""
+
+    def __init__(self, template_id, layout, version, path=None, match=None):
+        self.id = template_id
+        self.layout = layout
+        self.version = version
+        self.path = path
+        self.match = match or {}
+        self._template = None
+        self._lock = threading.Lock()
+
+    @property
+    def xobject_prefix(self):
+        # Unique per template version, so pages drawn with an old and a
+        # reloaded version of a template never share XObjects in one document
+        if self.id == DEFAULT_TEMPLATE_ID:
+            return 'rtgs'
+        return 'rtgs' + hashlib.sha1(f'{self.id}:{self.version}'.encode('utf-8')).hexdigest()[:10]
+
+    @property
+    def template(self):
+        if self._template is None:
+            with self._lock:
+                if self._template is None:
+                    self._template = RTGSFormTemplate(self.layout, name=self.xobject_prefix)
+        return self._template
+
+
+def load_template_file(path):
+    """
+    Read a bank template definition.
+
+    A template file is a JSON object with an ``id``, a ``match`` block with
+    ``ifsc_prefixes`` (4-letter IFSC bank codes) and/or ``banks`` (bank
+    names), and any of the RTGS_FORM_LAYOUT keys. Keys it leaves out are
+    taken from the default layout, so most banks only override ``header``.
+
+    Returns:
+        tuple: (template id, layout dict, match dict)
+    """
+    with open(path, encoding='utf-8') as fileobj:
+        spec = json.load(fileobj)
+    template_id = spec.get('id') or os.path.splitext(os.path.basename(path))[0]
+    layout = {key: spec.get(key, value) for key, value in RTGS_FORM_LAYOUT.items()}
+    layout['header'] = [tuple(line) for line in layout['header']]
+    return template_id, layout, spec.get('match', {})
+
+
+def _normalize_bank(name):
+    return ' '.join(name.lower().replace('.', ' ').split())
+
+
+class FormTemplateRegistry:
+    """
+    Bank-specific form templates, selected by the remitter's IFSC prefix or
+    bank name, with the built-in RTGS_FORM_LAYOUT as the fallback.
+
+    Definitions are ``*.json`` files in ``template_dir``. Each template is
+    compiled once, on first use, and kept until its file changes. The
+    directory is re-scanned at most every ``template_reload_interval``
+    seconds, so edited templates are picked up by running workers without a
+    restart. Lookups are dictionary hits, so rendering costs the same however
+    many templates are registered.
+    """
+
+    def __init__(self, template_dir=None, reload_interval=None):
+        self.template_dir = template_dir or settings.template_dir
+        self.reload_interval = settings.template_reload_interval if reload_interval is None else reload_interval
+        self.default = _TemplateEntry(DEFAULT_TEMPLATE_ID, RTGS_FORM_LAYOUT, '0')
+        self._entries = {}
+        self._by_ifsc = {}
+        self._by_bank = {}
+        self._signature = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def _scan(self):
+        try:
+            with os.scandir(self.template_dir) as entries:
+                files = sorted(
+                    (entry.path, entry.stat().st_mtime_ns)
+                    for entry in entries
+                    if entry.name.endswith('.json') and entry.is_file()
+                )
+        except FileNotFoundError:
+            files = []
+        return tuple(files)
+
+    def refresh(self, force=False):
+        """Reload template definitions whose files were added, changed or removed"""
+        now = time.monotonic()
+        if not force and self._checked_at is not None and now - self._checked_at < self.reload_interval:
+            return
+        with self._lock:
+            self._checked_at = now
+            signature = self._scan()
+            if signature == self._signature:
+                return
+
+            previous = {entry.path: entry for entry in self._entries.values()}
+            entries, by_ifsc, by_bank = {}, {}, {}
+            for path, mtime in signature:
+                version = str(mtime)
+                entry = previous.get(path)
+                if entry is None or entry.version != version:
+                    try:
+                        template_id, layout, match = load_template_file(path)
+                    except (OSError, ValueError, KeyError, TypeError) as e:
+                        logger.error("Skipping form template %s: %s", path, e)
+                        continue
+                    entry = _TemplateEntry(template_id, layout, version, path, match)
+                entries[entry.id] = entry
+                for prefix in entry.match.get('ifsc_prefixes', []):
+                    by_ifsc[prefix.upper()] = entry
+                for bank in entry.match.get('banks', []):
+                    by_bank[_normalize_bank(bank)] = entry
+
+            self._entries, self._by_ifsc, self._by_bank = entries, by_ifsc, by_bank
+            self._signature = signature
+
+    def resolve(self, remitter_data=None):
+        """Return the template entry for a remitter (default when nothing matches)"""
+        self.refresh()
+        if remitter_data:
+            ifsc = remitter_data.get('ifsc') or ''
+            entry = self._by_ifsc.get(ifsc[:4].upper())
+            if entry is None and remitter_data.get('bank'):
+                entry = self._by_bank.get(_normalize_bank(remitter_data['bank']))
+            if entry is not None:
+                return entry
+        return self.default
+
+    def template_for(self, remitter_data=None):
+        """
+        Return what draws a remitter's form: the bank's compiled template, or
+        the official form overlay when PDF_OVERLAY_FORM is set and no bank
+        template matches.
+        """
+        entry = self.resolve(remitter_data)
+        if entry is self.default:
+            overlay = get_overlay_form()
+            if overlay is not None:
+                return overlay
+        return entry.template
+
+    def get(self, template_id):
+        """Return a registered template entry by id, or None"""
+        if template_id == DEFAULT_TEMPLATE_ID:
+            return self.default
+        self.refresh()
+        return self._entries.get(template_id)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_template_registry():
+    """Return the process-wide form template registry"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = FormTemplateRegistry()
+    return _registry
+
+
+def get_form_template(remitter_data=None):
+    """Return the compiled form template (or official form overlay) for a remitter's bank"""
+    return get_template_registry().template_for(remitter_data)
+
+
+def template_fingerprint(remitter_data):
+    """Identifies the template version a form renders with (part of cache keys)"""
+    entry = get_template_registry().resolve(remitter_data)
+    if entry.id == DEFAULT_TEMPLATE_ID:
+        version = overlay_version()
+        if version is not None:
+            return f'overlay:{version}'
+    return f'{entry.id}:{entry.version}'
+
 
 def generate_dynamic_form(remitter_data, transaction_data):
     """
@@ -22,201 +687,83 @@ def generate_dynamic_form(remitter_data, transaction_data):
     Returns:
         BytesIO: A buffer containing the generated PDF in memory.
     """
-    # 1. --- Document Setup ---
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
+    return get_form_template(remitter_data).render(remitter_data, transaction_data)
 
-    # 2. --- Define Paragraph Styles ---
-    styles = getSampleStyleSheet()
-    underlined_style = ParagraphStyle('underline_header', parent=styles['Normal'], fontName='Helvetica', fontSize=12, alignment=TA_CENTER, leading=15)
-    underlined_style.textColor = colors.blue
-    section_style = ParagraphStyle('section', parent=styles['Normal'], fontName='Helvetica-Bold', fontSize=9, alignment=TA_CENTER, spaceBefore=6, spaceAfter=6)
-    label_style = ParagraphStyle('label', parent=styles['Normal'], fontName='Helvetica', fontSize=9, alignment=TA_LEFT)
-    footer_style = ParagraphStyle('footer', parent=styles['Normal'], fontName='Helvetica', fontSize=8, alignment=TA_LEFT)
-    disclaimer_style = ParagraphStyle('disclaimer', parent=footer_style, alignment=TA_CENTER)
-    # Style for the dynamic data, making it bold
-    data_style = ParagraphStyle('data', parent=styles['Normal'], fontName='Helvetica-Bold', fontSize=9, alignment=TA_LEFT)
+def render_forms(forms, output, progress=None):
+    """
+    Render many forms into one multi-page PDF written to ``output``.
 
-    # 3. --- Draw the Header Manually (as separate text) ---
-    y_pos = height - 1 * inch  # Starting y-position
-    
-    c.setFont('Helvetica-Bold', 10)
-    c.drawCentredString(width / 2.0, y_pos, 'RTGS')
-    y_pos -= 0.2 * inch
-    
-    c.setFont('Helvetica-Bold', 10)
-    c.drawCentredString(width / 2.0, y_pos, 'Prime Co-op. Bank Ltd')
-    y_pos -= 0.2 * inch
-    
-    c.setFont('Helvetica-Bold', 9)
-    c.drawCentredString(width / 2.0, y_pos, 'JAHANGIRPURA Branch')
-    y_pos -= 0.2 * inch
+    All pages share one canvas, so fonts and each template's static XObjects
+    are embedded once for the whole document.
 
-    p_underline = Paragraph('<u>NEFT/RTGS Applications From</u>', underlined_style)
-    p_underline.wrapOn(c, width, height)
-    p_underline.drawOn(c, 0, y_pos)
-    
-    # --- MODIFIED: Reduced this value to remove the space ---
-    y_pos -= 0.2 * inch 
-
-    c.setFont('Helvetica-Bold', 9)
-    c.drawCentredString(width / 2.0, y_pos, "Remitter's/Initiator's Information")
-
-    # --- Space below the header ---
-    y_pos -= 0.35 * inch
-
-    # 4. --- Prepare Data for the TWO Tables ---
-
-    # --- Data for the TOP table ---
-    # By wrapping all dynamic text in Paragraph objects, we ensure automatic text wrapping.
-    form_data_top = [
-        [Paragraph('Account with Branch', label_style), Paragraph(remitter_data.get('account_with_branch', ''), data_style)],
-        [Paragraph("Name of Remitter/s", label_style), Paragraph(remitter_data.get('name', ''), data_style)],
-        [Paragraph("A/C No. of Remitter/s", label_style), Paragraph(remitter_data.get('account_no', ''), data_style)],
-        [Paragraph("Mobile No of Remitter/s", label_style), Paragraph(remitter_data.get('mobile', ''), data_style)],
-        [Paragraph('Pan No', label_style), Paragraph(remitter_data.get('pan', ''), data_style)],
-        # Updated signature field - vertical layout with line break
-        [Paragraph('Signature of Remitter/s', label_style), Paragraph('[X]<br/>[X]', data_style)],
-        [Paragraph('Cheque No.', label_style), Paragraph(remitter_data.get('cheque_no', ''), data_style)],
-    ]
-
-    # --- Data for the BOTTOM table ---
-    form_data_bottom = [
-        [Paragraph("Beneficiary's Information", section_style)],
-        [Paragraph("Beneficiary Party's Name", label_style), Paragraph(transaction_data.get('beneficiary_name', ''), data_style)],
-        [Paragraph('Beneficiary Bank', label_style), Paragraph(transaction_data.get('beneficiary_bank', ''), data_style)],
-        [Paragraph('Beneficiary A/C No', label_style), Paragraph(transaction_data.get('beneficiary_account_no', ''), data_style)],
-        [Paragraph("Beneficiary Bank's Branch & its<br/>Address", label_style), Paragraph(transaction_data.get('beneficiary_address', ''), data_style)],
-        [Paragraph("Beneficiary Bank's IFSC Code", label_style), Paragraph(transaction_data.get('beneficiary_ifsc', ''), data_style)],
-        [Paragraph('Amount In Figure', label_style), Paragraph(transaction_data.get('amount_fig', ''), data_style)],
-        [Paragraph('Amount In Words', label_style), Paragraph(transaction_data.get('amount_words', ''), data_style)],
-        [Paragraph("if available, please submit<br/>Beneficiary party's Pan Card No", label_style), ''],
-        [Paragraph('Mobile No', label_style), Paragraph(transaction_data.get('beneficiary_mobile', ''), data_style)],
-        [Paragraph("--> Please ensure all above information filled correctly bank is not responsible for it <--", disclaimer_style)],
-        [Paragraph("""All the input provided above including beneficiary's name are as per bank record & I/We here by
-                   authorize you to debit my account and proceed further for NEFT/RTGS/Electronic Fund Trf.""", footer_style)],
-        [Paragraph('[X]__________________<br/><br/>[X]__________________', footer_style)],
-        [Paragraph("For Bank Use Only", section_style)],
-        [Paragraph('Posted By', label_style), Paragraph('Verified By', label_style)],
-    ]
-
-    # 5. --- Create and Draw the TOP Table ---
-    col_widths = [2.7*inch, 4.3*inch]
-    table_top = Table(form_data_top, colWidths=col_widths, rowHeights=None)
-    table_top.setStyle(TableStyle([
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 5),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 5),
-    ]))
-
-    table_width, table_height = table_top.wrapOn(c, width, height)
-    x_pos = (width - table_width) / 2
-    y_pos -= table_height 
-    table_top.drawOn(c, x_pos, y_pos)
-
-    # --- Space between the two tables ---
-    y_pos -= 0.25 * inch
-
-    # 6. --- Create and Draw the BOTTOM Table ---
-    table_bottom = Table(form_data_bottom, colWidths=col_widths, rowHeights=None)
-    table_bottom.setStyle(TableStyle([
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('SPAN', (0, 0), (1, 0)),
-        ('SPAN', (0, 10), (1, 10)),
-        ('SPAN', (0, 11), (1, 11)),
-        ('SPAN', (0, 12), (1, 12)),
-        ('SPAN', (0, 13), (1, 13)),
-        ('LEFTPADDING', (0, 0), (-1, -1), 5),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 5),
-        ('TOPPADDING', (0, 11), (1, 11), 10),
-        ('BOTTOMPADDING', (0, 12), (1, 12), 10),
-    ]))
-    
-    table_width, table_height = table_bottom.wrapOn(c, width, height)
-    y_pos -= table_height
-    table_bottom.drawOn(c, x_pos, y_pos)
+    Args:
+        forms (iterable): (remitter_data, transaction_data) pairs, one per page.
+        output (file-like): Binary file the finished PDF is written to.
+        progress (callable): Optional, called with the page count after each page.
 
-    num_rows_bottom = len(form_data_bottom)
-    checkbox_y = y_pos + table_height - (table_height / num_rows_bottom) * 0.5
-    c.rect(x_pos + table_width + 0.1*inch, checkbox_y, 0.15*inch, 0.15*inch)
+    Returns:
+        int: Number of pages rendered.
+    """
+    registry = get_template_registry()
+    overlay = get_overlay_form()
+    # Overlay pages get the official form merged underneath after drawing
+    target = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) if overlay else output
+    overlay_pages = set()
+    c = new_canvas(target)
+    pages = 0
+    for remitter_data, transaction_data in forms:
+        template = registry.template_for(remitter_data)
+        template.draw_page(c, remitter_data, transaction_data)
+        if getattr(template, 'needs_base', False):
+            overlay_pages.add(pages)
+        c.showPage()
+        pages += 1
+        if progress is not None:
+            progress(pages)
+    with pdf_timing.stage("save"):
+        c.save()
+    if overlay:
+        with target:
+            target.seek(0)
+            overlay.merge_base(target, output, overlay_pages)
+    return pages
+
+
+def render_form_bytes(remitter_data, transaction_data):
+    """Render a single form and return the PDF bytes (process pool entry point)"""
+    return generate_dynamic_form(remitter_data, transaction_data).getvalue()
+
+
+def render_forms_to_file(forms):
+    """
+    Render many forms into a new temporary file and return its path
+    (process pool entry point). The caller owns and removes the file.
+    """
+    fd, path = tempfile.mkstemp(prefix='rtgs_bulk_', suffix='.pdf')
+    try:
+        with os.fdopen(fd, 'wb') as output:
+            render_forms(forms, output)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
 
-    # 7. --- Save the PDF ---
-    c.showPage()
-    c.save()
-    buffer.seek(0)
-    return buffer
 
 def generate_rtgs_pdf(transaction, user, db):
     """
     Main function called by the API - uses the new template structure
     """
-    # Get beneficiary
-    beneficiary = transaction.beneficiary
-    
-    # Get remitter details
-    remitter = db.query(Remitter).filter(Remitter.user_id == user.id).first()
-    
-    # Prepare remitter data dictionary for the template
-    if remitter:
-        remitter_data = {
-            "account_with_branch": f'{remitter.bank_name} - {remitter.branch_name}' if remitter.bank_name and remitter.branch_name else '',
-            "name": remitter.account_name or '',
-            "account_no": remitter.account_number or '',
-            "mobile": remitter.mobile or '',
-            "pan": remitter.pan_number or '',
-            "cheque_no": transaction.cheque_number or ''
-        }
-    else:
-        remitter_data = {
-            "account_with_branch": '',
-            "name": user.name or '',
-            "account_no": '',
-            "mobile": '',
-            "pan": '',
-            "cheque_no": transaction.cheque_number or ''
-        }
-    
-    # Prepare transaction data dictionary for the template
-    amount_in_words = amount_to_words(float(transaction.amount))
-    beneficiary_address = f'{beneficiary.branch_name}'
-    if hasattr(beneficiary, 'bank_address') and beneficiary.bank_address:
-        beneficiary_address += f', {beneficiary.bank_address}'
-    
-    transaction_data = {
-        "beneficiary_name": beneficiary.name or '',
-        "beneficiary_bank": beneficiary.bank_name or '',
-        "beneficiary_account_no": beneficiary.account_number or '',
-        "beneficiary_address": beneficiary_address,
-        "beneficiary_ifsc": beneficiary.ifsc_code or '',
-        "amount_fig": f'{transaction.amount:,.2f}',
-        "amount_words": amount_in_words,
-        "beneficiary_mobile": beneficiary.mobile or ''
-    }
-    
-    # Use the new template function
+    remitter_data, transaction_data = prepare_form_data(transaction, user, db)
     return generate_dynamic_form(remitter_data, transaction_data)
 
 
 async def download_pdf(transaction_id: int, user, db):
     """Download PDF for a specific transaction"""
-    from sqlalchemy.orm import joinedload
-    from ..models.transaction import Transaction
-    
-    # Get transaction with beneficiary
-    transaction = db.query(Transaction).options(
-        joinedload(Transaction.beneficiary)
-    ).filter(
-        Transaction.id == transaction_id,
-        Transaction.user_id == user.id
-    ).first()
-    
-    if not transaction:
+    context = load_render_context(db, user, transaction_id)
+    if context is None:
         return None
     
-    return generate_rtgs_pdf(transaction, user, db)
+    return generate_dynamic_form(*context.form_data)
 
 
 # Main method for demonstration purposes
@@ -0,0 +1,302 @@
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.pdf_job import PdfJob
+from ..models.user import User
+from ..schemas.transaction_schema import TransactionFilter
+from .artifact_storage import apply_artifact_retention, get_artifact_storage
+from .form_data import load_bulk_form_data
+from .pdf_generator import render_forms
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+# Minimum seconds between progress writes to the database
+PROGRESS_INTERVAL = 0.5
+
+
+class PdfJobError(Exception):
+    """A job failure that retrying cannot fix; the job fails at once"""
+
+
+def write_job_artifact(write):
+    """
+    Store a job's artifact; ``write`` receives the open file. Returns the
+    storage key, shared by jobs whose output is identical.
+    """
+    return get_artifact_storage().store(write)
+
+
+def run_bulk_forms_job(db, job, params, report):
+    """Render the RTGS forms selected by ids or filters into one PDF"""
+    user = db.get(User, job.user_id)
+    filters = TransactionFilter(**params["filters"]) if params.get("filters") else None
+    limit = settings.pdf_job_max_forms
+    forms = load_bulk_form_data(
+        db,
+        user,
+        transaction_ids=params.get("transaction_ids"),
+        filters=filters,
+        limit=limit + 1
+    )
+    # Checked at submit time too; transactions may have changed since
+    if not forms:
+        raise PdfJobError("No transactions found")
+    if len(forms) > limit:
+        raise PdfJobError(f"Too many transactions for one PDF (maximum {limit})")
+
+    total = len(forms)
+    report(0, total)
+    return write_job_artifact(
+        lambda output: render_forms(forms, output, progress=lambda done: report(done, total))
+    )
+
+
+# Job kind -> handler(db, job, params, report) returning the artifact storage key
+JOB_HANDLERS = {
+    "bulk_forms": run_bulk_forms_job,
+}
+
+
+class PdfJobQueue:
+    """
+    Persistent queue for heavy PDF exports, stored in the ``pdf_jobs`` table.
+
+    Jobs survive restarts. Worker threads claim queued jobs with an atomic
+    UPDATE, report progress while they run and store the finished artifact
+    in the artifact storage. Failed jobs are retried with exponential
+    backoff up to ``max_attempts``; a PdfJobError fails the job at once. A
+    running job whose worker stopped reporting for ``pdf_job_lease_seconds``
+    (e.g. the process was killed) goes back to the queue. Finished jobs and
+    their artifacts are deleted once they expire; the storage retention
+    policy is applied along the way.
+
+    Workers run inside the API process (``pdf_job_workers`` threads) or as a
+    separate process with ``python -m app.services.pdf_jobs``.
+    """
+
+    def __init__(self, session_factory=SessionLocal, workers=None, poll_interval=None):
+        self.session_factory = session_factory
+        self.workers = settings.pdf_job_workers if workers is None else workers
+        self.poll_interval = settings.pdf_job_poll_interval if poll_interval is None else poll_interval
+        self._threads = []
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._last_maintenance = 0.0
+
+    # --- Producer side -------------------------------------------------
+
+    def submit(self, db, user, kind, params, max_attempts=None):
+        """Queue a job for ``user`` and wake the workers"""
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job = PdfJob(
+            user_id=user.id,
+            kind=kind,
+            params=json.dumps(params, default=str),
+            status=JOB_QUEUED,
+            max_attempts=max_attempts or settings.pdf_job_max_attempts,
+            available_at=datetime.utcnow()
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        self._wakeup.set()
+        return job
+
+    # --- Worker side ---------------------------------------------------
+
+    def start(self):
+        """Recover abandoned jobs and start the worker threads"""
+        self.recover()
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"pdf-job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _worker_loop(self):
+        while not self._stop.is_set():
+            did_work = False
+            try:
+                did_work = self.run_once()
+                if time.monotonic() - self._last_maintenance > settings.pdf_job_lease_seconds / 2:
+                    self._last_maintenance = time.monotonic()
+                    self.recover()
+                    self.cleanup_expired()
+                    apply_artifact_retention()
+            except Exception:
+                logger.exception("PDF job worker error")
+            if not did_work:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def recover(self):
+        """Requeue running jobs whose worker stopped reporting (crash or restart)"""
+        db = self.session_factory()
+        try:
+            stale = datetime.utcnow() - timedelta(seconds=settings.pdf_job_lease_seconds)
+            count = db.query(PdfJob).filter(
+                PdfJob.status == JOB_RUNNING,
+                PdfJob.updated_at < stale
+            ).update({
+                PdfJob.status: JOB_QUEUED,
+                PdfJob.available_at: datetime.utcnow(),
+                PdfJob.updated_at: datetime.utcnow()
+            }, synchronize_session=False)
+            db.commit()
+            return count
+        finally:
+            db.close()
+
+    def cleanup_expired(self):
+        """
+        Delete finished jobs past their TTL, and their artifacts unless a
+        live job produced the same output
+        """
+        db = self.session_factory()
+        try:
+            expired = db.query(PdfJob).filter(
+                PdfJob.expires_at.isnot(None),
+                PdfJob.expires_at < datetime.utcnow()
+            ).all()
+            keys = {job.result_path for job in expired if job.result_path}
+            for job in expired:
+                db.delete(job)
+            db.flush()
+            if keys:
+                shared = {
+                    row.result_path for row in
+                    db.query(PdfJob.result_path).filter(PdfJob.result_path.in_(keys)).distinct()
+                }
+                storage = get_artifact_storage()
+                for key in keys - shared:
+                    storage.delete(key)
+            db.commit()
+            return len(expired)
+        finally:
+            db.close()
+
+    def _claim(self, db):
+        """Atomically move the next due job from queued to running"""
+        while True:
+            now = datetime.utcnow()
+            candidate = db.query(PdfJob.id).filter(
+                PdfJob.status == JOB_QUEUED,
+                PdfJob.available_at <= now
+            ).order_by(PdfJob.available_at, PdfJob.id).first()
+            if candidate is None:
+                return None
+
+            claimed = db.query(PdfJob).filter(
+                PdfJob.id == candidate.id,
+                PdfJob.status == JOB_QUEUED
+            ).update({
+                PdfJob.status: JOB_RUNNING,
+                PdfJob.attempts: PdfJob.attempts + 1,
+                PdfJob.started_at: now,
+                PdfJob.updated_at: now
+            }, synchronize_session=False)
+            db.commit()
+            if claimed:
+                return db.get(PdfJob, candidate.id)
+
+    def run_once(self):
+        """Run the next due job, if any. Returns True when a job was run."""
+        db = self.session_factory()
+        try:
+            job = self._claim(db)
+            if job is None:
+                return False
+            self._execute(db, job)
+            return True
+        finally:
+            db.close()
+
+    def _execute(self, db, job):
+        job_id = job.id
+        last_write = [0.0]
+
+        def report(done, total):
+            now = time.monotonic()
+            if done < total and now - last_write[0] < PROGRESS_INTERVAL:
+                return
+            last_write[0] = now
+            job.progress = done
+            job.total = total
+            job.updated_at = datetime.utcnow()
+            db.commit()
+
+        try:
+            handler = JOB_HANDLERS[job.kind]
+            result_path = handler(db, job, json.loads(job.params), report)
+        except Exception as e:
+            logger.warning("PDF job %s failed on attempt %s: %s", job_id, job.attempts, e)
+            db.rollback()
+            job = db.get(PdfJob, job_id)
+            now = datetime.utcnow()
+            job.error = str(e)
+            if job.attempts < job.max_attempts and not isinstance(e, PdfJobError):
+                job.status = JOB_QUEUED
+                job.available_at = now + timedelta(seconds=settings.pdf_job_retry_delay * 2 ** (job.attempts - 1))
+            else:
+                job.status = JOB_FAILED
+                job.finished_at = now
+                job.expires_at = now + timedelta(hours=settings.pdf_job_ttl_hours)
+            db.commit()
+            return
+
+        now = datetime.utcnow()
+        job.status = JOB_SUCCEEDED
+        job.result_path = result_path
+        job.progress = job.total
+        job.error = None
+        job.finished_at = now
+        job.expires_at = now + timedelta(hours=settings.pdf_job_ttl_hours)
+        db.commit()
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Return the process-wide job queue"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = PdfJobQueue()
+    return _queue
+
+
+if __name__ == "__main__":
+    # Standalone worker process: python -m app.services.pdf_jobs
+    from ..database import create_tables
+
+    logging.basicConfig(level=logging.INFO)
+    create_tables()
+    queue = PdfJobQueue(workers=max(settings.pdf_job_workers, 1))
+    queue.start()
+    print(f"PDF job worker running with {queue.workers} thread(s). Press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        queue.stop()
@@ -0,0 +1,241 @@
+import json
+import os
+import threading
+from io import BytesIO
+
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from ..config import settings
+from . import pdf_timing
+
+# Where the values go on the bank's official form: PDF coordinates (points
+# from the bottom-left) of each value's baseline. Measured on the layout of
+# "RTGS COMOON.pdf". ``width`` and ``max_lines`` bound wrapping values; text
+# that still does not fit is shrunk down to MIN_FONT_SIZE.
+OVERLAY_FIELDS = {
+    "remitter": {
+        "account_with_branch": {"x": 242.7, "y": 677.5},
+        "name": {"x": 242.7, "y": 662.3},
+        "account_no": {"x": 242.7, "y": 647.2},
+        "mobile": {"x": 242.7, "y": 632.1},
+        "pan": {"x": 242.7, "y": 617.0},
+        "cheque_no": {"x": 242.7, "y": 569.0},
+    },
+    "transaction": {
+        "beneficiary_name": {"x": 229.3, "y": 507.0},
+        "beneficiary_bank": {"x": 229.3, "y": 491.9},
+        "beneficiary_account_no": {"x": 229.3, "y": 474.6},
+        "beneficiary_address": {"x": 229.3, "y": 459.7, "max_lines": 3},
+        "beneficiary_ifsc": {"x": 229.3, "y": 418.7},
+        "amount_fig": {"x": 229.3, "y": 393.5},
+        "amount_words": {"x": 229.3, "y": 375.0, "size": 9, "leading": 10, "max_lines": 2},
+        "beneficiary_mobile": {"x": 229.3, "y": 320.4},
+    },
+}
+
+# Name of the official page's Form XObject in the generated pages
+OFFICIAL_FORM_NAME = '/RTGSOfficialForm'
+
+FIELD_DEFAULTS = {"font": "Helvetica-Bold", "size": 10, "width": 290, "max_lines": 1}
+MIN_FONT_SIZE = 6
+
+def _import_pypdf():
+    try:
+        import pypdf
+    except ImportError:
+        raise RuntimeError("Overlay rendering needs the pypdf package: pip install pypdf")
+    return pypdf
+
+
+def add_indirect_object(writer, obj):
+    """
+    Add ``obj`` to ``writer`` as an indirect object and return its reference.
+
+    The official form has to be one indirect XObject that every page refers
+    to; merge_page would copy it into each page instead. pypdf releases that
+    have a public PdfWriter.add_object get that; older ones, including the
+    3.x pinned in requirements.txt, only have the private _add_object, which
+    is used here and only here.
+    """
+    add = getattr(writer, 'add_object', None) or getattr(writer, '_add_object', None)
+    if add is None:
+        raise RuntimeError(
+            f"pypdf {_import_pypdf().__version__} has no PdfWriter.add_object or _add_object; "
+            "overlay rendering needs one of them"
+        )
+    return add(obj)
+
+
+def fit_lines(text, font, size, width, max_lines):
+    """Split ``text`` into at most ``max_lines`` lines of ``width``, shrinking
+    the font size if needed. Returns (lines, font size)."""
+    text = ' '.join(text.split())
+    while True:
+        if max_lines == 1:
+            if stringWidth(text, font, size) <= width or size <= MIN_FONT_SIZE:
+                return [text], size
+        else:
+            lines = simpleSplit(text, font, size, width)
+            if len(lines) <= max_lines or size <= MIN_FONT_SIZE:
+                return lines[:max_lines], size
+        size -= 0.5
+
+
+class OverlayForm:
+    """
+    Fills the bank's official RTGS form instead of drawing a lookalike.
+
+    The official PDF is parsed once and its page turned into a Form XObject.
+    Each form is drawn as an overlay holding only the values, at the
+    coordinates in ``fields``, and the official page is placed underneath by
+    reference. Every page of a document shares the one XObject, so a bulk
+    PDF carries the official form once plus a little text per page.
+    ``draw_page`` draws the overlay on any canvas, so multi-page documents
+    are built with the same canvas loop as the drawn templates and finished
+    in one pass (see merge_base).
+    """
+
+    needs_base = True
+
+    def __init__(self, form_path, fields=None):
+        pypdf = _import_pypdf()
+        self.form_path = form_path
+        self.base_page = pypdf.PdfReader(form_path).pages[0]
+        box = self.base_page.mediabox
+        self.pagesize = (float(box.width), float(box.height))
+        self.fields = fields or OVERLAY_FIELDS
+        self.xobject = self._build_xobject(pypdf, self.base_page)
+        # Cloning reads the official PDF's objects lazily from its file
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _build_xobject(pypdf, page):
+        """Turn the official page into a Form XObject stream"""
+        from pypdf.generic import DecodedStreamObject, NameObject
+
+        stream = DecodedStreamObject()
+        stream.set_data(page.get_contents().get_data())
+        stream = stream.flate_encode()
+        stream[NameObject('/Type')] = NameObject('/XObject')
+        stream[NameObject('/Subtype')] = NameObject('/Form')
+        stream[NameObject('/BBox')] = page.mediabox
+        stream[NameObject('/Resources')] = page['/Resources']
+        return stream
+
+    def draw_page(self, c, remitter_data, transaction_data):
+        """Draw the values for one form onto the current page of ``c``"""
+        with pdf_timing.stage("draw"):
+            c.setPageSize(self.pagesize)
+            data = {"remitter": remitter_data, "transaction": transaction_data}
+            for source, fields in self.fields.items():
+                values = data.get(source) or {}
+                for field, spec in fields.items():
+                    value = values.get(field)
+                    if value:
+                        self._draw_value(c, str(value), {**FIELD_DEFAULTS, **spec})
+
+    @staticmethod
+    def _draw_value(c, value, spec):
+        lines, size = fit_lines(value, spec["font"], spec["size"], spec["width"], spec["max_lines"])
+        leading = spec.get("leading", size * 1.2)
+        c.setFont(spec["font"], size)
+        y = spec["y"]
+        for line in lines:
+            c.drawString(spec["x"], y, line)
+            y -= leading
+
+    def merge_base(self, source, output, pages):
+        """
+        Copy the PDF in ``source`` to ``output``, putting the official form
+        underneath the pages whose indexes are in ``pages``.
+        """
+        pypdf = _import_pypdf()
+        with pdf_timing.stage("merge"):
+            reader = pypdf.PdfReader(source)
+            writer = pypdf.PdfWriter()
+            official = None
+            for index, page in enumerate(reader.pages):
+                page = writer.add_page(page)
+                if index in pages:
+                    if official is None:
+                        with self._lock:
+                            official = add_indirect_object(writer, self.xobject.clone(writer))
+                    self._underlay(writer, page, official)
+            writer.write(output)
+
+    @staticmethod
+    def _underlay(writer, page, official):
+        """Draw the official form XObject before the page's own content"""
+        from pypdf.generic import ArrayObject, DecodedStreamObject, DictionaryObject, NameObject
+
+        resources = DictionaryObject(page.get('/Resources', DictionaryObject()).get_object())
+        xobjects = DictionaryObject(resources.get('/XObject', DictionaryObject()).get_object())
+        xobjects[NameObject(OFFICIAL_FORM_NAME)] = official
+        resources[NameObject('/XObject')] = xobjects
+        page[NameObject('/Resources')] = resources
+
+        prefix = DecodedStreamObject()
+        prefix.set_data(f'q {OFFICIAL_FORM_NAME} Do Q\n'.encode('ascii'))
+        contents = ArrayObject([add_indirect_object(writer, prefix)])
+        existing = page.raw_get('/Contents')
+        if isinstance(existing.get_object(), ArrayObject):
+            contents.extend(existing.get_object())
+        else:
+            contents.append(existing)
+        page[NameObject('/Contents')] = contents
+
+    def render(self, remitter_data, transaction_data):
+        """Render a single filled form and return it in a BytesIO buffer"""
+        from .pdf_generator import new_canvas
+
+        overlay = BytesIO()
+        c = new_canvas(overlay, self.pagesize)
+        self.draw_page(c, remitter_data, transaction_data)
+        c.showPage()
+        with pdf_timing.stage("save"):
+            c.save()
+        buffer = BytesIO()
+        self.merge_base(overlay, buffer, {0})
+        buffer.seek(0)
+        return buffer
+
+
+def load_overlay_fields(path):
+    """Read field coordinates from a JSON file shaped like OVERLAY_FIELDS"""
+    with open(path, encoding='utf-8') as fileobj:
+        return json.load(fileobj)
+
+
+_overlay = None
+_overlay_key = None
+_overlay_lock = threading.Lock()
+
+
+def overlay_version():
+    """Version of the configured official form, or None when overlay mode is off"""
+    if not settings.pdf_overlay_form:
+        return None
+    stamps = [os.stat(settings.pdf_overlay_form).st_mtime_ns]
+    if settings.pdf_overlay_fields:
+        stamps.append(os.stat(settings.pdf_overlay_fields).st_mtime_ns)
+    return ':'.join(str(stamp) for stamp in stamps)
+
+
+def get_overlay_form():
+    """
+    Return the process-wide OverlayForm for ``settings.pdf_overlay_form``, or
+    None when overlay mode is off. Reparsed when the form or field file changes.
+    """
+    global _overlay, _overlay_key
+    version = overlay_version()
+    if version is None:
+        return None
+    key = (settings.pdf_overlay_form, settings.pdf_overlay_fields, version)
+    if _overlay_key != key:
+        with _overlay_lock:
+            if _overlay_key != key:
+                fields = load_overlay_fields(settings.pdf_overlay_fields) if settings.pdf_overlay_fields else None
+                _overlay = OverlayForm(settings.pdf_overlay_form, fields)
+                _overlay_key = key
+    return _overlay
@@ -0,0 +1,259 @@
+import asyncio
+import collections
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+from fastapi.concurrency import run_in_threadpool
+
+from ..config import settings
+from . import pdf_generator, pdf_timing
+
+
+class PdfRenderBusy(Exception):
+    """Raised when the render queue stays full for longer than the queue timeout"""
+
+
+class PdfRenderTimeout(Exception):
+    """Raised when a render does not finish within the render timeout"""
+
+
+def _init_worker():
+    """Pool initializer: import ReportLab and compile the form template up front"""
+    pdf_generator.get_form_template()
+
+
+def _warm_up():
+    return True
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _discard_result(work, timed, discard):
+    """Clean up after a finished render whose caller gave up on it"""
+    if discard is None or work.cancelled() or work.exception() is not None:
+        return
+    result = work.result()
+    discard(result[0] if timed else result)
+
+
+class _PendingSlots:
+    """
+    Bounded count of renders admitted to the pool, queued or running. Shared
+    by the event loop and background threads; waiters get slots in order.
+    """
+
+    def __init__(self, size):
+        self._free = size
+        self._lock = threading.Lock()
+        self._waiters = collections.deque()
+
+    def locked(self):
+        with self._lock:
+            return self._free == 0
+
+    def _enqueue(self):
+        """Take a free slot, or return a Future resolved once one is handed over"""
+        with self._lock:
+            if self._free and not self._waiters:
+                self._free -= 1
+                return None
+            waiter = Future()
+            self._waiters.append(waiter)
+            return waiter
+
+    def _abandon(self, waiter):
+        """Stop waiting; returns True when the slot was handed over meanwhile"""
+        with self._lock:
+            if waiter.done():
+                return True
+            self._waiters.remove(waiter)
+            return False
+
+    def acquire(self, timeout):
+        """Wait up to ``timeout`` seconds for a slot from a thread; returns whether one was taken"""
+        waiter = self._enqueue()
+        if waiter is None:
+            return True
+        try:
+            waiter.result(timeout)
+        except FutureTimeoutError:
+            return self._abandon(waiter)
+        return True
+
+    async def acquire_async(self, timeout):
+        """Event-loop counterpart of acquire"""
+        waiter = self._enqueue()
+        if waiter is None:
+            return True
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(waiter)), timeout)
+        except asyncio.TimeoutError:
+            return self._abandon(waiter)
+        except BaseException:
+            if self._abandon(waiter):
+                self.release()
+            raise
+        return True
+
+    def release(self):
+        with self._lock:
+            if self._waiters:
+                self._waiters.popleft().set_result(True)
+            else:
+                self._free += 1
+
+
+class PdfRenderPool:
+    """
+    Process pool that keeps CPU-bound ReportLab rendering off the event loop.
+
+    Only plain dicts go to the workers. Single forms come back as bytes, and
+    bulk documents are written to a temporary file whose path is returned.
+    Every render, from the event loop or from a background thread, is
+    admitted through one bounded queue (``pdf_pool_max_pending``); when it
+    stays full for ``pdf_pool_queue_timeout`` seconds the request is rejected
+    with PdfRenderBusy instead of piling up behind the backlog.
+
+    With ``pdf_pool_workers = 0`` everything renders in-process on a thread,
+    which is what tests and single-process setups use.
+    """
+
+    def __init__(self, workers=None, max_pending=None, queue_timeout=None, render_timeout=None):
+        self.workers = settings.pdf_pool_workers if workers is None else workers
+        self.max_pending = max_pending or settings.pdf_pool_max_pending
+        self.queue_timeout = settings.pdf_pool_queue_timeout if queue_timeout is None else queue_timeout
+        self.render_timeout = settings.pdf_render_timeout if render_timeout is None else render_timeout
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slots = _PendingSlots(self.max_pending)
+
+    def start(self):
+        """Start the worker processes and wait until every one is warmed up"""
+        if self.workers <= 0:
+            pdf_generator.get_form_template()
+            return
+        with self._lock:
+            if self._executor is not None:
+                return
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+            futures = [self._executor.submit(_warm_up) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _get_executor(self):
+        if self._executor is None:
+            self.start()
+        return self._executor
+
+    async def _run(self, fn, *args, discard=None):
+        # With timing on, the worker times its stages and sends them back
+        timed = pdf_timing.active()
+        if timed:
+            fn, args = pdf_timing.timed_call, (fn,) + args
+        slots = self._slots
+        with pdf_timing.stage("queue"):
+            if not await slots.acquire_async(self.queue_timeout):
+                raise PdfRenderBusy("PDF renderer is busy, please retry shortly")
+        try:
+            if self.workers <= 0:
+                work = asyncio.ensure_future(run_in_threadpool(fn, *args))
+            else:
+                work = asyncio.wrap_future(self._get_executor().submit(fn, *args))
+        except BaseException:
+            slots.release()
+            raise
+
+        # A running render cannot be cancelled, so its slot is held until it
+        # really ends, and the output of a render nobody waits for is discarded
+        abandoned = []
+
+        def finished(done):
+            slots.release()
+            if abandoned:
+                _discard_result(done, timed, discard)
+
+        work.add_done_callback(finished)
+        try:
+            with pdf_timing.stage("render"):
+                result = await asyncio.wait_for(asyncio.shield(work), self.render_timeout)
+        except asyncio.TimeoutError:
+            abandoned.append(True)
+            raise PdfRenderTimeout("PDF rendering timed out")
+        except BaseException:
+            abandoned.append(True)
+            raise
+        if timed:
+            result, durations = result
+            pdf_timing.merge(durations)
+        return result
+
+    async def render(self, remitter_data, transaction_data):
+        """Render one form from the event loop; returns the PDF bytes"""
+        return await self._run(pdf_generator.render_form_bytes, remitter_data, transaction_data)
+
+    async def render_many(self, forms):
+        """Render many forms into one PDF from the event loop; returns a temp file path"""
+        return await self._run(pdf_generator.render_forms_to_file, forms, discard=_remove_file)
+
+    def render_sync(self, remitter_data, transaction_data):
+        """
+        Render one form from a background thread; returns the PDF bytes. Takes
+        a slot of the same queue as render, so background renders cannot pile
+        up in front of interactive ones.
+        """
+        with pdf_timing.stage("queue"):
+            if not self._slots.acquire(self.queue_timeout):
+                raise PdfRenderBusy("PDF renderer is busy, please retry shortly")
+        if self.workers <= 0:
+            try:
+                with pdf_timing.stage("render"):
+                    return pdf_generator.render_form_bytes(remitter_data, transaction_data)
+            finally:
+                self._slots.release()
+        timed = pdf_timing.active()
+        args = (pdf_generator.render_form_bytes, remitter_data, transaction_data)
+        if timed:
+            args = (pdf_timing.timed_call,) + args
+        try:
+            future = self._get_executor().submit(*args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # Like in _run, the slot is held until the render really ends
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            with pdf_timing.stage("render"):
+                result = future.result(timeout=self.render_timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise PdfRenderTimeout("PDF rendering timed out")
+        if timed:
+            result, durations = result
+            pdf_timing.merge(durations)
+        return result
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool():
+    """Return the process-wide render pool"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PdfRenderPool()
+    return _pool
@@ -0,0 +1,197 @@
+import bisect
+import contextvars
+import logging
+import threading
+import time
+
+from starlette.datastructures import MutableHeaders
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in milliseconds
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+_current = contextvars.ContextVar("pdf_stage_timings", default=None)
+
+
+class StageTimings:
+    """Per-stage durations (seconds) collected while serving one request"""
+
+    def __init__(self):
+        self.durations = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def merge(self, durations):
+        for name, seconds in durations.items():
+            self.add(name, seconds)
+
+    def server_timing(self):
+        """Server-Timing header value, durations in milliseconds"""
+        return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.durations.items())
+
+
+class _Stage:
+    __slots__ = ("timings", "name", "start")
+
+    def __init__(self, timings, name):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timings.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name):
+    """
+    Context manager timing one pipeline stage. Costs a single context variable
+    lookup when no collector is active (timing disabled, or outside a request).
+    """
+    timings = _current.get()
+    if timings is None:
+        return _NO_STAGE
+    return _Stage(timings, name)
+
+
+def active():
+    """Whether stage timings are being collected in the current context"""
+    return _current.get() is not None
+
+
+def start():
+    """Start collecting stage timings in the current context"""
+    timings = StageTimings()
+    _current.set(timings)
+    return timings
+
+
+def merge(durations):
+    """Add durations measured elsewhere (e.g. in a pool worker) to the current request"""
+    timings = _current.get()
+    if timings is not None:
+        timings.merge(durations)
+
+
+def timed_call(fn, *args):
+    """
+    Run ``fn`` with its own collector and return (result, durations).
+    Render pool entry point: worker processes have no request context, so the
+    stage durations travel back with the result.
+    """
+    timings = StageTimings()
+    token = _current.set(timings)
+    try:
+        return fn(*args), timings.durations
+    finally:
+        _current.reset(token)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    def __init__(self, buckets=BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, ms):
+        index = bisect.bisect_left(self.buckets, ms)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_ms += ms
+
+    def snapshot(self):
+        """Cumulative bucket counts keyed by upper bound, Prometheus style"""
+        with self._lock:
+            counts = list(self.counts)
+            count, total_ms = self.count, self.total_ms
+        cumulative = {}
+        running = 0
+        for bound, bucket_count in zip(list(self.buckets) + ["+Inf"], counts):
+            running += bucket_count
+            cumulative[str(bound)] = running
+        return {"count": count, "sum_ms": round(total_ms, 3), "buckets": cumulative}
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def observe(timings):
+    """Record a finished request's stage durations in the histograms"""
+    for name, seconds in timings.durations.items():
+        histogram = _histograms.get(name)
+        if histogram is None:
+            with _histograms_lock:
+                histogram = _histograms.setdefault(name, Histogram())
+        histogram.observe(seconds * 1000)
+
+
+def histograms_snapshot():
+    """Aggregate per-stage histograms since process start"""
+    with _histograms_lock:
+        items = list(_histograms.items())
+    return {name: histogram.snapshot() for name, histogram in items}
+
+
+def reset_histograms():
+    with _histograms_lock:
+        _histograms.clear()
+
+
+class PdfTimingMiddleware:
+    """
+    ASGI middleware that collects stage timings for requests under ``prefix``
+    when ``settings.pdf_timing_enabled`` is on. The durations are sent as a
+    Server-Timing header, added to the histograms and, with
+    ``settings.pdf_timing_log``, logged.
+    """
+
+    def __init__(self, app, prefix="/api/pdf"):
+        self.app = app
+        self.prefix = prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.pdf_timing_enabled or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        timings = start()
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                timings.add("total", time.perf_counter() - started)
+                MutableHeaders(scope=message).append("Server-Timing", timings.server_timing())
+                observe(timings)
+                if settings.pdf_timing_log:
+                    logger.info("%s %s %s", scope["method"], scope["path"], timings.server_timing())
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
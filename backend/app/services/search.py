@@ -0,0 +1,179 @@
+"""
+Full-text search over transactions and beneficiaries.
+
+On SQLite the text is indexed in FTS5 tables kept in sync by triggers:
+``transactions_fts`` holds each transaction's beneficiary name, purpose and
+remarks under the transaction's id, and ``beneficiaries_fts`` each
+beneficiary's name, bank and branch under the beneficiary's id. Searches
+join them back to their table, so the usual user filters scope the results.
+Other databases fall back to LIKE over the same columns.
+
+The index is created, and filled from existing rows, by
+database.create_tables at startup. Rebuild it: python -m app.services.search
+"""
+import logging
+import re
+
+from sqlalchemy import column, literal_column, or_, table, text
+
+from ..models.beneficiary import Beneficiary
+from ..models.transaction import Transaction
+
+# Words of a search beyond this are ignored
+MAX_SEARCH_TERMS = 8
+
+_TOKENIZE = "tokenize='unicode61 remove_diacritics 2', prefix='2 3'"
+
+SEARCH_TABLES = {
+    "transactions_fts": f"CREATE VIRTUAL TABLE transactions_fts USING fts5(beneficiary_name, purpose, remarks, {_TOKENIZE})",
+    "beneficiaries_fts": f"CREATE VIRTUAL TABLE beneficiaries_fts USING fts5(name, bank_name, branch_name, {_TOKENIZE})",
+}
+
+SEARCH_TRIGGERS = {
+    "transactions_fts_insert": """
+        CREATE TRIGGER transactions_fts_insert AFTER INSERT ON transactions BEGIN
+            INSERT INTO transactions_fts (rowid, beneficiary_name, purpose, remarks) VALUES (
+                new.id, (SELECT name FROM beneficiaries WHERE id = new.beneficiary_id), new.purpose, new.remarks
+            );
+        END""",
+    "transactions_fts_update": """
+        CREATE TRIGGER transactions_fts_update AFTER UPDATE OF beneficiary_id, purpose, remarks ON transactions BEGIN
+            UPDATE transactions_fts SET
+                beneficiary_name = (SELECT name FROM beneficiaries WHERE id = new.beneficiary_id),
+                purpose = new.purpose,
+                remarks = new.remarks
+            WHERE rowid = new.id;
+        END""",
+    "transactions_fts_delete": """
+        CREATE TRIGGER transactions_fts_delete AFTER DELETE ON transactions BEGIN
+            DELETE FROM transactions_fts WHERE rowid = old.id;
+        END""",
+    "beneficiaries_fts_insert": """
+        CREATE TRIGGER beneficiaries_fts_insert AFTER INSERT ON beneficiaries BEGIN
+            INSERT INTO beneficiaries_fts (rowid, name, bank_name, branch_name)
+            VALUES (new.id, new.name, new.bank_name, new.branch_name);
+        END""",
+    # A renamed beneficiary is renamed in its transactions' entries too
+    "beneficiaries_fts_update": """
+        CREATE TRIGGER beneficiaries_fts_update AFTER UPDATE OF name, bank_name, branch_name ON beneficiaries BEGIN
+            UPDATE beneficiaries_fts SET name = new.name, bank_name = new.bank_name, branch_name = new.branch_name
+            WHERE rowid = new.id;
+            UPDATE transactions_fts SET beneficiary_name = new.name WHERE rowid IN (
+                SELECT id FROM transactions WHERE user_id = new.user_id AND beneficiary_id = new.id
+            );
+        END""",
+    "beneficiaries_fts_delete": """
+        CREATE TRIGGER beneficiaries_fts_delete AFTER DELETE ON beneficiaries BEGIN
+            DELETE FROM beneficiaries_fts WHERE rowid = old.id;
+        END""",
+}
+
+_POPULATE = (
+    "INSERT INTO transactions_fts (rowid, beneficiary_name, purpose, remarks) "
+    "SELECT t.id, b.name, t.purpose, t.remarks FROM transactions t LEFT JOIN beneficiaries b ON b.id = t.beneficiary_id",
+    "INSERT INTO beneficiaries_fts (rowid, name, bank_name, branch_name) "
+    "SELECT id, name, bank_name, branch_name FROM beneficiaries",
+)
+
+TRANSACTIONS_FTS = table("transactions_fts", column("rowid"), column("rank"))
+BENEFICIARIES_FTS = table("beneficiaries_fts", column("rowid"), column("rank"))
+
+
+def search_index_supported(conn):
+    return conn.dialect.name == "sqlite"
+
+
+def install_search_index(conn):
+    """
+    Create the search tables and triggers and index existing rows; returns
+    False when they already exist or the database is not SQLite.
+    """
+    if not search_index_supported(conn):
+        return False
+    existing = set(conn.execute(text(
+        "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')"
+    )).scalars())
+    if set(SEARCH_TABLES) | set(SEARCH_TRIGGERS) <= existing:
+        return False
+
+    drop_search_index(conn)
+    for ddl in [*SEARCH_TABLES.values(), *SEARCH_TRIGGERS.values()]:
+        conn.execute(text(ddl))
+    for statement in _POPULATE:
+        conn.execute(text(statement))
+    return True
+
+
+def drop_search_index(conn):
+    for name in SEARCH_TRIGGERS:
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+    for name in SEARCH_TABLES:
+        conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+
+
+def rebuild_search_index(conn):
+    """Recreate the search tables and triggers and index every row again"""
+    if not search_index_supported(conn):
+        return False
+    drop_search_index(conn)
+    return install_search_index(conn)
+
+
+def search_terms(q):
+    """The words of a search, at most MAX_SEARCH_TERMS"""
+    return re.findall(r"\w+", q or "")[:MAX_SEARCH_TERMS]
+
+
+def match_expression(terms):
+    """FTS5 query matching rows that contain every term as a word prefix"""
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _search(query, q, fts, name, id_column, like_columns):
+    terms = search_terms(q)
+    if not terms:
+        return query, None
+    if not search_index_supported(query.session.get_bind()):
+        for term in terms:
+            query = query.filter(or_(*(field.ilike(f"%{term}%") for field in like_columns)))
+        return query, None
+    query = query.join(fts, fts.c.rowid == id_column).filter(
+        literal_column(name).op("MATCH")(match_expression(terms))
+    )
+    return query, fts.c.rank
+
+
+def search_transactions(query, q):
+    """
+    Restrict a query joined to Beneficiary (see query_transaction_rows) to
+    transactions whose beneficiary name, purpose or remarks match every word
+    of ``q`` as a prefix.
+
+    Returns:
+        tuple: The query, and the column ordering matches best first (None
+        without the FTS index, or when ``q`` has no words).
+    """
+    return _search(
+        query, q, TRANSACTIONS_FTS, "transactions_fts", Transaction.id,
+        (Beneficiary.name, Transaction.purpose, Transaction.remarks)
+    )
+
+
+def search_beneficiaries(query, q):
+    """Restrict a Beneficiary query to name, bank or branch matches of ``q`` (see search_transactions)"""
+    return _search(
+        query, q, BENEFICIARIES_FTS, "beneficiaries_fts", Beneficiary.id,
+        (Beneficiary.name, Beneficiary.bank_name, Beneficiary.branch_name)
+    )
+
+
+if __name__ == "__main__":
+    # Rebuild the search index of the configured database: python -m app.services.search
+    from ..database import engine
+
+    logging.basicConfig(level=logging.INFO)
+    with engine.begin() as conn:
+        if not rebuild_search_index(conn):
+            raise SystemExit("Full-text search needs SQLite")
+        counts = [conn.execute(text(f"SELECT count(*) FROM {name}")).scalar() for name in SEARCH_TABLES]
+    print(f"Indexed {counts[0]} transaction(s) and {counts[1]} beneficiary(ies)")
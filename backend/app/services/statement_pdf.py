@@ -0,0 +1,322 @@
+import calendar
+import html
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+from sqlalchemy import func
+
+from ..config import settings
+from ..models.beneficiary import Beneficiary
+from ..models.remitter import Remitter
+from ..models.transaction import Transaction
+from ..utils.amount_to_words import format_indian, format_paise, from_paise
+from . import pdf_timing
+
+# Transactions read from the database per round trip
+CHUNK_SIZE = 500
+
+FONT = 'Helvetica'
+BOLD_FONT = 'Helvetica-Bold'
+FONT_SIZE = 8
+ROW_HEIGHT = 14
+CELL_PADDING = 3
+MARGIN = 15 * mm
+# Table cells are one line; longer text is cut to the column width
+TRANSACTION_COLUMNS = [("Date", 55), ("Beneficiary", 140), ("Bank", 120), ("A/C No", 90), ("Cheque No", 55), ("Amount", 75)]
+TOTAL_COLUMNS = [("Beneficiary", 160), ("Bank", 130), ("A/C No", 95), ("Count", 50), ("Amount", 100)]
+
+TABLE_STYLE = TableStyle([
+    ('FONT', (0, 0), (-1, -1), FONT, FONT_SIZE),
+    ('FONT', (0, 0), (-1, 0), BOLD_FONT, FONT_SIZE),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e8eef7')),
+    ('LINEBELOW', (0, 0), (-1, -1), 0.25, colors.grey),
+    ('ALIGN', (-1, 0), (-1, -1), 'RIGHT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('LEFTPADDING', (0, 0), (-1, -1), CELL_PADDING),
+    ('RIGHTPADDING', (0, 0), (-1, -1), CELL_PADDING),
+])
+
+
+def statement_period(start_date=None, end_date=None, year=None, month=None):
+    """
+    The statement period as a half-open datetime range and a label. Either
+    ``start_date`` and ``end_date`` (inclusive), or a ``year`` with an
+    optional ``month``.
+
+    Raises:
+        ValueError: When the period is missing or empty.
+    """
+    if start_date is not None or end_date is not None:
+        if start_date is None or end_date is None:
+            raise ValueError("Provide both start_date and end_date")
+        if end_date < start_date:
+            raise ValueError("end_date is before start_date")
+    elif year is not None:
+        if month is not None:
+            start_date = date(year, month, 1)
+            end_date = date(year, month, calendar.monthrange(year, month)[1])
+        else:
+            start_date, end_date = date(year, 1, 1), date(year, 12, 31)
+    else:
+        raise ValueError("Provide start_date and end_date, or year and month")
+
+    start = datetime.combine(start_date, datetime.min.time())
+    end = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+    label = f"{start_date:%d %b %Y} - {end_date:%d %b %Y}"
+    return start, end, label
+
+
+def _period_filter(query, user, start, end):
+    return query.filter(
+        Transaction.user_id == user.id,
+        Transaction.transaction_date >= start,
+        Transaction.transaction_date < end
+    )
+
+
+def statement_totals(db, user, start, end):
+    """
+    Per-beneficiary and grand totals for the period, summed exactly in
+    integer paise in SQL.
+
+    Returns:
+        tuple: (rows of (name, bank, account number, count, amount) ordered
+        by beneficiary name, (count, amount))
+    """
+    per_beneficiary = _period_filter(
+        db.query(
+            Beneficiary.name,
+            Beneficiary.bank_name,
+            Beneficiary.account_number,
+            func.count(Transaction.id),
+            func.sum(Transaction.amount_paise)
+        ).join(Beneficiary, Beneficiary.id == Transaction.beneficiary_id),
+        user, start, end
+    ).group_by(
+        Beneficiary.id, Beneficiary.name, Beneficiary.bank_name, Beneficiary.account_number
+    ).order_by(Beneficiary.name, Beneficiary.id).all()
+
+    count, paise = _period_filter(
+        db.query(func.count(Transaction.id), func.coalesce(func.sum(Transaction.amount_paise), 0)),
+        user, start, end
+    ).one()
+    per_beneficiary = [(*row[:4], from_paise(row[4])) for row in per_beneficiary]
+    return per_beneficiary, (count, from_paise(paise))
+
+
+def iter_statement_rows(db, user, start, end, chunk_size=CHUNK_SIZE):
+    """
+    The period's transactions in date order, as (date, beneficiary, bank,
+    account number, cheque number, amount in paise) tuples, fetched ``chunk_size``
+    rows at a time so memory stays flat however many there are.
+    """
+    query = _period_filter(
+        db.query(
+            Transaction.transaction_date,
+            Beneficiary.name,
+            Beneficiary.bank_name,
+            Beneficiary.account_number,
+            Transaction.cheque_number,
+            Transaction.amount_paise
+        ).join(Beneficiary, Beneficiary.id == Transaction.beneficiary_id),
+        user, start, end
+    ).order_by(Transaction.transaction_date, Transaction.id)
+    return query.yield_per(chunk_size)
+
+
+def _cell(text, width, font=FONT):
+    """``text`` cut with an ellipsis to fit a column of ``width`` points"""
+    text = ' '.join(str(text or '').split())
+    width -= 2 * CELL_PADDING
+    if stringWidth(text, font, FONT_SIZE) <= width:
+        return text
+    while text and stringWidth(text + '...', font, FONT_SIZE) > width:
+        text = text[:-1]
+    return text + '...'
+
+
+def _amount(value):
+    return format_indian(value or 0)
+
+
+def _table(header, rows, columns, bold_last_row=False):
+    widths = [width for _, width in columns]
+    table = Table([header] + rows, colWidths=widths, rowHeights=ROW_HEIGHT, repeatRows=1)
+    table.setStyle(TABLE_STYLE)
+    if bold_last_row:
+        table.setStyle([('FONT', (0, -1), (-1, -1), BOLD_FONT, FONT_SIZE), ('LINEABOVE', (0, -1), (-1, -1), 0.75, colors.black)])
+    return table
+
+
+class _LazyStory(list):
+    """
+    A flowable list the document template consumes from the front, filled
+    from an iterator as it empties. Only a couple of flowables exist at a
+    time instead of the whole story.
+    """
+
+    def __init__(self, flowables, lookahead=2):
+        super().__init__()
+        self._source = iter(flowables)
+        self._lookahead = lookahead
+
+    def _fill(self):
+        while self._source is not None and super().__len__() < self._lookahead:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+
+    def __len__(self):
+        self._fill()
+        return super().__len__()
+
+    def __getitem__(self, index):
+        self._fill()
+        return super().__getitem__(index)
+
+
+class StatementBuilder:
+    """
+    Multi-page statement of a user's RTGS transactions for a period: every
+    transaction, then totals per beneficiary and the grand total.
+
+    Rows are read in chunks and turned into one table per page as the
+    document is laid out, so a statement of tens of thousands of transactions
+    holds one page of rows at a time.
+    """
+
+    def __init__(self, db, user, start, end, period_label, chunk_size=CHUNK_SIZE):
+        self.db = db
+        self.user = user
+        self.start = start
+        self.end = end
+        self.period_label = period_label
+        self.chunk_size = chunk_size
+        self.styles = getSampleStyleSheet()
+
+    def heading(self):
+        remitter = self.db.query(Remitter).filter(Remitter.user_id == self.user.id).first()
+        name = remitter.account_name if remitter and remitter.account_name else self.user.name
+        details = [f"Period: {self.period_label}"]
+        if remitter and remitter.account_number:
+            details.insert(0, f"A/C No: {remitter.account_number}"
+                              + (f" - {remitter.bank_name}" if remitter.bank_name else ""))
+        return [
+            Paragraph("RTGS Statement", self.styles["Title"]),
+            Paragraph(html.escape(name or '', quote=False), self.styles["Heading3"]),
+            Paragraph(html.escape(" | ".join(details), quote=False), self.styles["Normal"]),
+            Spacer(1, 4 * mm),
+        ]
+
+    def transaction_tables(self, rows, first_page_rows, page_rows):
+        """Group rows into one table per page"""
+        header = [title for title, _ in TRANSACTION_COLUMNS]
+        batch, capacity = [], first_page_rows
+        for when, name, bank, account, cheque, paise in rows:
+            batch.append([
+                f'{when:%d-%m-%Y}',
+                _cell(name, TRANSACTION_COLUMNS[1][1]),
+                _cell(bank, TRANSACTION_COLUMNS[2][1]),
+                _cell(account, TRANSACTION_COLUMNS[3][1]),
+                _cell(cheque, TRANSACTION_COLUMNS[4][1]),
+                format_paise(paise),
+            ])
+            if len(batch) == capacity:
+                yield _table(header, batch, TRANSACTION_COLUMNS)
+                batch, capacity = [], page_rows
+        if batch:
+            yield _table(header, batch, TRANSACTION_COLUMNS)
+
+    def totals_table(self, totals, grand_total):
+        header = [title for title, _ in TOTAL_COLUMNS]
+        rows = [
+            [
+                _cell(name, TOTAL_COLUMNS[0][1]),
+                _cell(bank, TOTAL_COLUMNS[1][1]),
+                _cell(account, TOTAL_COLUMNS[2][1]),
+                str(count),
+                _amount(amount),
+            ]
+            for name, bank, account, count, amount in totals
+        ]
+        count, amount = grand_total
+        rows.append(["Grand total", "", "", str(count), _amount(amount)])
+        return _table(header, rows, TOTAL_COLUMNS, bold_last_row=True)
+
+    def story(self, frame_width, frame_height):
+        with pdf_timing.stage("db"):
+            totals, grand_total = statement_totals(self.db, self.user, self.start, self.end)
+        heading = self.heading()
+        yield from heading
+
+        if not grand_total[0]:
+            yield Paragraph("No transactions in this period.", self.styles["Normal"])
+            return
+
+        # Rows per page, so each page holds exactly one table and its header
+        page_rows = int(frame_height // ROW_HEIGHT) - 1
+        heading_height = sum(
+            f.wrap(frame_width, frame_height)[1] + f.getSpaceBefore() + f.getSpaceAfter() for f in heading
+        )
+        first_page_rows = max(int((frame_height - heading_height) // ROW_HEIGHT) - 1, 1)
+        yield from self.transaction_tables(
+            iter_statement_rows(self.db, self.user, self.start, self.end, self.chunk_size),
+            first_page_rows,
+            page_rows
+        )
+
+        yield Spacer(1, 6 * mm)
+        yield Paragraph("Totals by beneficiary", self.styles["Heading3"])
+        yield self.totals_table(totals, grand_total)
+
+    def _draw_footer(self, c, doc):
+        c.saveState()
+        c.setFont(FONT, 7)
+        c.setFillColor(colors.grey)
+        c.drawString(MARGIN, MARGIN / 2, f"RTGS Statement {self.period_label}")
+        c.drawRightString(A4[0] - MARGIN, MARGIN / 2, f"Page {doc.page}")
+        c.restoreState()
+
+    def build(self, output):
+        """Write the statement PDF to ``output`` (a path or binary file object)"""
+        doc = SimpleDocTemplate(
+            output,
+            pagesize=A4,
+            leftMargin=MARGIN,
+            rightMargin=MARGIN,
+            topMargin=MARGIN,
+            bottomMargin=MARGIN,
+            title="RTGS Statement",
+            invariant=1 if settings.pdf_compact_output else 0,
+            pageCompression=1,
+        )
+        # SimpleDocTemplate's frame has 6pt padding on every side
+        story = _LazyStory(self.story(doc.width - 12, doc.height - 12))
+        with pdf_timing.stage("draw"):
+            doc.build(story, onFirstPage=self._draw_footer, onLaterPages=self._draw_footer)
+        return doc.page
+
+
+def write_statement(db, user, start, end, period_label, output, chunk_size=CHUNK_SIZE):
+    """Build a user's statement for ``[start, end)`` into ``output``; returns the page count"""
+    return StatementBuilder(db, user, start, end, period_label, chunk_size).build(output)
+
+
+def write_statement_file(db, user, start, end, period_label):
+    """Build a user's statement into a temporary file and return its path"""
+    fd, path = tempfile.mkstemp(prefix="rtgs_statement_", suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as output:
+            write_statement(db, user, start, end, period_label, output)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
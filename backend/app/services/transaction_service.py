@@ -1,14 +1,19 @@
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import and_, extract, func, or_
 from sqlalchemy.orm import Session
 from ..models.transaction import Transaction
 from ..models.beneficiary import Beneficiary
-from ..utils.amount_to_words import amount_to_words
+from ..utils.amount_to_words import amount_to_words, from_paise, to_paise
+from ..utils.pagination import decode_cursor, encode_cursor
 
 
 def create_transaction_record(
     db: Session,
     user_id: int,
     beneficiary_id: int,
-    amount: float,
+    amount: Decimal,
     cheque_number: str = None,
     transaction_date = None,
     purpose: str = None,
@@ -36,3 +41,152 @@ def create_transaction_record(
     db.refresh(transaction)
     
     return transaction
+
+
+def period_range(year, month=None):
+    """Half-open [start, end) datetime range of a calendar year or month"""
+    if month is None:
+        return datetime(year, 1, 1), datetime(year + 1, 1, 1)
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start, end
+
+
+def period_criteria(month=None, year=None):
+    """
+    Criteria selecting transactions in a month and/or year. With a year they
+    are range conditions on transaction_date, so the (user_id,
+    transaction_date) index is used; a month without a year matches that
+    month of every year.
+    """
+    if year:
+        start, end = period_range(year, month or None)
+        return [Transaction.transaction_date >= start, Transaction.transaction_date < end]
+    if month:
+        return [extract('month', Transaction.transaction_date) == month]
+    return []
+
+
+def apply_transaction_filter(query, filters):
+    """Apply the fields of a TransactionFilter to a Transaction query"""
+    query = query.filter(*period_criteria(filters.month, filters.year))
+
+    if filters.beneficiary_id:
+        query = query.filter(Transaction.beneficiary_id == filters.beneficiary_id)
+
+    if filters.start_date:
+        query = query.filter(Transaction.transaction_date >= filters.start_date)
+
+    if filters.end_date:
+        query = query.filter(Transaction.transaction_date <= filters.end_date)
+
+    if filters.min_amount is not None:
+        query = query.filter(Transaction.amount_paise >= to_paise(filters.min_amount))
+
+    if filters.max_amount is not None:
+        query = query.filter(Transaction.amount_paise <= to_paise(filters.max_amount))
+
+    return query
+
+
+# Columns the transaction endpoints return, read in one joined query
+TRANSACTION_COLUMNS = (
+    Transaction.id,
+    Transaction.user_id,
+    Transaction.beneficiary_id,
+    Transaction.amount_paise,
+    Transaction.amount_in_words,
+    Transaction.cheque_number,
+    Transaction.transaction_date,
+    Transaction.transaction_reference,
+    Transaction.purpose,
+    Transaction.remarks,
+    Transaction.pdf_path,
+    Transaction.created_at,
+    Transaction.updated_at,
+)
+# Response field -> beneficiary column, labelled apart from the transaction's
+BENEFICIARY_COLUMNS = {
+    field: getattr(Beneficiary, field).label(f"beneficiary__{field}")
+    for field in ("id", "name", "bank_name", "account_number", "ifsc_code")
+}
+
+
+def query_transaction_rows(db: Session, user_id: int):
+    """
+    Query for a user's transactions together with their beneficiary's
+    columns: one joined, column-projected query however many rows it returns.
+    """
+    return db.query(*TRANSACTION_COLUMNS, *BENEFICIARY_COLUMNS.values()).outerjoin(
+        Beneficiary, Beneficiary.id == Transaction.beneficiary_id
+    ).filter(Transaction.user_id == user_id)
+
+
+def transaction_row_dict(row, beneficiary_fields=("id", "name", "bank_name")) -> dict:
+    """A row of query_transaction_rows as a transaction response with a beneficiary summary"""
+    data = {column.key: getattr(row, column.key) for column in TRANSACTION_COLUMNS}
+    data["amount"] = from_paise(data.pop("amount_paise"))
+    if row.beneficiary__id is None:
+        data["beneficiary"] = None
+    else:
+        data["beneficiary"] = {field: getattr(row, BENEFICIARY_COLUMNS[field].key) for field in beneficiary_fields}
+    return data
+
+
+# Orders a transaction listing can be sorted by: name -> sort key column.
+# Ties are broken by id in the same direction, so every order is total.
+# Beneficiary is outer-joined, so a missing one sorts (and pages) as ''.
+TRANSACTION_SORTS = {
+    "date": Transaction.transaction_date,
+    "amount": Transaction.amount_paise,
+    "beneficiary": func.coalesce(Beneficiary.name, ""),
+}
+
+
+def transaction_order(sort="date", order="desc"):
+    """ORDER BY clauses of a transaction listing sorted by ``sort``"""
+    key = TRANSACTION_SORTS[sort]
+    if order == "desc":
+        return [key.desc(), Transaction.id.desc()]
+    return [key.asc(), Transaction.id.asc()]
+
+
+def _sort_value(row, sort):
+    """The sort key of a query_transaction_rows row, as stored in cursors"""
+    if sort == "date":
+        return row.transaction_date.isoformat()
+    if sort == "amount":
+        return row.amount_paise
+    return row.beneficiary__name or ""
+
+
+def transaction_cursor(row, sort="date", order="desc") -> str:
+    """Cursor continuing a transaction listing after ``row``"""
+    return encode_cursor([sort, order, _sort_value(row, sort), row.id])
+
+
+def after_transaction_cursor(cursor: str, sort="date", order="desc"):
+    """
+    Criterion selecting the transactions after a cursor in the listing's
+    (sort key, id) order. The extra bound on the sort key alone lets the
+    database seek the matching index.
+
+    Raises:
+        ValueError: When the cursor is invalid or was made for another order.
+    """
+    cursor_sort, cursor_order, value, last_id = decode_cursor(cursor, 4)
+    if (cursor_sort, cursor_order) != (sort, order):
+        raise ValueError("Cursor does not match the sort order")
+    try:
+        if sort == "date":
+            value = datetime.fromisoformat(value)
+        elif not isinstance(value, int if sort == "amount" else str):
+            raise ValueError
+        last_id = int(last_id)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+    key = TRANSACTION_SORTS[sort]
+    if order == "desc":
+        return and_(key <= value, or_(key < value, Transaction.id < last_id))
+    return and_(key >= value, or_(key > value, Transaction.id > last_id))
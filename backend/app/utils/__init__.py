@@ -6,9 +6,20 @@ from .validators import (
     validate_email,
     clean_account_number,
     format_ifsc_code,
-    validate_cheque_number
+    validate_cheque_number,
+    validate_columns,
+    validate_rows
+)
+from .amount_to_words import (
+    amount_to_words,
+    amounts_to_words,
+    format_indian,
+    format_paise,
+    from_paise,
+    number_to_words,
+    paise_to_words,
+    to_paise
 )
-from .amount_to_words import amount_to_words, number_to_words
 
 __all__ = [
     "validate_ifsc_code",
@@ -19,6 +30,14 @@ __all__ = [
     "clean_account_number",
     "format_ifsc_code",
     "validate_cheque_number",
+    "validate_columns",
+    "validate_rows",
     "amount_to_words",
-    "number_to_words"
+    "amounts_to_words",
+    "format_indian",
+    "format_paise",
+    "from_paise",
+    "number_to_words",
+    "paise_to_words",
+    "to_paise"
 ]
\ No newline at end of file
@@ -1,103 +1,168 @@
-import math
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 
+_ONES = ['', 'One', 'Two', 'Three', 'Four', 'Five', 'Six', 'Seven', 'Eight', 'Nine']
+_TEENS = ['Ten', 'Eleven', 'Twelve', 'Thirteen', 'Fourteen', 'Fifteen',
+          'Sixteen', 'Seventeen', 'Eighteen', 'Nineteen']
+_TENS = ['', '', 'Twenty', 'Thirty', 'Forty', 'Fifty', 'Sixty', 'Seventy', 'Eighty', 'Ninety']
 
-def number_to_words(n):
-    """Convert a number to Indian currency words (0-99999999.99)"""
-    
-    def convert_hundreds(num):
-        """Convert a number less than 1000 to words"""
-        ones = ['', 'One', 'Two', 'Three', 'Four', 'Five', 'Six', 'Seven', 'Eight', 'Nine']
-        teens = ['Ten', 'Eleven', 'Twelve', 'Thirteen', 'Fourteen', 'Fifteen', 
-                'Sixteen', 'Seventeen', 'Eighteen', 'Nineteen']
-        tens = ['', '', 'Twenty', 'Thirty', 'Forty', 'Fifty', 'Sixty', 'Seventy', 'Eighty', 'Ninety']
-        
-        result = ''
-        
-        # Hundreds place
-        if num >= 100:
-            result += ones[num // 100] + ' Hundred '
-            num %= 100
-        
-        # Tens and ones place
-        if num >= 20:
-            result += tens[num // 10]
-            if num % 10 != 0:
-                result += ' ' + ones[num % 10]
-        elif num >= 10:
-            result += teens[num - 10]
-        elif num > 0:
-            result += ones[num]
-        
-        return result.strip()
-    
-    if n == 0:
+
+def _chunk_words(num):
+    """Words for a number less than 1000 ('' for zero)"""
+    words = []
+    if num >= 100:
+        words += [_ONES[num // 100], 'Hundred']
+        num %= 100
+    if num >= 20:
+        words.append(_TENS[num // 10])
+        if num % 10:
+            words.append(_ONES[num % 10])
+    elif num >= 10:
+        words.append(_TEENS[num - 10])
+    elif num > 0:
+        words.append(_ONES[num])
+    return ' '.join(words)
+
+
+# Words for every 0-999 chunk, built once at import
+CHUNK_WORDS = tuple(_chunk_words(num) for num in range(1000))
+
+# Indian scales above the last three digits, two digits each, lowest first
+SCALES = ('Thousand', 'Lakh', 'Crore', 'Arab', 'Kharab')
+
+# Largest amount with words: 99 Kharab 99 Arab ... 999 Rupees and 99 Paise
+MAX_PAISE = 10 ** (3 + 2 * len(SCALES)) * 100 - 1
+MAX_AMOUNT = Decimal(MAX_PAISE) / 100
+
+_CENT = Decimal('0.01')
+
+
+def to_paise(amount):
+    """
+    An amount in rupees (Decimal, int, float or numeric string) as integer
+    paise, rounded half up. Floats are read by their shortest representation,
+    so 0.29 is 29 paise rather than 28.999... paise.
+
+    Raises:
+        ValueError: When the amount is not a finite number.
+    """
+    if type(amount) is int:
+        return amount * 100
+    if type(amount) is float and abs(amount) < 2 ** 43:
+        # Most amounts have at most two decimals and round-trip exactly
+        paise = round(amount * 100)
+        if paise / 100 == amount:
+            return paise
+    try:
+        value = Decimal(repr(amount) if isinstance(amount, float) else amount)
+    except (InvalidOperation, TypeError):
+        raise ValueError(f"Not an amount: {amount!r}")
+    if not value.is_finite():
+        raise ValueError(f"Not an amount: {amount!r}")
+    return int(value.quantize(_CENT, rounding=ROUND_HALF_UP) * 100)
+
+
+def from_paise(paise):
+    """An amount in integer paise as exact rupees (a Decimal with two places)"""
+    return Decimal(paise).scaleb(-2)
+
+
+def _rupee_words(rupees):
+    """Words for a positive whole number of rupees, grouped the Indian way"""
+    rest, hundreds = divmod(rupees, 1000)
+    groups = []
+    for scale in SCALES:
+        if not rest:
+            break
+        rest, value = divmod(rest, 100)
+        if value:
+            groups.append(f'{CHUNK_WORDS[value]} {scale}')
+    groups.reverse()
+    if hundreds:
+        groups.append(CHUNK_WORDS[hundreds])
+    return ' '.join(groups)
+
+
+def paise_to_words(paise):
+    """Convert a non-negative amount in integer paise (up to MAX_PAISE) to Indian currency words"""
+    if paise == 0:
         return 'Zero Rupees Only'
-    
-    # Split into rupees and paise
-    rupees = int(n)
-    paise = round((n - rupees) * 100)
-    
-    result = ''
-    
-    if rupees > 0:
-        # Handle crores
-        if rupees >= 10000000:
-            crores = rupees // 10000000
-            result += convert_hundreds(crores) + ' Crore '
-            rupees %= 10000000
-        
-        # Handle lakhs
-        if rupees >= 100000:
-            lakhs = rupees // 100000
-            result += convert_hundreds(lakhs) + ' Lakh '
-            rupees %= 100000
-        
-        # Handle thousands
-        if rupees >= 1000:
-            thousands = rupees // 1000
-            result += convert_hundreds(thousands) + ' Thousand '
-            rupees %= 1000
-        
-        # Handle remaining hundreds, tens, and ones
-        if rupees > 0:
-            result += convert_hundreds(rupees) + ' '
-        
-        result += 'Rupees'
-        
-        # Handle paise
-        if paise > 0:
-            result += ' and ' + convert_hundreds(paise) + ' Paise'
-    else:
-        # Only paise
-        if paise > 0:
-            result = convert_hundreds(paise) + ' Paise'
-    
-    return result.strip() + ' Only'
+    rupees, paise = divmod(paise, 100)
+    if not rupees:
+        return f'{CHUNK_WORDS[paise]} Paise Only'
+    result = _rupee_words(rupees) + ' Rupees'
+    if paise:
+        result += f' and {CHUNK_WORDS[paise]} Paise'
+    return result + ' Only'
+
+
+def number_to_words(n):
+    """Convert a non-negative amount in rupees to Indian currency words"""
+    return paise_to_words(to_paise(n))
 
 
 def amount_to_words(amount):
     """
     Convert amount to Indian currency words
-    
+
     Args:
-        amount (float): Amount to convert (max 99999999.99)
-    
+        amount (Decimal, int or float): Amount in rupees (max MAX_AMOUNT)
+
     Returns:
         str: Amount in words
     """
-    if amount < 0:
+    paise = to_paise(amount)
+    if paise < 0:
         return "Invalid Amount"
-    
-    if amount > 99999999.99:
+
+    if paise > MAX_PAISE:
         return "Amount too large"
-    
-    return number_to_words(amount)
+
+    return paise_to_words(paise)
+
+
+def amounts_to_words(amounts):
+    """
+    Convert many amounts at once (bulk imports and exports). Repeated amounts
+    are converted once.
+
+    Returns:
+        list: Words for each amount, in order.
+    """
+    converted = {}
+    result = []
+    for amount in amounts:
+        words = converted.get(amount)
+        if words is None:
+            words = converted[amount] = amount_to_words(amount)
+        result.append(words)
+    return result
+
+
+def format_indian(amount):
+    """Format an amount in rupees with Indian digit grouping: 12,34,567.00"""
+    return format_paise(to_paise(amount))
+
+
+def format_paise(paise):
+    """Format an amount in integer paise with Indian digit grouping"""
+    sign = '-' if paise < 0 else ''
+    rupees, paise = divmod(abs(paise), 100)
+    digits = str(rupees)
+    head, tail = digits[:-3], digits[-3:]
+    if head:
+        groups = []
+        while len(head) > 2:
+            groups.append(head[-2:])
+            head = head[:-2]
+        groups.append(head)
+        tail = ','.join(reversed(groups)) + ',' + tail
+    return f'{sign}{tail}.{paise:02d}'
 
 
 # Test function
 if __name__ == "__main__":
     # Test cases
-    test_amounts = [0, 1, 15, 100, 1000, 12345, 123456, 1234567, 12345678, 123456.78]
-    
+    test_amounts = [0, 1, 15, 100, 1000, 12345, 123456, 1234567, 12345678, 123456.78, Decimal('12345678901.50')]
+
     for amount in test_amounts:
-        print(f"₹{amount:,.2f} -> {amount_to_words(amount)}")
+        print(f"₹{format_indian(amount)} -> {amount_to_words(amount)}")
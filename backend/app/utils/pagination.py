@@ -0,0 +1,24 @@
+import base64
+import json
+
+
+def encode_cursor(values):
+    """Opaque page cursor holding the sort key of the last row served"""
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, size):
+    """
+    The sort key values of a cursor made by encode_cursor.
+
+    Raises:
+        ValueError: When the cursor is malformed or does not hold ``size`` values.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
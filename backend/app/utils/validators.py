@@ -1,5 +1,12 @@
 import re
 
+# Compiled once; the single-value and batch validators share them
+IFSC_PATTERN = re.compile(r'^[A-Z]{4}0[A-Z0-9]{6}$')
+MOBILE_PATTERN = re.compile(r'^[6-9]\d{9}$')
+PAN_PATTERN = re.compile(r'^[A-Z]{5}[0-9]{4}[A-Z]{1}$')
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+NON_DIGITS = re.compile(r'[^0-9]')
+
 
 def validate_ifsc_code(ifsc_code: str) -> bool:
     """
@@ -11,8 +18,7 @@ def validate_ifsc_code(ifsc_code: str) -> bool:
     if not ifsc_code or len(ifsc_code) != 11:
         return False
     
-    pattern = r'^[A-Z]{4}0[A-Z0-9]{6}$'
-    return bool(re.match(pattern, ifsc_code.upper()))
+    return bool(IFSC_PATTERN.match(ifsc_code.upper()))
 
 
 def validate_account_number(account_number: str) -> bool:
@@ -36,8 +42,7 @@ def validate_mobile_number(mobile: str) -> bool:
     if not mobile:
         return False
     
-    pattern = r'^[6-9]\d{9}$'
-    return bool(re.match(pattern, mobile))
+    return bool(MOBILE_PATTERN.match(mobile))
 
 
 def validate_pan_number(pan: str) -> bool:
@@ -48,8 +53,7 @@ def validate_pan_number(pan: str) -> bool:
     if not pan or len(pan) != 10:
         return False
     
-    pattern = r'^[A-Z]{5}[0-9]{4}[A-Z]{1}$'
-    return bool(re.match(pattern, pan.upper()))
+    return bool(PAN_PATTERN.match(pan.upper()))
 
 
 def validate_email(email: str) -> bool:
@@ -59,15 +63,14 @@ def validate_email(email: str) -> bool:
     if not email:
         return False
     
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    return bool(EMAIL_PATTERN.match(email))
 
 
 def clean_account_number(account_number: str) -> str:
     """
     Clean account number by removing spaces and non-numeric characters
     """
-    return re.sub(r'[^0-9]', '', account_number)
+    return NON_DIGITS.sub('', account_number)
 
 
 def format_ifsc_code(ifsc_code: str) -> str:
@@ -85,3 +88,69 @@ def validate_cheque_number(cheque_number: str) -> bool:
         return True  # Optional field
     
     return cheque_number.isdigit() and 6 <= len(cheque_number) <= 8
+
+
+# Field name -> (single-value validator, error message) for batch validation
+FIELD_VALIDATORS = {
+    "ifsc_code": (validate_ifsc_code, "Invalid IFSC code format"),
+    "account_number": (validate_account_number, "Invalid account number"),
+    "mobile": (validate_mobile_number, "Invalid mobile number"),
+    "pan_number": (validate_pan_number, "Invalid PAN number"),
+    "email": (validate_email, "Invalid email address"),
+    "cheque_number": (validate_cheque_number, "Invalid cheque number"),
+}
+
+
+def _field_check(field, required):
+    """(check, message) for a field; empty values of optional fields pass"""
+    validator, message = FIELD_VALIDATORS[field]
+    if field in required:
+        return lambda value: bool(value) and validator(value), message
+    return lambda value: not value or validator(value), message
+
+
+def validate_columns(columns, required=()):
+    """
+    Validate whole columns of bulk input (e.g. a parsed CSV), one field at a
+    time, collecting every error instead of stopping at the first.
+
+    Args:
+        columns (dict): Field name (a key of FIELD_VALIDATORS) -> list of values.
+        required (iterable): Fields that may not be empty; others are only
+            checked when given.
+
+    Returns:
+        dict: Row index -> {field: error message}, for rows with errors only.
+    """
+    required = set(required)
+    report = {}
+    for field, values in columns.items():
+        check, message = _field_check(field, required)
+        for index, value in enumerate(values):
+            if not check(value):
+                report.setdefault(index, {})[field] = message
+    return report
+
+
+def validate_rows(rows, fields=None, required=()):
+    """
+    Streaming counterpart of validate_columns: validate row mappings (e.g.
+    from csv.DictReader) as they are read, yielding each row's
+    {field: error message} (empty when the row is valid).
+
+    Args:
+        rows (iterable): Mappings of field name -> value.
+        fields (iterable): Fields to check; defaults to the known fields present in each row.
+        required (iterable): Fields that may not be empty.
+    """
+    required = set(required)
+    checks = {}
+    for row in rows:
+        errors = {}
+        for field in (fields if fields is not None else (f for f in row if f in FIELD_VALIDATORS)):
+            check = checks.get(field)
+            if check is None:
+                check = checks[field] = _field_check(field, required)
+            if not check[0](row.get(field)):
+                errors[field] = check[1]
+        yield errors
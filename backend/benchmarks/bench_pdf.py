@@ -0,0 +1,358 @@
+"""
+RTGS PDF rendering benchmarks.
+
+Renders forms through generate_dynamic_form, generate_rtgs_pdf (including the
+remitter lookup and amount-to-words conversion against a seeded SQLite
+database), the process render pool and the multi-page bulk renderer, using
+data that exercises the layout: wrapping addresses, maximum amounts and empty
+optional fields. The size of each scenario's form is also measured with and
+without compact output.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_pdf
+    python -m benchmarks.bench_pdf --iterations 500 --concurrency 4
+    python -m benchmarks.bench_pdf --compare benchmarks/results/<baseline>.json
+
+Each run is saved to benchmarks/results/ as JSON, named after the commit, so
+runs before and after a change (ReportLab upgrade, template edit) can be
+compared with --compare.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from io import BytesIO
+from types import SimpleNamespace
+
+import reportlab
+from reportlab import rl_config
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.database import Base
+from app.models import User, Remitter, Beneficiary, Transaction
+from app.services.form_data import build_form_data
+from app.services.pdf_generator import generate_dynamic_form, generate_rtgs_pdf, render_forms, get_form_template
+from app.services.pdf_pool import PdfRenderPool
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+REMITTER = {
+    "account_name": "JAY JALARAM ELECTRICALS",
+    "account_number": "123456789012",
+    "bank_name": "Prime Co-op. Bank Ltd",
+    "branch_name": "JAHANGIRPURA",
+    "ifsc_code": "PRIM0000001",
+    "pan_number": "ABCDE1234F",
+    "mobile": "9876543210",
+}
+
+# name -> (beneficiary fields, amount, cheque number)
+SCENARIOS = {
+    "typical": ({
+        "name": "Shree Ganesh Traders",
+        "account_number": "30211045678",
+        "bank_name": "State Bank of India",
+        "branch_name": "Ring Road",
+        "ifsc_code": "SBIN0001234",
+        "bank_address": "Surat",
+        "mobile": "9123456789",
+    }, 48250.00, "000123"),
+    "long_address": ({
+        "name": "Shree Mahalaxmi Textile Processors and Exporters Private Limited",
+        "account_number": "000405067891234",
+        "bank_name": "The Surat District Co-operative Bank Ltd",
+        "branch_name": "Udhna Magdalla Road Industrial Estate",
+        "ifsc_code": "SDCB0000042",
+        "bank_address": "Plot 12-14, GIDC Phase II, Near Sachin Railway Station, Opp. Hotel Sahil, Sachin, Surat, Gujarat 394230",
+        "mobile": "9898989898",
+    }, 1234567.89, "004567"),
+    "max_amount": ({
+        "name": "Gujarat Infrastructure Development Corporation",
+        "account_number": "912020045678901",
+        "bank_name": "Axis Bank",
+        "branch_name": "Athwalines",
+        "ifsc_code": "UTIB0000123",
+        "bank_address": "Athwalines, Surat",
+        "mobile": "9000000001",
+    }, 99999999.99, "999999"),
+    "empty_optional": ({
+        "name": "R K Patel",
+        "account_number": "1234567890",
+        "bank_name": "Bank of Baroda",
+        "branch_name": "",
+        "ifsc_code": "BARB0VARACH",
+        "bank_address": None,
+        "mobile": None,
+    }, 1.00, None),
+}
+
+
+def scenario_forms():
+    """(remitter_data, transaction_data) for each scenario, built like the API does"""
+    user = SimpleNamespace(name="Benchmark User")
+    remitter = SimpleNamespace(**REMITTER)
+    forms = {}
+    for name, (beneficiary, amount, cheque) in SCENARIOS.items():
+        transaction = SimpleNamespace(amount=amount, cheque_number=cheque)
+        forms[name] = build_form_data(transaction, SimpleNamespace(**beneficiary), remitter, user)
+    return forms
+
+
+def seed_database():
+    """In-memory database holding one transaction per scenario"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    user = User(name="Benchmark User", email="bench@example.com", password_hash="x")
+    db.add(user)
+    db.flush()
+    db.add(Remitter(user_id=user.id, **REMITTER))
+    transactions = {}
+    for name, (beneficiary, amount, cheque) in SCENARIOS.items():
+        db_beneficiary = Beneficiary(user_id=user.id, **beneficiary)
+        db.add(db_beneficiary)
+        db.flush()
+        transaction = Transaction(
+            user_id=user.id,
+            beneficiary_id=db_beneficiary.id,
+            amount=amount,
+            amount_in_words="",
+            cheque_number=cheque,
+            transaction_date=datetime(2025, 3, 31),
+        )
+        db.add(transaction)
+        transactions[name] = transaction
+    db.commit()
+    return db, user, transactions
+
+
+def percentile(sorted_values, p):
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    return statistics.quantiles(sorted_values, n=100, method="inclusive")[p - 1]
+
+
+def summarize(latencies, elapsed, forms, total_bytes):
+    latencies = sorted(latencies)
+    return {
+        "forms": forms,
+        "seconds": round(elapsed, 4),
+        "forms_per_sec": round(forms / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "bytes_per_pdf": round(total_bytes / forms),
+    }
+
+
+def bench_serial(render, iterations, warmup):
+    """Time ``render()`` (returning PDF bytes) back to back on one thread"""
+    for _ in range(warmup):
+        render()
+    latencies = []
+    total_bytes = 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        total_bytes += len(render())
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - start, iterations, total_bytes)
+
+
+def bench_concurrent(render, iterations, concurrency, warmup):
+    """Time ``render()`` issued from ``concurrency`` threads at once"""
+    for _ in range(warmup):
+        render()
+
+    def timed(_):
+        t0 = time.perf_counter()
+        size = len(render())
+        return time.perf_counter() - t0, size
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed, range(iterations)))
+    elapsed = time.perf_counter() - start
+    return summarize([r[0] for r in results], elapsed, iterations, sum(r[1] for r in results))
+
+
+def bench_bulk(forms, pages, repeats):
+    """Time one multi-page document of ``pages`` forms, ``repeats`` times"""
+    batch = [forms[i % len(forms)] for i in range(pages)]
+    latencies = []
+    total_bytes = 0
+    start = time.perf_counter()
+    for _ in range(repeats):
+        output = BytesIO()
+        t0 = time.perf_counter()
+        render_forms(batch, output)
+        latencies.append(time.perf_counter() - t0)
+        total_bytes += len(output.getvalue())
+    elapsed = time.perf_counter() - start
+    result = summarize(latencies, elapsed, pages * repeats, total_bytes)
+    result["pages_per_document"] = pages
+    return result
+
+
+def measure_output_size(forms):
+    """
+    Bytes per form in standard ReportLab output (ASCII85 streams, timestamped
+    metadata) and in compact output (``settings.pdf_compact_output``)
+    """
+    saved = settings.pdf_compact_output, rl_config.useA85
+    sizes = {}
+    try:
+        for name, (remitter_data, transaction_data) in forms.items():
+            row = {}
+            for mode, compact in (("standard", False), ("compact", True)):
+                settings.pdf_compact_output = compact
+                rl_config.useA85 = 0 if compact else 1
+                row[mode] = len(generate_dynamic_form(remitter_data, transaction_data).getvalue())
+            row["saved_pct"] = round((row["standard"] - row["compact"]) / row["standard"] * 100, 1)
+            sizes[name] = row
+    finally:
+        settings.pdf_compact_output, rl_config.useA85 = saved
+    return sizes
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(who).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(iterations=200, concurrency=4, bulk_pages=200, warmup=5):
+    forms = scenario_forms()
+    db, user, transactions = seed_database()
+    get_form_template()
+    results = {}
+
+    for name, (remitter_data, transaction_data) in forms.items():
+        results[f"generate_dynamic_form[{name}]"] = bench_serial(
+            lambda: generate_dynamic_form(remitter_data, transaction_data).getvalue(), iterations, warmup
+        )
+    for name, transaction in transactions.items():
+        results[f"generate_rtgs_pdf[{name}]"] = bench_serial(
+            lambda: generate_rtgs_pdf(transaction, user, db).getvalue(), iterations, warmup
+        )
+
+    all_forms = list(forms.values())
+    cycle = iter(range(sys.maxsize))
+
+    def next_form():
+        return all_forms[next(cycle) % len(all_forms)]
+
+    results[f"threads[{concurrency}]"] = bench_concurrent(
+        lambda: generate_dynamic_form(*next_form()).getvalue(), iterations, concurrency, warmup
+    )
+
+    pool = PdfRenderPool(workers=concurrency)
+    pool.start()
+    try:
+        results[f"process_pool[{concurrency}]"] = bench_concurrent(
+            lambda: pool.render_sync(*next_form()), iterations, concurrency, warmup
+        )
+    finally:
+        pool.shutdown()
+
+    results[f"bulk[{bulk_pages}]"] = bench_bulk(all_forms, bulk_pages, repeats=3)
+    db.close()
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "reportlab": reportlab.Version,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "iterations": iterations,
+            "concurrency": concurrency,
+        },
+        "memory": {
+            "peak_rss_mb": peak_rss_mb(),
+            "peak_rss_workers_mb": peak_rss_mb(resource.RUSAGE_CHILDREN),
+        },
+        "results": results,
+        "output_size": measure_output_size(forms),
+    }
+
+
+def print_report(report, baseline=None):
+    meta = report["meta"]
+    print(f"commit {meta['commit']}  python {meta['python']}  reportlab {meta['reportlab']}  cpus {meta['cpus']}")
+    header = f"{'benchmark':<40}{'forms/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'bytes':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, result in report["results"].items():
+        print(f"{name:<40}{result['forms_per_sec']:>10}{result['p50_ms']:>10}"
+              f"{result['p95_ms']:>10}{result['p99_ms']:>10}{result['bytes_per_pdf']:>9}")
+        previous = (baseline or {}).get("results", {}).get(name)
+        if previous:
+            print(f"{'  vs ' + baseline['meta']['commit']:<40}"
+                  + "".join(f"{change(previous[k], result[k]):>10}" for k in ("forms_per_sec", "p50_ms", "p95_ms", "p99_ms"))
+                  + f"{change(previous['bytes_per_pdf'], result['bytes_per_pdf']):>9}")
+    print(f"\n{'output size':<40}{'standard':>10}{'compact':>10}{'saved':>10}")
+    for name, row in report.get("output_size", {}).items():
+        print(f"{name:<40}{row['standard']:>10}{row['compact']:>10}{row['saved_pct']:>9}%")
+    memory = report["memory"]
+    print(f"peak RSS: {memory['peak_rss_mb']} MB (benchmark process), {memory['peak_rss_workers_mb']} MB (largest pool worker)")
+
+
+def change(old, new):
+    if not old:
+        return "n/a"
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def save_report(report, path=None):
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(RESULTS_DIR, f"{stamp}-{report['meta']['commit']}.json")
+    with open(path, "w") as fileobj:
+        json.dump(report, fileobj, indent=2)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark RTGS PDF rendering")
+    parser.add_argument("--iterations", type=int, default=200, help="forms rendered per benchmark")
+    parser.add_argument("--concurrency", type=int, default=4, help="threads and pool workers for the concurrent runs")
+    parser.add_argument("--bulk-pages", type=int, default=200, help="pages in the bulk document")
+    parser.add_argument("--output", help="where to save the JSON results (default: benchmarks/results/)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    report = run(args.iterations, args.concurrency, args.bulk_pages)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as fileobj:
+            baseline = json.load(fileobj)
+    print_report(report, baseline)
+    print(f"saved {save_report(report, args.output)}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config import settings
+from app.database import create_tables, get_db
+from app.main import app
+from app.models import User, Beneficiary, Transaction, Remitter
+from app.services import pdf_jobs, pdf_pool
+from app.services.auth_service import create_access_token, get_password_hash
+
+
+@pytest.fixture(autouse=True)
+def inline_render_pool(monkeypatch):
+    """Render in-process so tests don't spawn worker processes"""
+    monkeypatch.setattr(pdf_pool, "_pool", pdf_pool.PdfRenderPool(workers=0))
+
+
+@pytest.fixture
+def job_queue(db_engine, tmp_path, monkeypatch):
+    """Job queue on the test database; tests drive it with run_once()"""
+    monkeypatch.setattr(settings, "pdf_job_dir", str(tmp_path / "pdf_jobs"))
+    queue = pdf_jobs.PdfJobQueue(
+        session_factory=sessionmaker(autocommit=False, autoflush=False, bind=db_engine),
+        workers=0
+    )
+    monkeypatch.setattr(pdf_jobs, "_queue", queue)
+    return queue
+
+
+@pytest.fixture
+def db_engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    create_tables(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def query_counter(db_engine):
+    """SQL statements executed on the test database while the test runs"""
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db_engine, "before_cursor_execute", count)
+    yield statements
+    event.remove(db_engine, "before_cursor_execute", count)
+
+
+@pytest.fixture
+def db_session(db_engine):
+    session = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(db_engine, tmp_path, monkeypatch):
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(settings, "pdf_cache_dir", str(tmp_path / "pdf_cache"))
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    if previous is None:
+        app.dependency_overrides.pop(get_db, None)
+    else:
+        app.dependency_overrides[get_db] = previous
+
+
+@pytest.fixture
+def user(db_session):
+    db_user = User(name="Test User", email="user@example.com", password_hash=get_password_hash("secret123"))
+    db_session.add(db_user)
+    db_session.commit()
+    db_session.refresh(db_user)
+    return db_user
+
+
+@pytest.fixture
+def auth_headers(user):
+    token = create_access_token(data={"sub": str(user.id)})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def remitter(db_session, user):
+    db_remitter = Remitter(
+        user_id=user.id,
+        account_name="JAY JALARAM ELECTRICALS",
+        account_number="123456789012",
+        bank_name="Prime Co-op. Bank Ltd",
+        branch_name="JAHANGIRPURA",
+        ifsc_code="PRIM0000001",
+        pan_number="ABCDE1234F",
+        mobile="9876543210",
+    )
+    db_session.add(db_remitter)
+    db_session.commit()
+    db_session.refresh(db_remitter)
+    return db_remitter
+
+
+@pytest.fixture
+def beneficiary(db_session, user):
+    db_beneficiary = Beneficiary(
+        user_id=user.id,
+        name="John Doe",
+        account_number="1234567890",
+        bank_name="State Bank of India",
+        branch_name="Main Branch",
+        ifsc_code="SBIN0001234",
+        bank_address="12 Station Road, Surat",
+        mobile="9123456789",
+    )
+    db_session.add(db_beneficiary)
+    db_session.commit()
+    db_session.refresh(db_beneficiary)
+    return db_beneficiary
+
+
+@pytest.fixture
+def transaction(db_session, user, beneficiary):
+    db_transaction = Transaction(
+        user_id=user.id,
+        beneficiary_id=beneficiary.id,
+        amount=12345.67,
+        amount_in_words="Twelve Thousand Three Hundred Forty Five Rupees and Sixty Seven Paise Only",
+        cheque_number="000123",
+        transaction_date=datetime(2025, 9, 24),
+        purpose="Invoice 42",
+    )
+    db_session.add(db_transaction)
+    db_session.commit()
+    db_session.refresh(db_transaction)
+    return db_transaction
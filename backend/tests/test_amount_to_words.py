@@ -0,0 +1,137 @@
+import random
+from decimal import Decimal
+
+import pytest
+
+from app.utils.amount_to_words import (
+    MAX_AMOUNT,
+    amount_to_words,
+    amounts_to_words,
+    format_indian,
+    paise_to_words,
+    to_paise,
+)
+
+
+def legacy_number_to_words(n):
+    """The float-based converter this module replaced, kept for differential tests"""
+
+    def convert_hundreds(num):
+        ones = ['', 'One', 'Two', 'Three', 'Four', 'Five', 'Six', 'Seven', 'Eight', 'Nine']
+        teens = ['Ten', 'Eleven', 'Twelve', 'Thirteen', 'Fourteen', 'Fifteen',
+                 'Sixteen', 'Seventeen', 'Eighteen', 'Nineteen']
+        tens = ['', '', 'Twenty', 'Thirty', 'Forty', 'Fifty', 'Sixty', 'Seventy', 'Eighty', 'Ninety']
+        result = ''
+        if num >= 100:
+            result += ones[num // 100] + ' Hundred '
+            num %= 100
+        if num >= 20:
+            result += tens[num // 10]
+            if num % 10 != 0:
+                result += ' ' + ones[num % 10]
+        elif num >= 10:
+            result += teens[num - 10]
+        elif num > 0:
+            result += ones[num]
+        return result.strip()
+
+    if n == 0:
+        return 'Zero Rupees Only'
+    rupees = int(n)
+    paise = round((n - rupees) * 100)
+    result = ''
+    if rupees > 0:
+        if rupees >= 10000000:
+            result += convert_hundreds(rupees // 10000000) + ' Crore '
+            rupees %= 10000000
+        if rupees >= 100000:
+            result += convert_hundreds(rupees // 100000) + ' Lakh '
+            rupees %= 100000
+        if rupees >= 1000:
+            result += convert_hundreds(rupees // 1000) + ' Thousand '
+            rupees %= 1000
+        if rupees > 0:
+            result += convert_hundreds(rupees) + ' '
+        result += 'Rupees'
+        if paise > 0:
+            result += ' and ' + convert_hundreds(paise) + ' Paise'
+    else:
+        if paise > 0:
+            result = convert_hundreds(paise) + ' Paise'
+    return result.strip() + ' Only'
+
+
+EDGE_PAISE = [
+    0, 1, 9, 10, 19, 20, 99, 100, 101, 999, 1000, 1099, 1999, 2000, 10000, 10001, 99999, 100000,
+    100500, 999999, 1000000, 10000000, 10000099, 99999999, 100000000, 1000000000, 1234567800,
+    9999999999,
+]
+
+
+class TestDifferential:
+    def test_edge_amounts_match_legacy(self):
+        for paise in EDGE_PAISE:
+            amount = paise / 100
+            assert amount_to_words(amount) == legacy_number_to_words(amount), amount
+
+    def test_random_amounts_match_legacy(self):
+        rng = random.Random(18)
+        for _ in range(20000):
+            paise = rng.randrange(10 ** rng.randint(1, 10))
+            amount = paise / 100
+            assert amount_to_words(amount) == legacy_number_to_words(amount), amount
+
+    def test_every_chunk_matches_legacy(self):
+        for rupees in range(1000):
+            assert amount_to_words(rupees) == legacy_number_to_words(rupees)
+            assert paise_to_words(rupees * 100000) == legacy_number_to_words(rupees * 1000)
+
+
+class TestAmountToWords:
+    def test_decimal_and_paise_inputs(self):
+        assert amount_to_words(Decimal("12345.67")) == \
+            "Twelve Thousand Three Hundred Forty Five Rupees and Sixty Seven Paise Only"
+        assert paise_to_words(1234567) == amount_to_words(Decimal("12345.67"))
+        assert amount_to_words(Decimal("0.5")) == "Fifty Paise Only"
+
+    def test_float_paise_are_not_misplaced(self):
+        assert to_paise(0.29) == 29
+        assert to_paise(1.005) == 101
+        assert amount_to_words(1.999) == "Two Rupees Only"
+        assert legacy_number_to_words(1.999) == "One Rupees and One Hundred Paise Only"
+
+    def test_arab_and_kharab(self):
+        assert amount_to_words(Decimal("1234567890123")) == (
+            "Twelve Kharab Thirty Four Arab Fifty Six Crore Seventy Eight Lakh "
+            "Ninety Thousand One Hundred Twenty Three Rupees Only"
+        )
+        assert amount_to_words(10 ** 9) == "One Arab Rupees Only"
+        assert amount_to_words(MAX_AMOUNT).startswith("Ninety Nine Kharab Ninety Nine Arab")
+
+    def test_out_of_range(self):
+        assert amount_to_words(-1) == "Invalid Amount"
+        assert amount_to_words(MAX_AMOUNT + 1) == "Amount too large"
+        with pytest.raises(ValueError):
+            amount_to_words(float("nan"))
+        with pytest.raises(ValueError):
+            to_paise("twelve")
+
+    def test_batch(self):
+        amounts = [100, Decimal("100.00"), 0.5, 12345.67]
+        assert amounts_to_words(amounts) == [amount_to_words(amount) for amount in amounts]
+
+
+class TestFormatIndian:
+    @pytest.mark.parametrize("amount, expected", [
+        (0, "0.00"),
+        (999, "999.00"),
+        (1000, "1,000.00"),
+        (12345.67, "12,345.67"),
+        (123456, "1,23,456.00"),
+        (1234567, "12,34,567.00"),
+        (Decimal("99999999.99"), "9,99,99,999.99"),
+        (Decimal("1234567890123"), "12,34,56,78,90,123.00"),
+        (-1234.5, "-1,234.50"),
+    ])
+    def test_grouping(self, amount, expected):
+        assert format_indian(amount) == expected
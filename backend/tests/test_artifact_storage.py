@@ -0,0 +1,164 @@
+import hashlib
+import io
+import os
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from app.config import settings
+from app.services.artifact_storage import ArtifactStorage, LocalArtifactStorage, S3ArtifactStorage, get_artifact_storage
+
+
+class FakeS3Error(Exception):
+    def __init__(self, code):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+
+class FakeS3Client:
+    """In-memory stand-in for the boto3 S3 client calls the storage makes"""
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = 0
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise FakeS3Error("404")
+        return {}
+
+    def upload_fileobj(self, fileobj, bucket, key):
+        self.uploads += 1
+        self.objects[(bucket, key)] = (fileobj.read(), datetime.now(timezone.utc))
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise FakeS3Error("NoSuchKey")
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)][0])}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        return f"https://s3.example.com/{Params['Bucket']}/{Params['Key']}?expires={ExpiresIn}"
+
+    def get_paginator(self, operation):
+        client = self
+
+        class Paginator:
+            def paginate(self, Bucket, Prefix):
+                yield {"Contents": [
+                    {"Key": key, "Size": len(data), "LastModified": modified}
+                    for (bucket, key), (data, modified) in client.objects.items()
+                    if bucket == Bucket and key.startswith(Prefix)
+                ]}
+
+        return Paginator()
+
+
+@pytest.fixture
+def local_storage(tmp_path):
+    return LocalArtifactStorage(str(tmp_path / "artifacts"))
+
+
+def test_backend_missing_a_primitive_cannot_be_created():
+    class Incomplete(ArtifactStorage):
+        def store(self, write, key=None, suffix=".pdf"):
+            return key
+
+    with pytest.raises(TypeError, match="iter_artifacts"):
+        Incomplete()
+
+
+class TestLocalArtifactStorage:
+    def test_store_is_content_addressed_and_sharded(self, local_storage):
+        key = local_storage.store_bytes(b"%PDF-1.4 one")
+        assert key == hashlib.sha256(b"%PDF-1.4 one").hexdigest() + ".pdf"
+        assert local_storage.local_path(key) == os.path.join(local_storage.root, key[:2], key[2:4], key)
+        with local_storage.open(key) as fileobj:
+            assert fileobj.read() == b"%PDF-1.4 one"
+
+    def test_identical_content_is_stored_once(self, local_storage):
+        first = local_storage.store_bytes(b"same")
+        os.utime(local_storage.path(first), (1, 1))
+        assert local_storage.store_bytes(b"same") == first
+        assert [key for key, _, _ in local_storage.iter_artifacts()] == [first]
+        assert os.path.getmtime(local_storage.path(first)) > 1
+
+    def test_explicit_key(self, local_storage):
+        assert local_storage.store_bytes(b"data", key="form.pdf") == "form.pdf"
+        assert local_storage.exists("form.pdf")
+        local_storage.delete("form.pdf")
+        assert not local_storage.exists("form.pdf")
+
+    def test_failed_write_leaves_nothing_behind(self, local_storage):
+        def write(output):
+            output.write(b"partial")
+            raise RuntimeError("render failed")
+
+        with pytest.raises(RuntimeError):
+            local_storage.store(write)
+        assert list(local_storage.iter_artifacts()) == []
+        assert os.listdir(os.path.join(local_storage.root, local_storage.TMP_DIR)) == []
+
+    def test_retention_by_age_then_size(self, local_storage):
+        now = time.time()
+        keys = [local_storage.store_bytes(bytes([i]) * 100) for i in range(4)]
+        for age, key in zip((400, 300, 200, 100), keys):
+            os.utime(local_storage.path(key), (now - age, now - age))
+
+        assert local_storage.apply_retention(max_age_seconds=350, now=now) == 1
+        assert local_storage.apply_retention(max_bytes=150, now=now) == 2
+        assert [key for key, _, _ in local_storage.iter_artifacts()] == [keys[3]]
+
+    def test_stray_files_are_removed(self, local_storage):
+        key = local_storage.store_bytes(b"kept")
+        legacy = os.path.join(local_storage.root, "ab", "abcdef.pdf")
+        os.makedirs(os.path.dirname(legacy), exist_ok=True)
+        open(legacy, "wb").close()
+        os.utime(legacy, (1, 1))
+
+        assert local_storage.remove_stray_files() == 1
+        assert not os.path.exists(legacy)
+        assert local_storage.exists(key)
+
+
+class TestS3ArtifactStorage:
+    def test_store_dedupes_and_presigns(self):
+        client = FakeS3Client()
+        storage = S3ArtifactStorage("bucket", "/rtgs/artifacts/", client=client)
+        key = storage.store_bytes(b"%PDF-1.4")
+        assert storage.store_bytes(b"%PDF-1.4") == key
+        assert client.uploads == 1
+        assert ("bucket", f"rtgs/artifacts/{key[:2]}/{key[2:4]}/{key}") in client.objects
+
+        assert storage.exists(key)
+        assert storage.open(key).read() == b"%PDF-1.4"
+        assert storage.local_path(key) is None
+        assert storage.download_url(key).startswith(f"https://s3.example.com/bucket/rtgs/artifacts/{key[:2]}/")
+
+        assert storage.apply_retention(max_bytes=1) == 1
+        assert not storage.exists(key)
+
+    def test_other_errors_propagate(self):
+        client = FakeS3Client()
+        client.head_object = lambda **kwargs: (_ for _ in ()).throw(FakeS3Error("AccessDenied"))
+        with pytest.raises(FakeS3Error):
+            S3ArtifactStorage("bucket", client=client).exists("key.pdf")
+
+
+class TestJobDownloadFromS3:
+    def test_redirects_to_presigned_url(self, client, auth_headers, job_queue, remitter, transaction, monkeypatch):
+        from app.services import artifact_storage
+
+        storage = S3ArtifactStorage("bucket", client=FakeS3Client())
+        monkeypatch.setattr(settings, "artifact_storage", "s3")
+        monkeypatch.setattr(artifact_storage, "create_artifact_storage", lambda: storage)
+        assert get_artifact_storage() is storage
+
+        job_id = client.post("/api/pdf/jobs", json={"transaction_ids": [transaction.id]}, headers=auth_headers).json()["id"]
+        job_queue.run_once()
+        response = client.get(f"/api/pdf/jobs/{job_id}/download", headers=auth_headers, follow_redirects=False)
+        assert response.status_code == 307
+        assert response.headers["location"].startswith("https://s3.example.com/bucket/")
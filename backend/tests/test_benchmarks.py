@@ -0,0 +1,27 @@
+import json
+
+import pytest
+
+from benchmarks import bench_pdf
+
+
+@pytest.mark.slow
+def test_benchmark_suite_runs(tmp_path):
+    report = bench_pdf.run(iterations=2, concurrency=1, bulk_pages=2, warmup=1)
+    assert set(report["results"]) >= {
+        "generate_dynamic_form[long_address]",
+        "generate_rtgs_pdf[max_amount]",
+        "process_pool[1]",
+        "bulk[2]",
+    }
+    for result in report["results"].values():
+        assert result["forms_per_sec"] > 0
+        assert result["p50_ms"] <= result["p99_ms"]
+        assert result["bytes_per_pdf"] > 0
+    for row in report["output_size"].values():
+        assert row["compact"] < row["standard"]
+
+    path = bench_pdf.save_report(report, str(tmp_path / "run.json"))
+    with open(path) as fileobj:
+        assert json.load(fileobj)["meta"]["iterations"] == 2
+    bench_pdf.print_report(report, baseline=report)
@@ -0,0 +1,64 @@
+from app.models import Beneficiary
+
+HEADER = "name,account_number,bank_name,branch_name,ifsc_code,mobile,email\n"
+
+
+class TestBeneficiaryCsvValidation:
+    def upload(self, client, auth_headers, content):
+        return client.post(
+            "/api/beneficiaries/validate-csv",
+            files={"file": ("beneficiaries.csv", content.encode("utf-8"), "text/csv")},
+            headers=auth_headers,
+        )
+
+    def test_reports_errors_by_line(self, client, auth_headers):
+        content = "\ufeff" + HEADER + (
+            "John Doe,1234567890,SBI,Main,SBIN0001234,9876543210,john@example.com\n"
+            "Bad Row,12AB,SBI,Main,SBIN000123,12345,not-an-email\n"
+            "No Contact,123456789012,HDFC,Ring Road,HDFC0000001,,\n"
+        )
+        response = self.upload(client, auth_headers, content)
+        assert response.status_code == 200
+        assert response.json() == {
+            "rows": 3,
+            "valid_rows": 2,
+            "errors": [{
+                "line": 3,
+                "errors": {
+                    "ifsc_code": "Invalid IFSC code format",
+                    "account_number": "Invalid account number",
+                    "mobile": "Invalid mobile number",
+                    "email": "Invalid email address",
+                },
+            }],
+        }
+
+    def test_missing_columns_is_400(self, client, auth_headers):
+        response = self.upload(client, auth_headers, "name,ifsc_code\nJohn,SBIN0001234\n")
+        assert response.status_code == 400
+        assert "account_number" in response.json()["detail"]
+
+
+class TestBeneficiaryPagination:
+    def test_cursor_pages_follow_the_header(self, client, auth_headers, db_session, user):
+        db_session.add_all([
+            Beneficiary(user_id=user.id, name=f"Payee {i}", account_number=f"{i:010d}", bank_name="SBI",
+                        branch_name="Main", ifsc_code="SBIN0001234")
+            for i in range(5)
+        ])
+        db_session.commit()
+
+        names, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            response = client.get("/api/beneficiaries/", params=params, headers=auth_headers)
+            assert response.status_code == 200
+            names += [item["name"] for item in response.json()]
+            cursor = response.headers.get("x-next-cursor")
+            if cursor is None:
+                break
+        assert names == [f"Payee {i}" for i in range(5)]
+
+    def test_invalid_cursor_is_400(self, client, auth_headers):
+        response = client.get("/api/beneficiaries/", params={"cursor": "bad"}, headers=auth_headers)
+        assert response.status_code == 400
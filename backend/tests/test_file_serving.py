@@ -0,0 +1,116 @@
+import gzip
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config import settings
+from app.services import file_serving, pdf_cache
+from app.services.pdf_jobs import JOB_SUCCEEDED, write_job_artifact
+
+
+@pytest.fixture
+def served_dirs(tmp_path, monkeypatch):
+    for name in ("pdf_cache", "pdf_jobs", "uploads"):
+        (tmp_path / name).mkdir()
+    monkeypatch.setattr(settings, "pdf_cache_dir", str(tmp_path / "pdf_cache"))
+    monkeypatch.setattr(settings, "pdf_job_dir", str(tmp_path / "pdf_jobs"))
+    monkeypatch.setattr(settings, "upload_dir", str(tmp_path / "uploads"))
+    return tmp_path
+
+
+@pytest.fixture
+def accel(served_dirs, monkeypatch):
+    monkeypatch.setattr(settings, "accel_redirect", True)
+    return served_dirs
+
+
+class TestAccelUri:
+    def test_maps_served_directories(self, served_dirs):
+        path = served_dirs / "pdf_cache" / "ab" / "abc def.pdf"
+        assert file_serving.accel_uri(str(path)) == "/_protected/pdf_cache/ab/abc%20def.pdf"
+        assert file_serving.accel_uri(str(served_dirs / "uploads" / "logo.png")) == "/_protected/uploads/logo.png"
+
+    def test_other_paths_are_not_redirected(self, served_dirs):
+        assert file_serving.accel_uri(str(served_dirs / "elsewhere.pdf")) is None
+        assert file_serving.accel_uri(str(served_dirs / "pdf_cache" / ".." / "x.pdf")) is None
+        assert file_serving.accel_uri(str(served_dirs / "pdf_cache")) is None
+
+
+class TestPrecompressed:
+    def test_gzip_copy_is_written_and_removed(self, served_dirs, monkeypatch):
+        monkeypatch.setattr(settings, "pdf_precompress", True)
+        data = b"%PDF-1.4 " + b"0 0 m 10 10 l S\n" * 200
+        pdf_cache._store("abcdef", data)
+        path = pdf_cache.cache_path("abcdef")
+
+        with gzip.open(path + ".gz") as fileobj:
+            assert fileobj.read() == data
+        first = open(path + ".gz", "rb").read()
+        file_serving.write_precompressed(path)
+        assert open(path + ".gz", "rb").read() == first
+
+        file_serving.remove_stored_file(path)
+        assert not os.path.exists(path) and not os.path.exists(path + ".gz")
+
+    def test_incompressible_files_are_kept_plain(self, served_dirs, monkeypatch):
+        monkeypatch.setattr(settings, "pdf_precompress", True)
+        pdf_cache._store("random", os.urandom(512))
+        path = pdf_cache.cache_path("random")
+        assert not os.path.exists(path + ".gz")
+
+    def test_off_by_default(self, served_dirs):
+        pdf_cache._store("abcdef", b"%PDF" * 100)
+        path = pdf_cache.cache_path("abcdef")
+        assert not os.path.exists(path + ".gz")
+
+
+class TestAccelDownloads:
+    def test_transaction_download_redirects_to_nginx(self, client, auth_headers, remitter, transaction, accel):
+        response = client.get(f"/api/pdf/download/{transaction.id}", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.content == b""
+        uri = response.headers["x-accel-redirect"]
+        assert uri.startswith("/_protected/pdf_cache/") and uri.endswith(".pdf")
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["content-disposition"] == "attachment; filename=RTGS_John_Doe_20250924.pdf"
+
+        relative = uri[len("/_protected/pdf_cache/"):]
+        assert os.path.exists(os.path.join(settings.pdf_cache_dir, relative))
+
+        response = client.get(
+            f"/api/pdf/download/{transaction.id}",
+            headers={**auth_headers, "If-None-Match": response.headers["etag"]},
+        )
+        assert response.status_code == 304
+        assert "x-accel-redirect" not in response.headers
+
+    def test_python_streams_when_off(self, client, auth_headers, remitter, transaction, served_dirs):
+        response = client.get(f"/api/pdf/download/{transaction.id}", headers=auth_headers)
+        assert response.content.startswith(b"%PDF")
+        assert "x-accel-redirect" not in response.headers
+
+    def test_job_download_is_cached_until_expiry(self, client, auth_headers, user, db_session, accel):
+        from app.models.pdf_job import PdfJob
+
+        now = datetime.utcnow()
+        job = PdfJob(user_id=user.id, kind="bulk_forms", params="{}", status=JOB_SUCCEEDED,
+                     max_attempts=1, finished_at=now, expires_at=now + timedelta(hours=2))
+        db_session.add(job)
+        db_session.commit()
+        key = job.result_path = write_job_artifact(lambda output: output.write(b"%PDF-1.4"))
+        db_session.commit()
+
+        response = client.get(f"/api/pdf/jobs/{job.id}/download", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["x-accel-redirect"] == f"/_protected/pdf_jobs/{key[:2]}/{key[2:4]}/{key}"
+        cache_control = response.headers["cache-control"]
+        assert cache_control.startswith("private, max-age=") and cache_control.endswith(", immutable")
+        assert 7000 < int(cache_control.split("max-age=")[1].split(",")[0]) <= 7200
+
+        response = client.get(
+            f"/api/pdf/jobs/{job.id}/download",
+            headers={**auth_headers, "If-None-Match": response.headers["etag"]},
+        )
+        assert response.status_code == 304
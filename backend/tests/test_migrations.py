@@ -0,0 +1,61 @@
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.migrations import run_migrations
+
+LEGACY_TRANSACTIONS = """
+CREATE TABLE transactions (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    beneficiary_id INTEGER NOT NULL,
+    amount FLOAT NOT NULL,
+    amount_in_words TEXT NOT NULL,
+    cheque_number VARCHAR(50),
+    transaction_date DATETIME NOT NULL,
+    transaction_reference VARCHAR(100),
+    purpose VARCHAR(200),
+    remarks TEXT,
+    pdf_path VARCHAR(500),
+    created_at DATETIME,
+    updated_at DATETIME
+)
+"""
+
+
+def legacy_engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with engine.begin() as conn:
+        conn.execute(text(LEGACY_TRANSACTIONS))
+        conn.execute(text(
+            "INSERT INTO transactions (user_id, beneficiary_id, amount, amount_in_words, transaction_date) VALUES "
+            "(1, 1, 12345.67, '-', '2025-09-24'), (1, 1, 0.29, '-', '2025-09-24'), (1, 1, 99999999.99, '-', '2025-09-24')"
+        ))
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+class TestMigrations:
+    def test_amounts_move_to_paise(self):
+        engine = legacy_engine()
+        assert run_migrations(engine) == ["amounts_to_paise", "transactions_user_date_index", "transactions_sort_indexes"]
+
+        columns = {column["name"] for column in inspect(engine).get_columns("transactions")}
+        assert "amount_paise" in columns and "amount" not in columns
+        with engine.connect() as conn:
+            paise = conn.execute(text("SELECT amount_paise FROM transactions ORDER BY id")).scalars().all()
+        assert paise == [1234567, 29, 9999999999]
+
+    def test_user_date_index_is_added(self):
+        engine = legacy_engine()
+        run_migrations(engine)
+        indexes = {index["name"]: index["column_names"] for index in inspect(engine).get_indexes("transactions")}
+        assert indexes["ix_transactions_user_date"] == ["user_id", "transaction_date"]
+        assert indexes["ix_transactions_user_amount"] == ["user_id", "amount_paise"]
+        assert indexes["ix_transactions_user_beneficiary_date"] == ["user_id", "beneficiary_id", "transaction_date"]
+
+    def test_migrations_are_idempotent(self, db_engine):
+        assert run_migrations(db_engine) == []
+        engine = legacy_engine()
+        run_migrations(engine)
+        assert run_migrations(engine) == []
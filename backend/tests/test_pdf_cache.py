@@ -0,0 +1,210 @@
+import asyncio
+import os
+import threading
+
+from app.config import settings
+from app.models import Transaction
+from app.services import pdf_cache, pdf_generator
+
+
+REMITTER_DATA = {"name": "JAY JALARAM ELECTRICALS", "cheque_no": "000123"}
+TRANSACTION_DATA = {"beneficiary_name": "John Doe", "amount_fig": "12,345.67"}
+
+
+class TestCacheKey:
+    def test_key_is_stable(self):
+        assert pdf_cache.form_cache_key(REMITTER_DATA, TRANSACTION_DATA) == \
+            pdf_cache.form_cache_key(dict(REMITTER_DATA), dict(TRANSACTION_DATA))
+
+    def test_key_changes_with_inputs(self):
+        changed = {**TRANSACTION_DATA, "amount_fig": "12,345.68"}
+        assert pdf_cache.form_cache_key(REMITTER_DATA, TRANSACTION_DATA) != \
+            pdf_cache.form_cache_key(REMITTER_DATA, changed)
+
+    def test_etag_matching(self):
+        etag = pdf_cache.make_etag("abc")
+        assert pdf_cache.etag_matches('"abc"', etag)
+        assert pdf_cache.etag_matches('"x", W/"abc"', etag)
+        assert pdf_cache.etag_matches('*', etag)
+        assert not pdf_cache.etag_matches('"abd"', etag)
+        assert not pdf_cache.etag_matches(None, etag)
+
+
+class TestSingleFlight:
+    def test_concurrent_misses_render_once(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "pdf_cache_dir", str(tmp_path))
+        calls = []
+        release = threading.Event()
+        original = pdf_generator.render_form_bytes
+
+        def slow_render(remitter_data, transaction_data):
+            calls.append(1)
+            release.wait(5)
+            return original(remitter_data, transaction_data)
+
+        monkeypatch.setattr(pdf_generator, "render_form_bytes", slow_render)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(pdf_cache.get_or_render(REMITTER_DATA, TRANSACTION_DATA)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert len(set(results)) == 1
+        assert os.path.exists(results[0][1])
+
+    def test_concurrent_async_misses_render_once(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "pdf_cache_dir", str(tmp_path))
+        calls = []
+        original = pdf_generator.render_form_bytes
+
+        def counting_render(remitter_data, transaction_data):
+            calls.append(1)
+            return original(remitter_data, transaction_data)
+
+        monkeypatch.setattr(pdf_generator, "render_form_bytes", counting_render)
+
+        async def main():
+            return await asyncio.gather(*[
+                pdf_cache.get_or_render_async(REMITTER_DATA, TRANSACTION_DATA) for _ in range(5)
+            ])
+
+        results = asyncio.run(main())
+        assert len(calls) == 1
+        assert len(set(results)) == 1
+
+    def test_download_joins_a_prerender_in_flight(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "pdf_cache_dir", str(tmp_path))
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+        original = pdf_generator.render_form_bytes
+
+        def slow_render(remitter_data, transaction_data):
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return original(remitter_data, transaction_data)
+
+        monkeypatch.setattr(pdf_generator, "render_form_bytes", slow_render)
+        results = []
+        prerender = threading.Thread(target=lambda: results.append(pdf_cache.get_or_render(REMITTER_DATA, TRANSACTION_DATA)))
+        prerender.start()
+        assert started.wait(5)
+
+        async def download():
+            asyncio.get_running_loop().call_later(0.05, release.set)
+            return await pdf_cache.get_or_render_async(REMITTER_DATA, TRANSACTION_DATA)
+
+        results.append(asyncio.run(download()))
+        prerender.join()
+        assert len(calls) == 1
+        assert len(set(results)) == 1
+        assert os.path.exists(results[0][1])
+
+    def test_failed_render_is_shared_and_forgotten(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "pdf_cache_dir", str(tmp_path))
+
+        def broken_render(remitter_data, transaction_data):
+            raise ValueError("bad form")
+
+        monkeypatch.setattr(pdf_generator, "render_form_bytes", broken_render)
+
+        async def main():
+            return await asyncio.gather(*[
+                pdf_cache.get_or_render_async(REMITTER_DATA, TRANSACTION_DATA) for _ in range(3)
+            ], return_exceptions=True)
+
+        assert [type(result) for result in asyncio.run(main())] == [ValueError] * 3
+        assert pdf_cache._inflight == {}
+
+
+class TestPdfRoutes:
+    def test_download_records_path_and_sends_etag(self, client, auth_headers, remitter, transaction, db_session):
+        response = client.get(f"/api/pdf/download/{transaction.id}", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.content.startswith(b"%PDF")
+        etag = response.headers["etag"]
+
+        db_session.refresh(transaction)
+        assert transaction.pdf_path and os.path.exists(transaction.pdf_path)
+        assert etag == pdf_cache.make_etag(os.path.basename(transaction.pdf_path)[:-4])
+
+        response = client.get(
+            f"/api/pdf/download/{transaction.id}",
+            headers={**auth_headers, "If-None-Match": etag},
+        )
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+
+    def test_beneficiary_edit_invalidates(self, client, auth_headers, remitter, transaction, beneficiary, db_session):
+        first = client.get(f"/api/pdf/download/{transaction.id}", headers=auth_headers)
+        db_session.refresh(transaction)
+        old_path = transaction.pdf_path
+
+        response = client.put(
+            f"/api/beneficiaries/{beneficiary.id}",
+            json={"name": "Jane Doe"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        db_session.refresh(transaction)
+        assert transaction.pdf_path is None
+        assert not os.path.exists(old_path)
+
+        second = client.get(f"/api/pdf/download/{transaction.id}", headers=auth_headers)
+        assert second.headers["etag"] != first.headers["etag"]
+
+    def test_remitter_edit_invalidates(self, client, auth_headers, remitter, transaction, db_session):
+        client.get(f"/api/pdf/download/{transaction.id}", headers=auth_headers)
+        db_session.refresh(transaction)
+        assert transaction.pdf_path
+
+        response = client.put("/api/remitter/", json={"mobile": "9000000000"}, headers=auth_headers)
+        assert response.status_code == 200
+        db_session.expire_all()
+        assert db_session.get(Transaction, transaction.id).pdf_path is None
+
+    def test_unknown_transaction_is_404(self, client, auth_headers):
+        response = client.get("/api/pdf/download/999", headers=auth_headers)
+        assert response.status_code == 404
+
+
+class TestPrerender:
+    def create_transaction(self, client, auth_headers, beneficiary):
+        response = client.post(
+            "/api/transactions/",
+            json={"beneficiary_id": beneficiary.id, "amount": 2500.5, "transaction_date": "2025-09-24T00:00:00"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 201
+        return response.json()["id"]
+
+    def test_create_prerenders_when_enabled(self, client, auth_headers, remitter, beneficiary, db_session, monkeypatch):
+        monkeypatch.setattr(settings, "pdf_prerender", True)
+        transaction_id = self.create_transaction(client, auth_headers, beneficiary)
+
+        path = db_session.get(Transaction, transaction_id).pdf_path
+        assert path and os.path.exists(path)
+
+        response = client.get(f"/api/pdf/download/{transaction_id}", headers=auth_headers)
+        assert response.headers["etag"] == pdf_cache.make_etag(os.path.basename(path)[:-4])
+
+    def test_create_skips_prerender_by_default(self, client, auth_headers, remitter, beneficiary, db_session):
+        transaction_id = self.create_transaction(client, auth_headers, beneficiary)
+        assert db_session.get(Transaction, transaction_id).pdf_path is None
+
+    def test_prerender_failure_is_swallowed(self, client, auth_headers, remitter, beneficiary, db_session, monkeypatch):
+        monkeypatch.setattr(settings, "pdf_prerender", True)
+
+        def failing_render(remitter_data, transaction_data):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(pdf_generator, "render_form_bytes", failing_render)
+        transaction_id = self.create_transaction(client, auth_headers, beneficiary)
+        assert db_session.get(Transaction, transaction_id).pdf_path is None
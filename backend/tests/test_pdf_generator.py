@@ -0,0 +1,270 @@
+import json
+import os
+
+import pytest
+from pypdf import PdfReader
+from reportlab import rl_config
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Table, Paragraph
+from io import BytesIO
+
+from app.config import settings
+from app.services import pdf_cache, pdf_generator
+from app.services.pdf_generator import (
+    FormTemplateRegistry,
+    RTGSFormTemplate,
+    get_form_template,
+    generate_dynamic_form,
+    build_form_styles,
+    render_forms,
+    COL_WIDTHS,
+    _TextLine,
+)
+
+
+REMITTER_DATA = {
+    "account_with_branch": "Prime Co-op. Bank Ltd - JAHANGIRPURA",
+    "name": "JAY JALARAM ELECTRICALS",
+    "account_no": "123456789012",
+    "mobile": "9876543210",
+    "pan": "ABCDE1234F",
+    "cheque_no": "000123",
+}
+
+TRANSACTION_DATA = {
+    "beneficiary_name": "John Doe",
+    "beneficiary_bank": "State Bank of India",
+    "beneficiary_account_no": "1234567890",
+    "beneficiary_address": "Main Branch, 12 Station Road, Near Central Market, Surat, Gujarat 395003, India",
+    "beneficiary_ifsc": "SBIN0001234",
+    "amount_fig": "99,999,999.99",
+    "amount_words": "Nine Crore Ninety Nine Lakh Ninety Nine Thousand Nine Hundred Ninety Nine Rupees and Ninety Nine Paise Only",
+    "beneficiary_mobile": "9123456789",
+}
+
+# Bytes of the form above as generate_dynamic_form wrote it before the
+# template was compiled (one ReportLab Table per section, no XObjects)
+BASELINE_FORM_BYTES = 3277
+
+
+class TestFormTemplate:
+    def test_template_is_compiled_once(self):
+        assert get_form_template() is get_form_template()
+
+    def test_generate_dynamic_form_returns_pdf(self):
+        buffer = generate_dynamic_form(REMITTER_DATA, TRANSACTION_DATA)
+        assert buffer.getvalue().startswith(b"%PDF")
+
+    def test_empty_data_renders(self):
+        buffer = generate_dynamic_form({}, {})
+        assert buffer.getvalue().startswith(b"%PDF")
+
+    def test_row_heights_match_reportlab_table(self):
+        template = get_form_template()
+        styles = build_form_styles()
+        section = template.sections[1]
+        _, heights = section.layout(TRANSACTION_DATA, styles["data"])
+
+        rows = []
+        commands = [('LEFTPADDING', (0, 0), (-1, -1), 5), ('RIGHTPADDING', (0, 0), (-1, -1), 5)]
+        for i, row in enumerate(section.body_rows):
+            label = row.cells[0][2]
+            if row.spanned:
+                rows.append([Paragraph(label.text, label.style), ''])
+                commands.append(('SPAN', (0, i), (1, i)))
+            elif row.field:
+                rows.append([Paragraph(label.text, label.style), Paragraph(TRANSACTION_DATA[row.field], styles["data"])])
+            elif row.cells[1][2] is not None:
+                rows.append([Paragraph(label.text, label.style), Paragraph(row.cells[1][2].text, styles["data"])])
+            else:
+                rows.append([Paragraph(label.text, label.style), ''])
+        table = Table(rows, colWidths=COL_WIDTHS)
+        table.setStyle(commands)
+        table.wrap(600, 800)
+
+        assert heights == table._rowHeights
+
+    def test_static_layers_shared_across_pages(self):
+        template = RTGSFormTemplate()
+        buffer = BytesIO()
+        c = canvas.Canvas(buffer)
+        for _ in range(3):
+            template.draw_page(c, REMITTER_DATA, TRANSACTION_DATA)
+            c.showPage()
+        c.save()
+        # One header XObject and one for the static rows under the beneficiary table
+        assert buffer.getvalue().count(b"/Subtype /Form") == 2
+
+
+class TestFastText:
+    def test_short_plain_values_take_fast_path(self):
+        style = build_form_styles()["data"]
+        line = _TextLine.fit("  SBIN0001234 ", style, 290)
+        assert line is not None and line.text == "SBIN0001234"
+        assert line.height == style.leading
+        assert _TextLine.fit("", style, 290).height == 0
+
+    def test_long_or_markup_values_use_paragraph(self):
+        styles = build_form_styles()
+        assert _TextLine.fit(TRANSACTION_DATA["amount_words"], styles["data"], 290) is None
+        assert _TextLine.fit("A &amp; B Traders", styles["data"], 290) is None
+        assert _TextLine.fit("Line<br/>break", styles["data"], 290) is None
+        assert _TextLine.fit("For Bank Use Only", styles["section"], 500) is None
+
+    def test_layout_matches_paragraph_mode(self):
+        fast = RTGSFormTemplate(fast_text=True)
+        slow = RTGSFormTemplate(fast_text=False)
+        style = fast.styles["data"]
+        for data in ({}, REMITTER_DATA, TRANSACTION_DATA):
+            for fast_section, slow_section in zip(fast.sections, slow.sections):
+                assert fast_section.layout(data, style)[1] == slow_section.layout(data, style)[1]
+                assert fast_section.footer_height == slow_section.footer_height
+
+    def test_wrapping_values_still_wrap(self):
+        section = RTGSFormTemplate(fast_text=True).sections[1]
+        paragraphs, _ = section.layout(TRANSACTION_DATA, build_form_styles()["data"])
+        kinds = {row.field: type(p).__name__ for row, p in zip(section.body_rows, paragraphs) if row.field}
+        assert kinds["beneficiary_ifsc"] == "_TextLine"
+        assert kinds["beneficiary_address"] == "Paragraph"
+        assert kinds["amount_words"] == "Paragraph"
+
+
+class TestCompactOutput:
+    def test_same_form_gives_same_bytes(self):
+        first = generate_dynamic_form(REMITTER_DATA, TRANSACTION_DATA).getvalue()
+        second = RTGSFormTemplate().render(REMITTER_DATA, TRANSACTION_DATA).getvalue()
+        assert first == second
+        # Invariant metadata: fixed dates instead of the render time
+        assert b"/CreationDate (D:20000101000000" in first
+
+        bulk = [BytesIO(), BytesIO()]
+        for output in bulk:
+            render_forms([(REMITTER_DATA, TRANSACTION_DATA)] * 3, output)
+        assert bulk[0].getvalue() == bulk[1].getvalue()
+
+    def test_streams_are_binary_flate(self):
+        data = generate_dynamic_form(REMITTER_DATA, TRANSACTION_DATA).getvalue()
+        assert b"/FlateDecode" in data
+        assert b"/ASCII85Decode" not in data
+        assert b"/FontFile" not in data
+
+    def test_smaller_than_standard_output(self, monkeypatch):
+        compact = len(generate_dynamic_form(REMITTER_DATA, TRANSACTION_DATA).getvalue())
+        monkeypatch.setattr(settings, "pdf_compact_output", False)
+        monkeypatch.setattr(rl_config, "useA85", 1)
+        standard = len(generate_dynamic_form(REMITTER_DATA, TRANSACTION_DATA).getvalue())
+        assert compact < standard
+
+    def test_single_form_no_larger_than_baseline(self):
+        # Size of this form from the uncompiled template the XObjects replaced
+        assert len(generate_dynamic_form(REMITTER_DATA, TRANSACTION_DATA).getvalue()) <= BASELINE_FORM_BYTES
+
+    def test_single_form_draws_static_layer_inline(self):
+        single = generate_dynamic_form(REMITTER_DATA, TRANSACTION_DATA).getvalue()
+        assert b"/Subtype /Form" not in single
+        bulk = BytesIO()
+        render_forms([(REMITTER_DATA, TRANSACTION_DATA)], bulk)
+        assert bulk.getvalue().count(b"/Subtype /Form") == 2
+
+        words = [sorted(PdfReader(BytesIO(data)).pages[0].extract_text().split())
+                 for data in (single, bulk.getvalue())]
+        assert words[0] == words[1]
+
+    def test_one_line_values_share_a_text_object(self):
+        template = RTGSFormTemplate(fast_text=True)
+        buffer = BytesIO()
+        c = canvas.Canvas(buffer, pageCompression=0)
+        template.draw_page(c, REMITTER_DATA, {})
+        c.showPage()
+        c.save()
+        # Labels and values of a section are drawn in one text object rather
+        # than a save/colour/font/text/restore block per cell
+        data = buffer.getvalue()
+        value = data.index(b"(JAY JALARAM ELECTRICALS) Tj")
+        block = data[data.rindex(b"BT", 0, value):data.index(b"ET", value)]
+        assert b"(Name of Remitter/s) Tj" in block
+        assert b"(Mobile No of Remitter/s) Tj" in block
+        assert b"(Pan No) Tj" in block
+
+
+SBI_TEMPLATE = {
+    "id": "sbi",
+    "match": {"ifsc_prefixes": ["SBIN"], "banks": ["State Bank of India"]},
+    "header": [["RTGS", "Helvetica-Bold", 10], ["State Bank of India", "Helvetica-Bold", 10]],
+}
+
+
+def write_template(directory, filename, spec, mtime=None):
+    path = os.path.join(directory, filename)
+    with open(path, "w") as fileobj:
+        json.dump(spec, fileobj)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    write_template(str(tmp_path), "sbi.json", SBI_TEMPLATE)
+    registry = FormTemplateRegistry(str(tmp_path), reload_interval=0)
+    monkeypatch.setattr(pdf_generator, "_registry", registry)
+    return registry
+
+
+class TestTemplateRegistry:
+    def test_lookup_by_ifsc_prefix_and_bank(self, registry):
+        assert registry.resolve({"ifsc": "sbin0001234"}).id == "sbi"
+        assert registry.resolve({"bank": "State Bank of India"}).id == "sbi"
+        assert registry.resolve({"bank": "state bank  of india."}).id == "sbi"
+        assert registry.resolve({"ifsc": "PRIM0000001", "bank": "Prime Co-op. Bank Ltd"}) is registry.default
+        assert registry.resolve(None) is registry.default
+
+    def test_missing_layout_keys_fall_back_to_default(self, registry):
+        layout = registry.get("sbi").layout
+        assert layout["header"][1] == ("State Bank of India", "Helvetica-Bold", 10)
+        assert layout["sections"] == pdf_generator.RTGS_FORM_LAYOUT["sections"]
+
+    def test_templates_are_compiled_once(self, registry):
+        template = get_form_template({"ifsc": "SBIN0001234"})
+        assert get_form_template({"ifsc": "SBIN0009999"}) is template
+        assert template is not get_form_template()
+
+    def test_changed_file_is_reloaded(self, registry, tmp_path):
+        other = write_template(str(tmp_path), "hdfc.json", {"id": "hdfc", "match": {"ifsc_prefixes": ["HDFC"]}}, mtime=1000)
+        old = registry.resolve({"ifsc": "HDFC0000001"})
+        unchanged = registry.get("sbi").template
+
+        write_template(str(tmp_path), "hdfc.json", {"id": "hdfc", "match": {"ifsc_prefixes": ["HDFC", "HDFB"]}}, mtime=2000)
+        new = registry.resolve({"ifsc": "HDFB0000001"})
+        assert new.id == "hdfc" and new is not old
+        assert registry.get("sbi").template is unchanged
+
+        os.remove(other)
+        assert registry.resolve({"ifsc": "HDFC0000001"}) is registry.default
+
+    def test_invalid_file_is_skipped(self, registry, tmp_path):
+        (tmp_path / "broken.json").write_text("{not json")
+        assert registry.resolve({"ifsc": "SBIN0001234"}).id == "sbi"
+
+    def test_render_uses_remitter_bank_template(self, registry):
+        def header(remitter):
+            page = PdfReader(generate_dynamic_form(remitter, TRANSACTION_DATA)).pages[0]
+            return page.extract_text().splitlines()[:2]
+
+        assert header({**REMITTER_DATA, "ifsc": "SBIN0001234"}) == ["RTGS", "State Bank of India"]
+        assert header(REMITTER_DATA) == ["RTGS", "Prime Co-op. Bank Ltd"]
+
+    def test_bulk_document_mixes_templates(self, registry):
+        output = BytesIO()
+        forms = [(REMITTER_DATA, TRANSACTION_DATA), ({**REMITTER_DATA, "ifsc": "SBIN0001234"}, TRANSACTION_DATA)] * 2
+        assert render_forms(forms, output) == 4
+        # Two header and two footer XObjects, shared by the pages of each template
+        assert output.getvalue().count(b"/Subtype /Form") == 4
+
+    def test_cache_key_follows_template_version(self, registry, tmp_path):
+        remitter = {**REMITTER_DATA, "ifsc": "SBIN0001234"}
+        key = pdf_cache.form_cache_key(remitter, TRANSACTION_DATA)
+        write_template(str(tmp_path), "sbi.json", {**SBI_TEMPLATE, "title": "RTGS Form"}, mtime=3000)
+        assert pdf_cache.form_cache_key(remitter, TRANSACTION_DATA) != key
+        assert pdf_cache.form_cache_key(REMITTER_DATA, TRANSACTION_DATA) == \
+            pdf_cache.form_cache_key(REMITTER_DATA, TRANSACTION_DATA)
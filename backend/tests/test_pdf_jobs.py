@@ -0,0 +1,153 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import PdfJob
+from app.services import pdf_jobs
+from app.services.artifact_storage import get_artifact_storage
+
+
+@pytest.fixture
+def flaky_handler(monkeypatch):
+    """Make bulk_forms jobs fail with an error worth retrying"""
+    def fail(db, job, params, report):
+        raise OSError("Disk full")
+
+    monkeypatch.setitem(pdf_jobs.JOB_HANDLERS, "bulk_forms", fail)
+
+
+class TestJobQueue:
+    def test_run_once_renders_artifact(self, job_queue, db_session, user, remitter, transaction):
+        job = job_queue.submit(db_session, user, "bulk_forms", {"transaction_ids": [transaction.id]})
+        assert job.status == pdf_jobs.JOB_QUEUED
+
+        assert job_queue.run_once()
+        assert not job_queue.run_once()
+
+        db_session.refresh(job)
+        assert job.status == pdf_jobs.JOB_SUCCEEDED
+        assert job.attempts == 1
+        assert (job.progress, job.total) == (1, 1)
+        assert job.expires_at > datetime.utcnow()
+        with get_artifact_storage().open(job.result_path) as result:
+            assert result.read(4) == b"%PDF"
+
+    def test_failures_retry_with_backoff_then_fail(self, job_queue, db_session, user, flaky_handler, monkeypatch):
+        monkeypatch.setattr(pdf_jobs.settings, "pdf_job_retry_delay", 0)
+        job = job_queue.submit(db_session, user, "bulk_forms", {"transaction_ids": [1]}, max_attempts=2)
+
+        assert job_queue.run_once()
+        db_session.refresh(job)
+        assert job.status == pdf_jobs.JOB_QUEUED
+        assert job.attempts == 1
+        assert job.error == "Disk full"
+
+        assert job_queue.run_once()
+        db_session.refresh(job)
+        assert job.status == pdf_jobs.JOB_FAILED
+        assert job.attempts == 2
+        assert not job_queue.run_once()
+
+    def test_backoff_delays_next_attempt(self, job_queue, db_session, user, flaky_handler):
+        job = job_queue.submit(db_session, user, "bulk_forms", {"transaction_ids": [1]})
+        assert job_queue.run_once()
+        db_session.refresh(job)
+        assert job.available_at > datetime.utcnow()
+        assert not job_queue.run_once()
+
+    def test_missing_transactions_fail_without_retry(self, job_queue, db_session, user):
+        job = job_queue.submit(db_session, user, "bulk_forms", {"transaction_ids": [999]})
+        assert job_queue.run_once()
+        db_session.refresh(job)
+        assert (job.status, job.attempts, job.error) == (pdf_jobs.JOB_FAILED, 1, "No transactions found")
+
+    def test_too_many_forms_fail_without_retry(self, job_queue, db_session, user, remitter, transaction, monkeypatch):
+        monkeypatch.setattr(pdf_jobs.settings, "pdf_job_max_forms", 0)
+        job = job_queue.submit(db_session, user, "bulk_forms", {"transaction_ids": [transaction.id]})
+        assert job_queue.run_once()
+        db_session.refresh(job)
+        assert job.status == pdf_jobs.JOB_FAILED
+        assert job.error == "Too many transactions for one PDF (maximum 0)"
+
+    def test_recover_requeues_stale_running_jobs(self, job_queue, db_session, user, remitter, transaction):
+        job = job_queue.submit(db_session, user, "bulk_forms", {"transaction_ids": [transaction.id]})
+        job.status = pdf_jobs.JOB_RUNNING
+        job.updated_at = datetime.utcnow() - timedelta(hours=1)
+        db_session.commit()
+
+        assert job_queue.recover() == 1
+        assert job_queue.run_once()
+        db_session.refresh(job)
+        assert job.status == pdf_jobs.JOB_SUCCEEDED
+
+    def test_recover_leaves_live_jobs_alone(self, job_queue, db_session, user):
+        job = job_queue.submit(db_session, user, "bulk_forms", {"transaction_ids": [1]})
+        job.status = pdf_jobs.JOB_RUNNING
+        db_session.commit()
+        assert job_queue.recover() == 0
+
+    def test_cleanup_removes_expired_jobs_and_files(self, job_queue, db_session, user, remitter, transaction):
+        job = job_queue.submit(db_session, user, "bulk_forms", {"transaction_ids": [transaction.id]})
+        job_queue.run_once()
+        db_session.refresh(job)
+        job_id, key = job.id, job.result_path
+        job.expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db_session.commit()
+
+        assert job_queue.cleanup_expired() == 1
+        assert not get_artifact_storage().exists(key)
+        db_session.expire_all()
+        assert db_session.get(PdfJob, job_id) is None
+
+    def test_cleanup_keeps_artifacts_shared_with_live_jobs(self, job_queue, db_session, user, remitter, transaction):
+        jobs = [job_queue.submit(db_session, user, "bulk_forms", {"transaction_ids": [transaction.id]}) for _ in range(2)]
+        job_queue.run_once()
+        job_queue.run_once()
+        for job in jobs:
+            db_session.refresh(job)
+        assert jobs[0].result_path == jobs[1].result_path
+        jobs[0].expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db_session.commit()
+
+        assert job_queue.cleanup_expired() == 1
+        assert get_artifact_storage().exists(jobs[1].result_path)
+
+
+class TestJobRoutes:
+    def test_job_lifecycle(self, client, auth_headers, job_queue, remitter, transaction):
+        response = client.post("/api/pdf/jobs", json={"transaction_ids": [transaction.id]}, headers=auth_headers)
+        assert response.status_code == 202
+        job_id = response.json()["id"]
+        assert response.json()["status"] == "queued"
+
+        response = client.get(f"/api/pdf/jobs/{job_id}/download", headers=auth_headers)
+        assert response.status_code == 409
+
+        job_queue.run_once()
+        response = client.get(f"/api/pdf/jobs/{job_id}", headers=auth_headers)
+        assert response.json()["status"] == "succeeded"
+        assert response.json()["progress"] == 1
+
+        response = client.get(f"/api/pdf/jobs/{job_id}/download", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.content.startswith(b"%PDF")
+
+    def test_filters_are_stored_as_json(self, client, auth_headers, job_queue, remitter, transaction):
+        response = client.post("/api/pdf/jobs", json={"filters": {"month": 9, "year": 2025}}, headers=auth_headers)
+        assert response.status_code == 202
+        job_queue.run_once()
+        response = client.get(f"/api/pdf/jobs/{response.json()['id']}", headers=auth_headers)
+        assert response.json()["status"] == "succeeded"
+
+    def test_submit_checks_the_selection(self, client, auth_headers, job_queue, db_session, transaction, monkeypatch):
+        response = client.post("/api/pdf/jobs", json={"transaction_ids": [999]}, headers=auth_headers)
+        assert response.status_code == 404
+
+        monkeypatch.setattr(pdf_jobs.settings, "pdf_job_max_forms", 0)
+        response = client.post("/api/pdf/jobs", json={"transaction_ids": [transaction.id]}, headers=auth_headers)
+        assert response.status_code == 400
+        assert db_session.query(PdfJob).count() == 0
+
+    def test_other_users_job_is_404(self, client, auth_headers, job_queue):
+        response = client.get("/api/pdf/jobs/1", headers=auth_headers)
+        assert response.status_code == 404
@@ -0,0 +1,119 @@
+from io import BytesIO
+
+import pytest
+from pypdf import PdfReader
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from app.config import settings
+from app.services import pdf_cache, pdf_overlay
+from app.services.pdf_generator import FormTemplateRegistry, generate_dynamic_form, render_forms
+from app.services import pdf_generator
+
+
+REMITTER_DATA = {"name": "JAY JALARAM ELECTRICALS", "account_no": "123456789012", "cheque_no": "000123"}
+TRANSACTION_DATA = {
+    "beneficiary_name": "John Doe",
+    "beneficiary_ifsc": "SBIN0001234",
+    "amount_fig": "99,999,999.99",
+    "amount_words": "Nine Crore Ninety Nine Lakh Ninety Nine Thousand Nine Hundred Ninety Nine Rupees and Ninety Nine Paise Only",
+}
+
+
+@pytest.fixture
+def official_form(tmp_path, monkeypatch):
+    """A stand-in for the bank's blank official form"""
+    path = tmp_path / "official.pdf"
+    c = canvas.Canvas(str(path), pagesize=A4)
+    c.setFont("Helvetica", 12)
+    c.drawString(72, 780, "OFFICIAL BANK FORM")
+    c.showPage()
+    c.save()
+    monkeypatch.setattr(settings, "pdf_overlay_form", str(path))
+    monkeypatch.setattr(pdf_generator, "_registry", FormTemplateRegistry(str(tmp_path / "templates")))
+    return path
+
+
+def page_xobjects(page):
+    return page["/Resources"]["/XObject"]
+
+
+class TestFitLines:
+    def test_short_text_keeps_size(self):
+        assert pdf_overlay.fit_lines("  SBIN0001234 ", "Helvetica-Bold", 10, 290, 1) == (["SBIN0001234"], 10)
+
+    def test_long_text_wraps_then_shrinks(self):
+        lines, size = pdf_overlay.fit_lines(TRANSACTION_DATA["amount_words"], "Helvetica-Bold", 10, 290, 2)
+        assert len(lines) == 2 and size == 10
+        lines, size = pdf_overlay.fit_lines(TRANSACTION_DATA["amount_words"], "Helvetica-Bold", 10, 290, 1)
+        assert len(lines) == 1 and size < 10
+
+
+class TestOverlayMode:
+    def test_off_without_official_form(self):
+        assert pdf_overlay.get_overlay_form() is None
+
+    def test_single_form_is_filled_on_official_page(self, official_form):
+        reader = PdfReader(BytesIO(generate_dynamic_form(REMITTER_DATA, TRANSACTION_DATA).getvalue()))
+        assert len(reader.pages) == 1
+        page = reader.pages[0]
+        assert pdf_overlay.OFFICIAL_FORM_NAME in page_xobjects(page)
+        text = page.extract_text()
+        assert "OFFICIAL BANK FORM" in text
+        assert "JAY JALARAM ELECTRICALS" in text and "SBIN0001234" in text
+
+    def test_official_form_is_parsed_once(self, official_form):
+        assert pdf_overlay.get_overlay_form() is pdf_overlay.get_overlay_form()
+
+    def test_bulk_pages_share_one_official_xobject(self, official_form):
+        output = BytesIO()
+        assert render_forms([(REMITTER_DATA, TRANSACTION_DATA)] * 5, output) == 5
+        reader = PdfReader(BytesIO(output.getvalue()))
+        refs = {page_xobjects(page).raw_get(pdf_overlay.OFFICIAL_FORM_NAME).idnum for page in reader.pages}
+        assert len(refs) == 1
+
+    def test_bank_templates_are_not_overlaid(self, official_form, tmp_path):
+        (tmp_path / "templates").mkdir()
+        (tmp_path / "templates" / "sbi.json").write_text('{"id": "sbi", "match": {"ifsc_prefixes": ["SBIN"]}}')
+        output = BytesIO()
+        render_forms([(REMITTER_DATA, TRANSACTION_DATA), ({**REMITTER_DATA, "ifsc": "SBIN0000001"}, TRANSACTION_DATA)], output)
+        first, second = PdfReader(BytesIO(output.getvalue())).pages
+        assert pdf_overlay.OFFICIAL_FORM_NAME in page_xobjects(first)
+        assert pdf_overlay.OFFICIAL_FORM_NAME not in page_xobjects(second)
+
+    def test_cache_key_tracks_overlay_mode(self, official_form, monkeypatch):
+        key = pdf_cache.form_cache_key(REMITTER_DATA, TRANSACTION_DATA)
+        monkeypatch.setattr(settings, "pdf_overlay_form", "")
+        assert pdf_cache.form_cache_key(REMITTER_DATA, TRANSACTION_DATA) != key
+
+    def test_output_is_deterministic(self, official_form):
+        first = generate_dynamic_form(REMITTER_DATA, TRANSACTION_DATA).getvalue()
+        assert generate_dynamic_form(REMITTER_DATA, TRANSACTION_DATA).getvalue() == first
+
+
+class TestAddIndirectObject:
+    def test_installed_pypdf_adds_a_resolvable_reference(self):
+        # Fails loudly when a pypdf upgrade changes the call it wraps
+        import pypdf
+        from pypdf.generic import DecodedStreamObject
+
+        writer = pypdf.PdfWriter()
+        stream = DecodedStreamObject()
+        stream.set_data(b"q Q")
+        reference = pdf_overlay.add_indirect_object(writer, stream)
+        assert reference.get_object() is stream
+        assert pdf_overlay.add_indirect_object(writer, stream) == reference
+
+    def test_public_add_object_is_preferred(self):
+        class Writer:
+            def add_object(self, obj):
+                return ("public", obj)
+
+            def _add_object(self, obj):
+                return ("private", obj)
+
+        assert pdf_overlay.add_indirect_object(Writer(), 1) == ("public", 1)
+
+    def test_writer_without_add_object_is_refused(self):
+        with pytest.raises(RuntimeError, match="no PdfWriter.add_object or _add_object"):
+            pdf_overlay.add_indirect_object(object(), 1)
@@ -0,0 +1,76 @@
+from reportlab.pdfgen import canvas
+
+from app.models import User
+from app.services.form_data import prepare_form_data
+from app.services.form_preview import plain_label
+
+
+class TestPreviewRoute:
+    def preview(self, client, auth_headers, body, **params):
+        return client.post("/api/pdf/preview", json=body, params=params, headers=auth_headers)
+
+    def test_matches_pdf_form_data(self, client, auth_headers, remitter, transaction, db_session):
+        response = self.preview(client, auth_headers, {
+            "beneficiary_id": transaction.beneficiary_id,
+            "amount": float(transaction.amount),
+            "cheque_number": transaction.cheque_number,
+        })
+        assert response.status_code == 200
+        body = response.json()
+
+        user = db_session.get(User, transaction.user_id)
+        remitter_data, transaction_data = prepare_form_data(transaction, user, db_session)
+        assert body["remitter"] == remitter_data
+        assert body["transaction"] == transaction_data
+        assert body["transaction"]["amount_fig"] == "12,345.67"
+
+        fields = {field["field"]: field for field in body["fields"]}
+        assert fields["amount_words"]["value"] == transaction_data["amount_words"]
+        assert fields["beneficiary_address"]["label"] == "Beneficiary Bank's Branch & its Address"
+        assert [field["section"] for field in body["fields"]][:2] == ["remitter", "remitter"]
+
+    def test_partial_form(self, client, auth_headers, remitter):
+        response = self.preview(client, auth_headers, {"amount": 100})
+        assert response.status_code == 200
+        transaction_data = response.json()["transaction"]
+        assert transaction_data["amount_fig"] == "100.00"
+        assert transaction_data["amount_words"]
+        assert transaction_data["beneficiary_name"] == ""
+
+        response = self.preview(client, auth_headers, {})
+        assert response.json()["transaction"]["amount_words"] == ""
+
+    def test_html_fragment_is_escaped(self, client, auth_headers, beneficiary, db_session):
+        beneficiary.name = "A & B <Traders>"
+        db_session.commit()
+        response = self.preview(client, auth_headers, {"beneficiary_id": beneficiary.id}, format="html")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/html")
+        assert '<tr data-field="beneficiary_name"><th>Beneficiary Party\'s Name</th>' \
+               '<td>A &amp; B &lt;Traders&gt;</td></tr>' in response.text.replace("&#x27;", "'")
+
+    def test_other_users_beneficiary_is_404(self, client, auth_headers, beneficiary, db_session):
+        other = User(email="other@example.com", name="Other", password_hash="x")
+        db_session.add(other)
+        db_session.commit()
+        beneficiary.user_id = other.id
+        db_session.commit()
+        response = self.preview(client, auth_headers, {"beneficiary_id": beneficiary.id})
+        assert response.status_code == 404
+
+    def test_invalid_amount_is_422(self, client, auth_headers):
+        assert self.preview(client, auth_headers, {"amount": 0}).status_code == 422
+        assert self.preview(client, auth_headers, {"amount": 100}, format="pdf").status_code == 422
+
+    def test_does_not_render(self, client, auth_headers, remitter, beneficiary, monkeypatch):
+        def no_canvas(*args, **kwargs):
+            raise AssertionError("preview must not render a PDF")
+
+        monkeypatch.setattr(canvas.Canvas, "__init__", no_canvas)
+        response = self.preview(client, auth_headers, {"beneficiary_id": beneficiary.id, "amount": 5})
+        assert response.status_code == 200
+
+
+def test_plain_label():
+    assert plain_label("if available, please submit<br/>Beneficiary party's Pan Card No") == \
+        "if available, please submit Beneficiary party's Pan Card No"
@@ -0,0 +1,189 @@
+import asyncio
+import re
+import threading
+from datetime import datetime
+
+import pytest
+
+from app.models import Transaction
+from app.services import pdf_generator, pdf_pool
+from app.services.form_data import load_render_context, load_render_contexts
+from app.services.pdf_pool import PdfRenderPool, PdfRenderBusy, PdfRenderTimeout
+
+
+def page_count(pdf_bytes):
+    return len(re.findall(rb"/Type /Page\b(?!s)", pdf_bytes))
+
+
+@pytest.fixture
+def transactions(db_session, user, beneficiary):
+    rows = []
+    for day in range(1, 6):
+        rows.append(Transaction(
+            user_id=user.id,
+            beneficiary_id=beneficiary.id,
+            amount=1000.0 * day,
+            amount_in_words="",
+            transaction_date=datetime(2025, 9, day),
+        ))
+    db_session.add_all(rows)
+    db_session.commit()
+    return rows
+
+
+class TestBulkPdf:
+    def test_bulk_by_ids(self, client, auth_headers, remitter, transactions):
+        ids = [t.id for t in transactions[:3]]
+        response = client.post("/api/pdf/bulk", json={"transaction_ids": ids}, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/pdf"
+        assert page_count(response.content) == 3
+
+    def test_bulk_by_filter(self, client, auth_headers, remitter, transactions):
+        response = client.post(
+            "/api/pdf/bulk",
+            json={"filters": {"start_date": "2025-09-02T00:00:00", "end_date": "2025-09-04T00:00:00"}},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        assert page_count(response.content) == 3
+
+    def test_bulk_loads_forms_in_one_query(self, client, auth_headers, remitter, transactions, query_counter):
+        ids = [t.id for t in transactions]
+        query_counter.clear()
+        response = client.post("/api/pdf/bulk", json={"transaction_ids": ids}, headers=auth_headers)
+        assert response.status_code == 200
+        # One query authenticates the user, one loads every form
+        assert len(query_counter) == 2
+
+    def test_bulk_requires_selection(self, client, auth_headers):
+        response = client.post("/api/pdf/bulk", json={}, headers=auth_headers)
+        assert response.status_code == 422
+
+    def test_bulk_nothing_found(self, client, auth_headers):
+        response = client.post("/api/pdf/bulk", json={"transaction_ids": [999]}, headers=auth_headers)
+        assert response.status_code == 404
+
+
+class TestRenderContext:
+    def test_contexts_load_in_one_query(self, db_session, user, remitter, transactions, query_counter):
+        ids = [t.id for t in reversed(transactions)]
+        db_session.refresh(user)
+        query_counter.clear()
+        contexts = load_render_contexts(db_session, user, transaction_ids=ids)
+        assert len(query_counter) == 1
+        assert [c.transaction.id for c in contexts] == sorted(ids)
+        assert contexts[0].remitter_data["name"] == "JAY JALARAM ELECTRICALS"
+        assert contexts[0].transaction_data["amount_fig"] == "1,000.00"
+        assert contexts[0].filename == "RTGS_John_Doe_20250901.pdf"
+
+    def test_missing_or_foreign_transaction(self, db_session, user, transactions):
+        assert load_render_context(db_session, user, 999) is None
+        user.id += 1000
+        assert load_render_context(db_session, user, transactions[0].id) is None
+
+    def test_download_loads_context_in_one_query(self, client, auth_headers, remitter, transaction, query_counter):
+        client.get(f"/api/pdf/download/{transaction.id}", headers=auth_headers)
+        query_counter.clear()
+        response = client.get(f"/api/pdf/download/{transaction.id}", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["content-disposition"] == "attachment; filename=RTGS_John_Doe_20250924.pdf"
+        # One query authenticates the user, one loads the transaction, its
+        # beneficiary and the remitter; the cached PDF needs no writes
+        assert len(query_counter) == 2
+
+
+class TestRenderPool:
+    def test_process_pool_renders_bytes(self):
+        pool = PdfRenderPool(workers=1)
+        try:
+            pdf = asyncio.run(pool.render({"name": "JAY JALARAM ELECTRICALS"}, {"amount_fig": "1,000.00"}))
+        finally:
+            pool.shutdown()
+        assert pdf.startswith(b"%PDF")
+
+    def test_full_queue_rejects_with_busy(self, monkeypatch):
+        pool = PdfRenderPool(workers=0, max_pending=1, queue_timeout=0.05)
+        release = threading.Event()
+
+        def blocked_render(*args):
+            release.wait(5)
+            return b"%PDF"
+
+        monkeypatch.setattr(pdf_generator, "render_form_bytes", blocked_render)
+
+        async def main():
+            first = asyncio.ensure_future(pool.render({}, {}))
+            await asyncio.sleep(0.01)
+            try:
+                with pytest.raises(PdfRenderBusy):
+                    await pool.render({}, {})
+            finally:
+                release.set()
+            return await first
+
+        assert asyncio.run(main()) == b"%PDF"
+
+    def test_timed_out_render_holds_its_slot_until_it_ends(self, tmp_path, monkeypatch):
+        pool = PdfRenderPool(workers=0, max_pending=1, queue_timeout=0.05, render_timeout=0.05)
+        release = threading.Event()
+        output = tmp_path / "rtgs_bulk_orphan.pdf"
+
+        def slow_render(forms):
+            release.wait(5)
+            output.write_bytes(b"%PDF")
+            return str(output)
+
+        monkeypatch.setattr(pdf_generator, "render_forms_to_file", slow_render)
+
+        async def main():
+            with pytest.raises(PdfRenderTimeout):
+                await pool.render_many([])
+            # The timed-out render still runs, so there is no free slot
+            with pytest.raises(PdfRenderBusy):
+                await pool.render_many([])
+            release.set()
+            slots = pool._slots
+            for _ in range(500):
+                if not slots.locked():
+                    break
+                await asyncio.sleep(0.01)
+            assert not slots.locked()
+
+        asyncio.run(main())
+        assert not output.exists()
+
+    def test_background_renders_share_the_queue(self, monkeypatch):
+        pool = PdfRenderPool(workers=0, max_pending=1, queue_timeout=0.05)
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocked_render(*args):
+            started.set()
+            release.wait(5)
+            return b"%PDF"
+
+        monkeypatch.setattr(pdf_generator, "render_form_bytes", blocked_render)
+        results = []
+        background = threading.Thread(target=lambda: results.append(pool.render_sync({}, {})))
+        background.start()
+        assert started.wait(5)
+        try:
+            with pytest.raises(PdfRenderBusy):
+                asyncio.run(pool.render({}, {}))
+            with pytest.raises(PdfRenderBusy):
+                pool.render_sync({}, {})
+        finally:
+            release.set()
+            background.join()
+        assert results == [b"%PDF"]
+        assert asyncio.run(pool.render({}, {})) == b"%PDF"
+
+    def test_busy_pool_returns_503(self, client, auth_headers, transaction, monkeypatch):
+        async def busy(*args):
+            raise PdfRenderBusy("PDF renderer is busy, please retry shortly")
+
+        monkeypatch.setattr(pdf_pool.get_render_pool(), "render", busy)
+        response = client.get(f"/api/pdf/download/{transaction.id}", headers=auth_headers)
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "5"
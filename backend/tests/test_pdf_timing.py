@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services import pdf_timing
+from app.services.pdf_generator import generate_dynamic_form
+from app.services.pdf_pool import PdfRenderPool
+
+
+@pytest.fixture
+def timing_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "pdf_timing_enabled", True)
+    pdf_timing.reset_histograms()
+    yield
+    pdf_timing.reset_histograms()
+
+
+def parse_server_timing(value):
+    return {entry.split(";")[0].strip() for entry in value.split(",")}
+
+
+class TestStageTimings:
+    def test_stage_is_noop_without_collector(self):
+        with pdf_timing.stage("draw"):
+            pass
+        assert not pdf_timing.active()
+
+    def test_timed_call_collects_render_stages(self):
+        result, durations = pdf_timing.timed_call(generate_dynamic_form, {}, {})
+        assert result.getvalue().startswith(b"%PDF")
+        assert {"layout", "draw", "save"} <= set(durations)
+        assert not pdf_timing.active()
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = pdf_timing.Histogram(buckets=(1, 10))
+        for ms in (0.5, 1, 5, 50):
+            histogram.observe(ms)
+        snapshot = histogram.snapshot()
+        assert snapshot["buckets"] == {"1": 2, "10": 3, "+Inf": 4}
+        assert snapshot["count"] == 4
+        assert snapshot["sum_ms"] == 56.5
+
+    def test_process_pool_sends_worker_stages_back(self):
+        pool = PdfRenderPool(workers=1)
+
+        async def main():
+            timings = pdf_timing.start()
+            data = await pool.render({}, {})
+            return data, timings.durations
+
+        try:
+            data, durations = asyncio.run(main())
+        finally:
+            pool.shutdown()
+        assert data.startswith(b"%PDF")
+        assert {"queue", "render", "layout", "draw", "save"} <= set(durations)
+
+
+class TestTimingMiddleware:
+    def test_disabled_by_default(self, client, auth_headers, remitter, transaction):
+        response = client.get(f"/api/pdf/download/{transaction.id}", headers=auth_headers)
+        assert "server-timing" not in response.headers
+
+    def test_download_reports_stages(self, client, auth_headers, remitter, transaction, timing_enabled):
+        response = client.get(f"/api/pdf/download/{transaction.id}", headers=auth_headers)
+        assert response.status_code == 200
+        stages = parse_server_timing(response.headers["server-timing"])
+        assert {"db", "words", "queue", "render", "layout", "draw", "save", "total"} <= stages
+
+        # A cache hit skips rendering
+        response = client.get(f"/api/pdf/download/{transaction.id}", headers=auth_headers)
+        stages = parse_server_timing(response.headers["server-timing"])
+        assert "render" not in stages and "db" in stages
+
+        response = client.get("/api/pdf/timings", headers=auth_headers)
+        # The timings request itself is recorded after its body is built
+        histograms = response.json()["stages"]
+        assert histograms["total"]["count"] == 2
+        assert histograms["render"]["count"] == 1
+
+    def test_other_routes_are_not_timed(self, client, auth_headers, timing_enabled):
+        response = client.get("/api/beneficiaries/", headers=auth_headers)
+        assert "server-timing" not in response.headers
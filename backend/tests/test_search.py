@@ -0,0 +1,140 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+from app.models import Beneficiary, Transaction, User
+from app.services import search
+from app.services.search import match_expression, rebuild_search_index, search_terms
+
+
+@pytest.fixture
+def history(db_session, user, beneficiary):
+    """A second payee and a few transactions with searchable purposes and remarks"""
+    traders = Beneficiary(user_id=user.id, name="Ramesh Traders", account_number="9876543210",
+                          bank_name="HDFC Bank", branch_name="Adajan", ifsc_code="HDFC0001234")
+    db_session.add(traders)
+    db_session.flush()
+    db_session.add_all([
+        Transaction(user_id=user.id, beneficiary_id=payee.id, amount=amount, amount_in_words="-",
+                    transaction_date=datetime(2025, 9, day), purpose=purpose, remarks=remarks)
+        for payee, amount, day, purpose, remarks in [
+            (beneficiary, 100, 1, "Office rent", "September"),
+            (traders, 2500, 2, "Cable supplies", "Invoice 981"),
+            (traders, 300, 3, "Cable supplies and cable trays", None),
+            (beneficiary, 40, 4, "Advance", "Rent deposit for the godown"),
+        ]
+    ])
+    db_session.commit()
+    return traders
+
+
+def listing(client, auth_headers, path="/api/transactions/", **params):
+    response = client.get(path, params=params, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+class TestSearchTerms:
+    def test_words_become_prefix_queries(self):
+        assert search_terms('cable "trays" -rent') == ["cable", "trays", "rent"]
+        assert match_expression(["cab", "tr"]) == '"cab"* "tr"*'
+        assert search_terms("  --  ") == []
+        assert len(search_terms("a " * 50)) == search.MAX_SEARCH_TERMS
+
+
+class TestTransactionSearch:
+    def test_prefix_matches_name_purpose_and_remarks(self, client, auth_headers, history):
+        def amounts(q):
+            body = listing(client, auth_headers, q=q, sort="amount", order="asc")
+            return [item["amount"] for item in body["transactions"]]
+
+        assert amounts("rames") == ["300.00", "2500.00"]
+        assert amounts("ren") == ["40.00", "100.00"]
+        assert amounts("invoice 98") == ["2500.00"]
+        assert amounts("cable john") == []
+
+    def test_best_match_first_with_totals(self, client, auth_headers, history):
+        body = listing(client, auth_headers, q="cable")
+        assert [item["amount"] for item in body["transactions"]] == ["300.00", "2500.00"]
+        assert (body["total"], body["total_amount"], body["next_cursor"]) == (2, "2800.00", None)
+
+        body = listing(client, auth_headers, q="cable", limit=1, skip=1)
+        assert [item["amount"] for item in body["transactions"]] == ["2500.00"]
+        assert body["total"] == 2
+
+    def test_search_combines_with_filters(self, client, auth_headers, history):
+        body = listing(client, auth_headers, q="rent", min_amount="50", start_date="2025-09-01T00:00:00")
+        assert [item["amount"] for item in body["transactions"]] == ["100.00"]
+
+    def test_search_is_scoped_to_the_user(self, client, auth_headers, db_session, history):
+        other = User(name="Other", email="other@example.com", password_hash="-")
+        db_session.add(other)
+        db_session.flush()
+        payee = Beneficiary(user_id=other.id, name="Cable House", account_number="1111111111",
+                            bank_name="SBI", branch_name="Main", ifsc_code="SBIN0001234")
+        db_session.add(payee)
+        db_session.flush()
+        db_session.add(Transaction(user_id=other.id, beneficiary_id=payee.id, amount=5, amount_in_words="-",
+                                   transaction_date=datetime(2025, 9, 1), purpose="Cable"))
+        db_session.commit()
+
+        assert listing(client, auth_headers, q="cable")["total"] == 2
+        assert [item["name"] for item in listing(client, auth_headers, "/api/beneficiaries/", q="cable")] == []
+
+    def test_relevance_order_is_paged_with_skip(self, client, auth_headers, history):
+        cursor = listing(client, auth_headers, q="cable", sort="date", limit=1)["next_cursor"]
+        assert cursor is not None
+        response = client.get("/api/transactions/", params={"q": "cable", "cursor": cursor}, headers=auth_headers)
+        assert response.status_code == 400
+
+    def test_index_follows_updates_and_deletes(self, client, auth_headers, db_session, history):
+        transaction = db_session.query(Transaction).filter(Transaction.purpose == "Advance").one()
+        transaction.remarks = "Security deposit"
+        db_session.commit()
+        assert listing(client, auth_headers, q="godown")["total"] == 0
+        assert listing(client, auth_headers, q="securi")["total"] == 1
+
+        history.name = "Mahalaxmi Electricals"
+        db_session.commit()
+        assert listing(client, auth_headers, q="ramesh")["total"] == 0
+        assert listing(client, auth_headers, q="mahala")["total"] == 2
+
+        db_session.delete(transaction)
+        db_session.commit()
+        assert listing(client, auth_headers, q="securi")["total"] == 0
+
+    def test_like_fallback_without_fts(self, client, auth_headers, history, monkeypatch):
+        monkeypatch.setattr(search, "search_index_supported", lambda conn: False)
+        body = listing(client, auth_headers, q="cable supp")
+        assert sorted(item["amount"] for item in body["transactions"]) == ["2500.00", "300.00"]
+
+
+class TestBeneficiarySearch:
+    def test_name_bank_and_branch_prefixes(self, client, auth_headers, history):
+        def names(q):
+            return [item["name"] for item in listing(client, auth_headers, "/api/beneficiaries/", q=q)]
+
+        assert names("ram") == ["Ramesh Traders"]
+        assert names("state ban") == ["John Doe"]
+        assert names("adaj") == ["Ramesh Traders"]
+        assert set(names("")) == {"John Doe", "Ramesh Traders"}
+
+    def test_inactive_beneficiaries_are_hidden(self, client, auth_headers, db_session, history):
+        history.is_active = False
+        db_session.commit()
+        assert listing(client, auth_headers, "/api/beneficiaries/", q="ramesh") == []
+
+
+class TestRebuild:
+    def test_rebuild_restores_a_lost_index(self, client, auth_headers, db_engine, history):
+        with db_engine.begin() as conn:
+            conn.execute(text("DROP TRIGGER transactions_fts_insert"))
+            conn.execute(text("DELETE FROM transactions_fts"))
+        assert listing(client, auth_headers, q="cable")["total"] == 0
+
+        with db_engine.begin() as conn:
+            assert rebuild_search_index(conn)
+            triggers = conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).scalars().all()
+        assert set(search.SEARCH_TRIGGERS) <= set(triggers)
+        assert listing(client, auth_headers, q="cable")["total"] == 2
@@ -0,0 +1,142 @@
+from datetime import date, datetime, timedelta
+from io import BytesIO
+
+import pytest
+from pypdf import PdfReader
+
+from app.models import Beneficiary, Transaction, User
+from app.services import statement_pdf
+from app.services.statement_pdf import statement_period, statement_totals, write_statement
+
+
+@pytest.fixture
+def second_beneficiary(db_session, user):
+    db_beneficiary = Beneficiary(
+        user_id=user.id,
+        name="Acme Traders",
+        account_number="9876543210",
+        bank_name="HDFC Bank",
+        branch_name="Ring Road",
+        ifsc_code="HDFC0000001",
+    )
+    db_session.add(db_beneficiary)
+    db_session.commit()
+    return db_beneficiary
+
+
+def add_transactions(db_session, user, beneficiary, amounts, start=datetime(2025, 9, 1)):
+    db_session.add_all([
+        Transaction(
+            user_id=user.id,
+            beneficiary_id=beneficiary.id,
+            amount=amount,
+            amount_in_words="-",
+            cheque_number=f"{i:06d}",
+            transaction_date=start + timedelta(hours=i),
+        )
+        for i, amount in enumerate(amounts)
+    ])
+    db_session.commit()
+
+
+def pdf_text(data):
+    return "\n".join(page.extract_text() for page in PdfReader(BytesIO(data)).pages)
+
+
+class TestStatementPeriod:
+    def test_month(self):
+        start, end, label = statement_period(year=2024, month=2)
+        assert (start, end) == (datetime(2024, 2, 1), datetime(2024, 3, 1))
+        assert label == "01 Feb 2024 - 29 Feb 2024"
+
+    def test_date_range_includes_end_date(self):
+        start, end, _ = statement_period(date(2025, 9, 10), date(2025, 9, 10))
+        assert (start, end) == (datetime(2025, 9, 10), datetime(2025, 9, 11))
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            statement_period()
+        with pytest.raises(ValueError):
+            statement_period(start_date=date(2025, 9, 1))
+        with pytest.raises(ValueError):
+            statement_period(date(2025, 9, 2), date(2025, 9, 1))
+
+
+class TestStatementTotals:
+    def test_totals_per_beneficiary_and_grand_total(self, db_session, user, beneficiary, second_beneficiary):
+        add_transactions(db_session, user, beneficiary, [100.5, 200])
+        add_transactions(db_session, user, second_beneficiary, [50])
+        add_transactions(db_session, user, beneficiary, [999], start=datetime(2025, 10, 1))
+
+        start, end, _ = statement_period(year=2025, month=9)
+        totals, grand_total = statement_totals(db_session, user, start, end)
+        assert [tuple(row) for row in totals] == [
+            ("Acme Traders", "HDFC Bank", "9876543210", 1, 50),
+            ("John Doe", "State Bank of India", "1234567890", 2, 300.5),
+        ]
+        assert tuple(grand_total) == (3, 350.5)
+
+    def test_empty_period(self, db_session, user):
+        start, end, _ = statement_period(year=2025, month=9)
+        assert statement_totals(db_session, user, start, end) == ([], (0, 0))
+
+
+class TestStatementPdf:
+    def test_rows_split_into_one_table_per_page(self, db_session, user, beneficiary):
+        add_transactions(db_session, user, beneficiary, [1000 + i for i in range(150)])
+        start, end, label = statement_period(year=2025, month=9)
+        output = BytesIO()
+        pages = write_statement(db_session, user, start, end, label, output, chunk_size=20)
+
+        reader = PdfReader(BytesIO(output.getvalue()))
+        assert pages == len(reader.pages) >= 3
+        texts = [page.extract_text() for page in reader.pages]
+        for text in texts[:-1]:
+            assert text.count("Cheque No") == 1
+        assert "Grand total" in texts[-1]
+        assert "1,149.00" in "".join(texts)
+        assert "1,61,175.00" in texts[-1]
+
+    def test_story_is_consumed_lazily(self):
+        produced = []
+
+        def flowables():
+            for i in range(10):
+                produced.append(i)
+                yield i
+
+        story = statement_pdf._LazyStory(flowables())
+        assert story[0] == 0 and len(produced) == 2
+        del story[0]
+        assert len(story) == 2 and len(produced) == 3
+
+
+class TestStatementRoute:
+    def test_download(self, client, auth_headers, db_session, user, remitter, beneficiary):
+        add_transactions(db_session, user, beneficiary, [12345.67])
+        other = User(email="other@example.com", name="Other", password_hash="x")
+        db_session.add(other)
+        db_session.commit()
+        add_transactions(db_session, other, beneficiary, [777])
+
+        response = client.get("/api/pdf/statement", params={"year": 2025, "month": 9}, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/pdf"
+        assert "RTGS_statement_20250901_20250930.pdf" in response.headers["content-disposition"]
+        text = pdf_text(response.content)
+        assert "JAY JALARAM ELECTRICALS" in text
+        assert "12,345.67" in text
+        assert "777.00" not in text
+
+    def test_empty_period(self, client, auth_headers):
+        response = client.get(
+            "/api/pdf/statement",
+            params={"start_date": "2025-01-01", "end_date": "2025-01-31"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        assert "No transactions in this period." in pdf_text(response.content)
+
+    def test_invalid_period_is_400(self, client, auth_headers):
+        response = client.get("/api/pdf/statement", params={"start_date": "2025-01-01"}, headers=auth_headers)
+        assert response.status_code == 400
@@ -0,0 +1,314 @@
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import func, text
+
+from app.models import Beneficiary, Transaction, User
+from app.schemas.transaction_schema import MAX_TRANSACTION_AMOUNT, TransactionUpdate
+from app.services.transaction_service import period_criteria, period_range, transaction_order
+
+
+def add_amounts(db_session, user, beneficiary, amounts):
+    db_session.add_all([
+        Transaction(user_id=user.id, beneficiary_id=beneficiary.id, amount=amount,
+                    amount_in_words="-", transaction_date=datetime(2025, 9, 1))
+        for amount in amounts
+    ])
+    db_session.commit()
+
+
+class TestMoneyStorage:
+    def test_amount_is_stored_as_integer_paise(self, db_session, transaction):
+        assert transaction.amount_paise == 1234567
+        assert transaction.amount == Decimal("12345.67")
+
+        transaction.amount = Decimal("0.29")
+        assert transaction.amount_paise == 29
+
+    def test_sums_are_exact(self, db_session, user, beneficiary):
+        add_amounts(db_session, user, beneficiary, [0.1] * 10 + [0.2] * 5)
+        assert db_session.query(func.sum(Transaction.amount_paise)).scalar() == 200
+
+
+class TestTransactionRoutes:
+    def test_create_returns_exact_decimal(self, client, auth_headers, beneficiary):
+        response = client.post(
+            "/api/transactions/",
+            json={"beneficiary_id": beneficiary.id, "amount": "1234.50", "transaction_date": "2025-09-24T00:00:00"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 201
+        assert response.json()["amount"] == "1234.50"
+        assert response.json()["amount_in_words"] == "One Thousand Two Hundred Thirty Four Rupees and Fifty Paise Only"
+
+    def test_more_than_two_decimals_is_rejected(self, client, auth_headers, beneficiary):
+        response = client.post(
+            "/api/transactions/",
+            json={"beneficiary_id": beneficiary.id, "amount": 10.005, "transaction_date": "2025-09-24T00:00:00"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 422
+
+    def test_amount_bounds_are_enforced(self, client, auth_headers, beneficiary):
+        for amount in ("0", "-5", "100000000.00"):
+            response = client.post(
+                "/api/transactions/",
+                json={"beneficiary_id": beneficiary.id, "amount": amount, "transaction_date": "2025-09-24T00:00:00"},
+                headers=auth_headers,
+            )
+            assert response.status_code == 422, amount
+        assert TransactionUpdate(amount=None).amount is None
+        assert TransactionUpdate(amount="99999999.99").amount == MAX_TRANSACTION_AMOUNT
+
+    def test_get_and_list_include_amount(self, client, auth_headers, transaction):
+        assert client.get(f"/api/transactions/{transaction.id}", headers=auth_headers).json()["amount"] == "12345.67"
+        listed = client.get("/api/transactions/", headers=auth_headers).json()["transactions"]
+        assert [item["amount"] for item in listed] == ["12345.67"]
+
+    def test_dashboard_total_is_exact(self, client, auth_headers, db_session, user, beneficiary):
+        add_amounts(db_session, user, beneficiary, [0.1] * 10 + [99999999.99])
+        stats = client.get("/api/transactions/stats/dashboard", headers=auth_headers).json()
+        assert stats["total_amount"] == "100000000.99"
+        assert stats["total_transactions"] == 11
+
+
+class TestTransactionQueries:
+    def test_list_query_count_does_not_grow_with_page_size(self, client, auth_headers, db_session, user, beneficiary,
+                                                           query_counter):
+        add_amounts(db_session, user, beneficiary, [100 + i for i in range(30)])
+        counts = []
+        for limit in (1, 30):
+            query_counter.clear()
+            response = client.get("/api/transactions/", params={"limit": limit}, headers=auth_headers)
+            assert response.status_code == 200
+            assert len(response.json()["transactions"]) == limit
+            counts.append(len(query_counter))
+        # The user, then the page with its beneficiaries and the total
+        assert counts == [2, 2]
+
+    def test_list_rows_carry_beneficiary_summary(self, client, auth_headers, transaction, beneficiary):
+        body = client.get("/api/transactions/", headers=auth_headers).json()
+        assert body["total"] == 1
+        item = body["transactions"][0]
+        assert item["beneficiary"] == {"id": beneficiary.id, "name": "John Doe", "bank_name": "State Bank of India"}
+        assert item["cheque_number"] == "000123" and "_sa_instance_state" not in item
+
+    def test_detail_is_one_query(self, client, auth_headers, transaction, beneficiary, query_counter):
+        query_counter.clear()
+        response = client.get(f"/api/transactions/{transaction.id}", headers=auth_headers)
+        assert len(query_counter) == 2
+        assert response.json()["beneficiary"] == {
+            "id": beneficiary.id,
+            "name": "John Doe",
+            "bank_name": "State Bank of India",
+            "account_number": "1234567890",
+            "ifsc_code": "SBIN0001234",
+        }
+
+    def test_detail_of_another_users_transaction_is_404(self, client, auth_headers, db_session, beneficiary):
+        other = User(email="other@example.com", name="Other", password_hash="x")
+        db_session.add(other)
+        db_session.commit()
+        add_amounts(db_session, other, beneficiary, [5])
+        transaction_id = db_session.query(Transaction.id).filter(Transaction.user_id == other.id).scalar()
+        assert client.get(f"/api/transactions/{transaction_id}", headers=auth_headers).status_code == 404
+
+
+class TestPeriodFilters:
+    def test_period_range_is_half_open(self):
+        assert period_range(2024, 12) == (datetime(2024, 12, 1), datetime(2025, 1, 1))
+        assert period_range(2024) == (datetime(2024, 1, 1), datetime(2025, 1, 1))
+
+    def test_month_filter_uses_the_user_date_index(self, db_session, user):
+        query = db_session.query(Transaction.id).filter(
+            Transaction.user_id == user.id, *period_criteria(9, 2025)
+        )
+        sql = str(query.statement.compile(dialect=db_session.bind.dialect, compile_kwargs={"literal_binds": True}))
+        plan = " ".join(str(row[-1]) for row in db_session.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+        assert "ix_transactions_user_date (user_id=? AND transaction_date>? AND transaction_date<?)" in plan
+
+    def test_month_boundaries(self, client, auth_headers, db_session, user, beneficiary):
+        db_session.add_all([
+            Transaction(user_id=user.id, beneficiary_id=beneficiary.id, amount=amount,
+                        amount_in_words="-", transaction_date=when)
+            for amount, when in [
+                (1, datetime(2025, 8, 31, 23, 59, 59)),
+                (2, datetime(2025, 9, 1)),
+                (3, datetime(2025, 9, 30, 23, 59, 59)),
+                (4, datetime(2025, 10, 1)),
+            ]
+        ])
+        db_session.commit()
+
+        def amounts(**params):
+            body = client.get("/api/transactions/", params=params, headers=auth_headers).json()
+            return sorted(item["amount"] for item in body["transactions"])
+
+        assert amounts(year=2025, month=9) == ["2.00", "3.00"]
+        assert amounts(month=9) == ["2.00", "3.00"]
+        assert len(amounts(year=2025)) == 4
+
+
+class TestCursorPagination:
+    def list_page(self, client, auth_headers, **params):
+        response = client.get("/api/transactions/", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        return response.json()
+
+    def test_cursor_walks_every_row_once(self, client, auth_headers, db_session, user, beneficiary):
+        db_session.add_all([
+            Transaction(user_id=user.id, beneficiary_id=beneficiary.id, amount=i + 1, amount_in_words="-",
+                        transaction_date=datetime(2025, 9, 1 + i // 3))
+            for i in range(10)
+        ])
+        db_session.commit()
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 4, "include_total": "false"}
+            if cursor:
+                params["cursor"] = cursor
+            body = self.list_page(client, auth_headers, **params)
+            assert body["total"] is None
+            seen += [item["id"] for item in body["transactions"]]
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+
+        expected = [row.id for row in db_session.query(Transaction.id).order_by(
+            Transaction.transaction_date.desc(), Transaction.id.desc())]
+        assert seen == expected
+
+    def test_inserts_do_not_shift_cursor_pages(self, client, auth_headers, db_session, user, beneficiary):
+        add_amounts(db_session, user, beneficiary, [1, 2, 3, 4])
+        first = self.list_page(client, auth_headers, limit=2)
+        assert (first["total"], first["page"], first["pages"]) == (4, 1, 2)
+
+        add_amounts(db_session, user, beneficiary, [5])
+        second = self.list_page(client, auth_headers, limit=2, cursor=first["next_cursor"])
+        assert [item["amount"] for item in second["transactions"]] == ["2.00", "1.00"]
+        assert second["total"] == 5 and second["page"] is None
+
+    def test_skip_still_works(self, client, auth_headers, db_session, user, beneficiary):
+        add_amounts(db_session, user, beneficiary, [1, 2, 3])
+        body = self.list_page(client, auth_headers, limit=2, skip=2)
+        assert [item["amount"] for item in body["transactions"]] == ["1.00"]
+        assert (body["total"], body["page"], body["next_cursor"]) == (3, 2, None)
+        assert self.list_page(client, auth_headers, skip=10)["total"] == 3
+
+    def test_invalid_cursor_is_400(self, client, auth_headers):
+        for cursor in ("not-a-cursor", "WzFd", "WyJ4IiwxXQ"):
+            response = client.get("/api/transactions/", params={"cursor": cursor}, headers=auth_headers)
+            assert response.status_code == 400
+
+
+class TestFilterAndSort:
+    @staticmethod
+    def add_history(db_session, user, beneficiary):
+        other = Beneficiary(user_id=user.id, name="Aarav Traders", account_number="9876543210", bank_name="HDFC",
+                            branch_name="Main", ifsc_code="HDFC0001234")
+        db_session.add(other)
+        db_session.flush()
+        db_session.add_all([
+            Transaction(user_id=user.id, beneficiary_id=payee.id, amount=amount, amount_in_words="-",
+                        transaction_date=datetime(2025, 9, day))
+            for payee, amount, day in [
+                (beneficiary, Decimal("500.00"), 1),
+                (other, Decimal("1500.50"), 2),
+                (beneficiary, Decimal("250.25"), 3),
+                (other, Decimal("9000.00"), 4),
+                (beneficiary, Decimal("1500.50"), 5),
+            ]
+        ])
+        db_session.commit()
+        return other
+
+    @staticmethod
+    def listing(client, auth_headers, **params):
+        response = client.get("/api/transactions/", params=params, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    def test_all_filter_fields_apply_with_totals(self, client, auth_headers, db_session, user, beneficiary):
+        other = self.add_history(db_session, user, beneficiary)
+
+        body = self.listing(client, auth_headers, min_amount="500", max_amount="1500.50", limit=1)
+        assert (body["total"], body["total_amount"]) == (3, "3501.00")
+        assert len(body["transactions"]) == 1
+
+        body = self.listing(client, auth_headers, start_date="2025-09-02T00:00:00",
+                            end_date="2025-09-04T23:59:59", beneficiary_id=other.id)
+        assert [item["amount"] for item in body["transactions"]] == ["9000.00", "1500.50"]
+        assert body["total_amount"] == "10500.50"
+
+    def test_totals_on_cursor_and_empty_pages(self, client, auth_headers, db_session, user, beneficiary):
+        self.add_history(db_session, user, beneficiary)
+        first = self.listing(client, auth_headers, limit=2)
+        second = self.listing(client, auth_headers, limit=2, cursor=first["next_cursor"])
+        assert second["total"] == first["total"] == 5
+        assert second["total_amount"] == first["total_amount"] == "12751.25"
+
+        empty = self.listing(client, auth_headers, min_amount="100000")
+        assert (empty["total"], empty["total_amount"]) == (0, "0.00")
+        assert self.listing(client, auth_headers, include_total="false")["total_amount"] is None
+
+    def test_sort_by_amount_pages_with_cursor(self, client, auth_headers, db_session, user, beneficiary):
+        self.add_history(db_session, user, beneficiary)
+        amounts, cursor = [], None
+        while True:
+            params = {"sort": "amount", "order": "asc", "limit": 2, **({"cursor": cursor} if cursor else {})}
+            body = self.listing(client, auth_headers, **params)
+            amounts += [item["amount"] for item in body["transactions"]]
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+        assert amounts == ["250.25", "500.00", "1500.50", "1500.50", "9000.00"]
+
+    def test_sort_by_beneficiary_name(self, client, auth_headers, db_session, user, beneficiary):
+        self.add_history(db_session, user, beneficiary)
+        first = self.listing(client, auth_headers, sort="beneficiary", order="asc", limit=3)
+        rest = self.listing(client, auth_headers, sort="beneficiary", order="asc", limit=3, cursor=first["next_cursor"])
+        names = [item["beneficiary"]["name"] for item in first["transactions"] + rest["transactions"]]
+        assert names == sorted(names) and len(names) == 5
+        assert names[0] == "Aarav Traders"
+
+    def test_beneficiary_sort_pages_past_missing_beneficiaries(self, client, auth_headers, db_session, user, beneficiary):
+        self.add_history(db_session, user, beneficiary)
+        db_session.add_all([
+            Transaction(user_id=user.id, beneficiary_id=999, amount=Decimal("75.00"), amount_in_words="-",
+                        transaction_date=datetime(2025, 9, day))
+            for day in (6, 7)
+        ])
+        db_session.commit()
+        for order in ("asc", "desc"):
+            names, cursor = [], None
+            while True:
+                params = {"sort": "beneficiary", "order": order, "limit": 1, **({"cursor": cursor} if cursor else {})}
+                body = self.listing(client, auth_headers, **params)
+                names += [(item["beneficiary"] or {}).get("name", "") for item in body["transactions"]]
+                cursor = body["next_cursor"]
+                if cursor is None:
+                    break
+            assert names == sorted(names, reverse=order == "desc") and len(names) == 7
+
+    def test_invalid_ranges_and_mismatched_cursors_are_400(self, client, auth_headers, db_session, user, beneficiary):
+        self.add_history(db_session, user, beneficiary)
+        cursor = self.listing(client, auth_headers, limit=1)["next_cursor"]
+        for params in (
+            {"start_date": "2025-09-05T00:00:00", "end_date": "2025-09-01T00:00:00"},
+            {"min_amount": "10", "max_amount": "5"},
+            {"cursor": cursor, "sort": "amount"},
+            {"cursor": cursor, "order": "asc"},
+        ):
+            response = client.get("/api/transactions/", params=params, headers=auth_headers)
+            assert response.status_code == 400, params
+        assert client.get("/api/transactions/", params={"sort": "remarks"}, headers=auth_headers).status_code == 422
+
+    def test_amount_sort_uses_the_user_amount_index(self, db_session, user):
+        query = db_session.query(Transaction.id).filter(Transaction.user_id == user.id).order_by(
+            *transaction_order("amount", "desc")
+        )
+        sql = str(query.statement.compile(dialect=db_session.bind.dialect, compile_kwargs={"literal_binds": True}))
+        plan = " ".join(str(row[-1]) for row in db_session.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+        assert "ix_transactions_user_amount (user_id=?)" in plan
+        assert "TEMP B-TREE" not in plan
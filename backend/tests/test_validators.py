@@ -0,0 +1,90 @@
+import random
+import re
+import string
+
+from app.utils import validators
+from app.utils.validators import FIELD_VALIDATORS, validate_columns, validate_rows
+
+# The per-call pattern strings the validators used before they were precompiled
+LEGACY_PATTERNS = {
+    "ifsc_code": (r'^[A-Z]{4}0[A-Z0-9]{6}$', str.upper, 11),
+    "mobile": (r'^[6-9]\d{9}$', str, None),
+    "pan_number": (r'^[A-Z]{5}[0-9]{4}[A-Z]{1}$', str.upper, 10),
+    "email": (r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', str, None),
+}
+
+
+def legacy_verdict(field, value):
+    if field == "account_number":
+        cleaned = value.replace(' ', '') if value else ''
+        return bool(value) and cleaned.isdigit() and 9 <= len(cleaned) <= 18
+    if field == "cheque_number":
+        return not value or (value.isdigit() and 6 <= len(value) <= 8)
+    pattern, transform, length = LEGACY_PATTERNS[field]
+    if not value or (length and len(value) != length):
+        return False
+    return bool(re.match(pattern, transform(value)))
+
+
+SAMPLES = {
+    "ifsc_code": ["SBIN0001234", "sbin0001234", "SBIN1001234", "SBIN000123", "SBIN00012345", "SBIN000123$"],
+    "account_number": ["1234567890", "1234 5678 90", "12345678", "1234567890123456789", "12345abc90"],
+    "mobile": ["9876543210", "5876543210", "987654321", "9876543210\n", "98765432100"],
+    "pan_number": ["ABCDE1234F", "abcde1234f", "ABCD1234EF", "ABCDE1234"],
+    "email": ["a.b@example.com", "a@b", "a b@example.com", "user+tag@mail.co.in"],
+    "cheque_number": ["", "000123", "12345", "123456789", "12a456"],
+}
+
+
+def random_value(rng, field):
+    alphabet = string.ascii_letters + string.digits + " .@+-\n"
+    value = list(rng.choice(SAMPLES[field]) or "0")
+    for _ in range(rng.randint(0, 2)):
+        value[rng.randrange(len(value))] = rng.choice(alphabet)
+    return "".join(value)
+
+
+class TestSingleValueVerdicts:
+    def test_match_the_legacy_validators(self):
+        rng = random.Random(20)
+        for field, (validator, _) in FIELD_VALIDATORS.items():
+            for value in SAMPLES[field] + [random_value(rng, field) for _ in range(2000)]:
+                assert validator(value) == legacy_verdict(field, value), (field, value)
+
+    def test_clean_account_number(self):
+        assert validators.clean_account_number("12-34 56") == "123456"
+
+
+class TestBatchValidation:
+    def test_columns_match_single_value_verdicts(self):
+        rng = random.Random(21)
+        columns = {field: [random_value(rng, field) for _ in range(500)] for field in FIELD_VALIDATORS}
+        report = validate_columns(columns, required=FIELD_VALIDATORS)
+        for field, values in columns.items():
+            validator, message = FIELD_VALIDATORS[field]
+            for index, value in enumerate(values):
+                expected = None if validator(value) and (value or field == "cheque_number") else message
+                assert report.get(index, {}).get(field) == expected, (field, value)
+
+    def test_every_error_is_reported(self):
+        report = validate_columns(
+            {"ifsc_code": ["SBIN0001234", "BAD", ""], "mobile": ["123", "", "9876543210"]},
+            required=["ifsc_code"],
+        )
+        assert report == {
+            0: {"mobile": "Invalid mobile number"},
+            1: {"ifsc_code": "Invalid IFSC code format"},
+            2: {"ifsc_code": "Invalid IFSC code format"},
+        }
+
+    def test_rows_are_validated_as_they_are_read(self):
+        consumed = []
+
+        def rows():
+            for row in [{"ifsc_code": "SBIN0001234", "name": "x"}, {"ifsc_code": "BAD"}]:
+                consumed.append(row)
+                yield row
+
+        results = validate_rows(rows(), required=["ifsc_code"])
+        assert next(results) == {} and len(consumed) == 1
+        assert next(results) == {"ifsc_code": "Invalid IFSC code format"}
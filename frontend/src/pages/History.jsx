@@ -7,6 +7,8 @@ import { authService } from '../services/authService'
 
 const History = () => {
   const [transactions, setTransactions] = useState([])
+  const [total, setTotal] = useState(0)
+  const [totalAmount, setTotalAmount] = useState(0)
   const [beneficiaries, setBeneficiaries] = useState([])
   const [loading, setLoading] = useState(true)
   const [showDeleteModal, setShowDeleteModal] = useState(false)
@@ -18,22 +20,41 @@ const History = () => {
   const [beneficiarySearch, setBeneficiarySearch] = useState('')
   const [showBeneficiaryDropdown, setShowBeneficiaryDropdown] = useState(false)
   const dropdownRef = useRef(null)
+  const latestRequest = useRef(0)
+  const [searchText, setSearchText] = useState('')
   const [filters, setFilters] = useState({
     month: '',
     year: new Date().getFullYear(),
-    beneficiary_id: ''
+    beneficiary_id: '',
+    q: '',
+    min_amount: '',
+    max_amount: '',
+    sort: 'date',
+    order: 'desc'
   })
   const itemsPerPage = 10
 
   useEffect(() => {
-    fetchTransactions()
     fetchBeneficiaries()
-  }, [filters])
+  }, [])
 
-  // Reset to first page when filters change
+  // The server filters, sorts and pages; only the visible page is fetched
   useEffect(() => {
+    fetchTransactions()
+  }, [filters, currentPage])
+
+  // Changing a filter starts again from the first page
+  const updateFilters = (changes) => {
+    setFilters(current => ({...current, ...changes}))
     setCurrentPage(1)
-  }, [filters])
+  }
+
+  // Search 300ms after the last keystroke
+  useEffect(() => {
+    if (searchText === filters.q) return
+    const timer = setTimeout(() => updateFilters({q: searchText}), 300)
+    return () => clearTimeout(timer)
+  }, [searchText])
 
   // Handle click outside dropdown
   useEffect(() => {
@@ -62,12 +83,23 @@ const History = () => {
   }, [filters.beneficiary_id, beneficiaries])
 
   const fetchTransactions = async () => {
+    // Only the newest request may update the list; earlier ones can answer later
+    const requestId = ++latestRequest.current
     try {
       const params = Object.fromEntries(
         Object.entries(filters).filter(([_, value]) => value !== '')
       )
+      if (params.q && params.sort === 'date' && params.order === 'desc') {
+        // Best matches first while searching, unless another order was chosen
+        delete params.sort
+      }
+      params.skip = (currentPage - 1) * itemsPerPage
+      params.limit = itemsPerPage
       const response = await transactionAPI.getAll(params)
+      if (requestId !== latestRequest.current) return
       setTransactions(response.data.transactions || [])
+      setTotal(response.data.total || 0)
+      setTotalAmount(response.data.total_amount || 0)
     } catch (error) {
       console.error('Failed to fetch transactions:', error)
     } finally {
@@ -99,6 +131,24 @@ const History = () => {
     }
   }
 
+  const handleStatementDownload = async () => {
+    try {
+      const period = { year: filters.year }
+      if (filters.month) period.month = filters.month
+      const response = await pdfAPI.statement(period)
+      const url = window.URL.createObjectURL(new Blob([response.data]))
+      const link = document.createElement('a')
+      link.href = url
+      link.setAttribute('download', `rtgs_statement_${filters.year}${filters.month ? `_${filters.month}` : ''}.pdf`)
+      document.body.appendChild(link)
+      link.click()
+      link.remove()
+    } catch (error) {
+      console.error('Failed to download statement:', error)
+      toast.error('Failed to download statement')
+    }
+  }
+
   const handleDeleteClick = (transaction) => {
     setSelectedTransaction(transaction)
     setShowDeleteModal(true)
@@ -210,10 +260,10 @@ const History = () => {
   }
 
   // Pagination calculations
-  const totalPages = Math.ceil(transactions.length / itemsPerPage)
+  const totalPages = Math.ceil(total / itemsPerPage)
   const startIndex = (currentPage - 1) * itemsPerPage
-  const endIndex = startIndex + itemsPerPage
-  const currentTransactions = transactions.slice(startIndex, endIndex)
+  const endIndex = startIndex + transactions.length
+  const currentTransactions = transactions
 
   const goToPage = (page) => {
     if (page >= 1 && page <= totalPages) {
@@ -246,14 +296,14 @@ const History = () => {
 
   // Handle beneficiary selection
   const handleBeneficiarySelect = (beneficiaryId, beneficiaryName) => {
-    setFilters({...filters, beneficiary_id: beneficiaryId})
+    updateFilters({beneficiary_id: beneficiaryId})
     setBeneficiarySearch(beneficiaryName)
     setShowBeneficiaryDropdown(false)
   }
 
   // Clear beneficiary filter
   const clearBeneficiaryFilter = () => {
-    setFilters({...filters, beneficiary_id: ''})
+    updateFilters({beneficiary_id: ''})
     setBeneficiarySearch('')
     setShowBeneficiaryDropdown(false)
   }
@@ -273,24 +323,48 @@ const History = () => {
         <div>
           <h1 className="text-2xl font-bold text-gray-900">Transaction History</h1>
           <p className="mt-1 text-sm text-gray-600">
-            View and manage your RTGS transaction history ({transactions.length} total transactions)
+            View and manage your RTGS transaction history ({total} total transactions)
           </p>
         </div>
       </div>
 
       {/* Filters */}
       <div className="bg-white p-6 rounded-xl shadow-sm border border-gray-200">
-        <h3 className="text-md font-medium text-gray-900 mb-4 flex items-center">
-          <Filter className="h-5 w-5 mr-2 text-blue-600" />
-          Filter Transactions
-        </h3>
+        <div className="flex items-center justify-between mb-4">
+          <h3 className="text-md font-medium text-gray-900 flex items-center">
+            <Filter className="h-5 w-5 mr-2 text-blue-600" />
+            Filter Transactions
+          </h3>
+          <button
+            type="button"
+            onClick={handleStatementDownload}
+            className="inline-flex items-center px-3 py-2 text-sm font-medium text-blue-600 border border-blue-200 rounded-lg hover:bg-blue-50 transition-colors duration-200"
+            title="Statement of all transactions in the selected year or month"
+          >
+            <Download className="h-4 w-4 mr-2" />
+            Download Statement
+          </button>
+        </div>
         
+        <div className="relative mb-4">
+          <input
+            type="search"
+            value={searchText}
+            onChange={(e) => setSearchText(e.target.value)}
+            className="w-full px-4 py-2.5 pl-10 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500 transition-colors duration-200"
+            placeholder="Search by beneficiary, purpose or remarks..."
+          />
+          <div className="absolute inset-y-0 left-0 pl-3 flex items-center pointer-events-none">
+            <Search className="h-5 w-5 text-gray-400" />
+          </div>
+        </div>
+
         <div className="grid grid-cols-1 gap-4 sm:grid-cols-3">
           <div>
             <label className="block text-sm font-medium text-gray-700 mb-2">Year</label>
             <select
               value={filters.year}
-              onChange={(e) => setFilters({...filters, year: e.target.value})}
+              onChange={(e) => updateFilters({year: e.target.value})}
               className="w-full px-4 py-2.5 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500 transition-colors duration-200"
             >
               {Array.from({length: 5}, (_, i) => new Date().getFullYear() - i).map(year => (
@@ -303,7 +377,7 @@ const History = () => {
             <label className="block text-sm font-medium text-gray-700 mb-2">Month</label>
             <select
               value={filters.month}
-              onChange={(e) => setFilters({...filters, month: e.target.value})}
+              onChange={(e) => updateFilters({month: e.target.value})}
               className="w-full px-4 py-2.5 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500 transition-colors duration-200"
             >
               <option value="">All Months</option>
@@ -326,7 +400,7 @@ const History = () => {
                     setBeneficiarySearch(e.target.value)
                     setShowBeneficiaryDropdown(true)
                     if (e.target.value === '') {
-                      setFilters({...filters, beneficiary_id: ''})
+                      updateFilters({beneficiary_id: ''})
                     }
                   }}
                   onFocus={() => setShowBeneficiaryDropdown(true)}
@@ -397,9 +471,57 @@ const History = () => {
           </div>
         </div>
         
+        <div className="grid grid-cols-1 gap-4 mt-4 sm:grid-cols-3">
+          <div>
+            <label className="block text-sm font-medium text-gray-700 mb-2">Min Amount</label>
+            <input
+              type="number"
+              min="0"
+              step="0.01"
+              value={filters.min_amount}
+              onChange={(e) => updateFilters({min_amount: e.target.value})}
+              className="w-full px-4 py-2.5 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500 transition-colors duration-200"
+              placeholder="Any"
+            />
+          </div>
+
+          <div>
+            <label className="block text-sm font-medium text-gray-700 mb-2">Max Amount</label>
+            <input
+              type="number"
+              min="0"
+              step="0.01"
+              value={filters.max_amount}
+              onChange={(e) => updateFilters({max_amount: e.target.value})}
+              className="w-full px-4 py-2.5 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500 transition-colors duration-200"
+              placeholder="Any"
+            />
+          </div>
+
+          <div>
+            <label className="block text-sm font-medium text-gray-700 mb-2">Sort By</label>
+            <select
+              value={`${filters.sort}:${filters.order}`}
+              onChange={(e) => {
+                const [sort, order] = e.target.value.split(':')
+                updateFilters({sort, order})
+              }}
+              className="w-full px-4 py-2.5 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500 transition-colors duration-200"
+            >
+              <option value="date:desc">Newest first</option>
+              <option value="date:asc">Oldest first</option>
+              <option value="amount:desc">Amount: high to low</option>
+              <option value="amount:asc">Amount: low to high</option>
+              <option value="beneficiary:asc">Beneficiary: A to Z</option>
+              <option value="beneficiary:desc">Beneficiary: Z to A</option>
+            </select>
+          </div>
+        </div>
+
         {/* Results Summary */}
         <div className="mt-4 text-sm text-gray-600">
-          Showing {currentTransactions.length > 0 ? startIndex + 1 : 0} to {Math.min(endIndex, transactions.length)} of {transactions.length} transactions
+          Showing {currentTransactions.length > 0 ? startIndex + 1 : 0} to {endIndex} of {total} transactions
+          {total > 0 && <> totalling <span className="font-semibold text-gray-900">{formatCurrency(totalAmount)}</span></>}
         </div>
       </div>
 
@@ -606,8 +728,8 @@ const History = () => {
             <div className="bg-white px-6 py-4 border-t border-gray-200">
               <div className="flex items-center justify-between">
                 <div className="flex items-center text-sm text-gray-700">
-                  Showing {startIndex + 1} to {Math.min(endIndex, transactions.length)} of{' '}
-                  {transactions.length} transactions
+                  Showing {startIndex + 1} to {endIndex} of{' '}
+                  {total} transactions
                 </div>
                 <div className="flex items-center space-x-2">
                   <button
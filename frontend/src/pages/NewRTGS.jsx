@@ -14,9 +14,11 @@ const NewRTGS = () => {
   const [searchTerm, setSearchTerm] = useState('')
   const [selectedBeneficiary, setSelectedBeneficiary] = useState(null)
   const [showDropdown, setShowDropdown] = useState(false)
+  const [preview, setPreview] = useState(null)
   const dropdownRef = useRef(null)
 
-  const { register, handleSubmit, formState: { errors }, reset, setValue } = useForm()
+  const { register, handleSubmit, formState: { errors }, reset, setValue, watch } = useForm()
+  const [previewBeneficiaryId, previewAmount, previewChequeNumber] = watch(['beneficiary_id', 'amount', 'cheque_number'])
 
   useEffect(() => {
     fetchBeneficiaries()
@@ -36,6 +38,28 @@ const NewRTGS = () => {
     }
   }, [])
 
+  // Preview what will be printed, 300ms after the last change
+  useEffect(() => {
+    if (!previewBeneficiaryId && !previewAmount) {
+      setPreview(null)
+      return
+    }
+    const amount = parseFloat(previewAmount)
+    const timer = setTimeout(async () => {
+      try {
+        const response = await pdfAPI.preview({
+          beneficiary_id: previewBeneficiaryId ? Number(previewBeneficiaryId) : null,
+          amount: amount > 0 && amount <= 99999999.99 ? amount : null,
+          cheque_number: previewChequeNumber || null,
+        })
+        setPreview(response.data)
+      } catch (error) {
+        console.error('Failed to load form preview:', error)
+      }
+    }, 300)
+    return () => clearTimeout(timer)
+  }, [previewBeneficiaryId, previewAmount, previewChequeNumber])
+
   const fetchBeneficiaries = async () => {
     try {
       const response = await beneficiaryAPI.getAll()
@@ -405,6 +429,24 @@ const NewRTGS = () => {
           </div>
         </div>
 
+        {/* Form Preview */}
+        {preview && (
+          <div className="bg-white p-4 rounded-lg shadow-sm border border-gray-200">
+            <h3 className="text-base font-semibold text-gray-900 mb-3 flex items-center">
+              <div className="w-1 h-5 bg-blue-600 rounded-full mr-2"></div>
+              Form Preview
+            </h3>
+            <dl className="grid grid-cols-1 sm:grid-cols-3 gap-x-4 gap-y-1 text-xs">
+              {preview.fields.map(field => (
+                <div key={field.field} className="contents">
+                  <dt className="text-gray-500">{field.label}</dt>
+                  <dd className="sm:col-span-2 font-medium text-gray-900 break-words">{field.value || '—'}</dd>
+                </div>
+              ))}
+            </dl>
+          </div>
+        )}
+
         {/* Action Buttons */}
         <div className="flex justify-end space-x-3 pt-2">
           <button
@@ -84,6 +84,25 @@ export const pdfAPI = {
       responseType: 'blob',
     })
   },
+  bulk: (selection) => {
+    return api.post('/pdf/bulk', selection, {
+      responseType: 'blob',
+    })
+  },
+  preview: (formData) => api.post('/pdf/preview', formData),
+  statement: (period) => {
+    return api.get('/pdf/statement', {
+      params: period,
+      responseType: 'blob',
+    })
+  },
+  createJob: (selection) => api.post('/pdf/jobs', selection),
+  getJob: (jobId) => api.get(`/pdf/jobs/${jobId}`),
+  downloadJob: (jobId) => {
+    return api.get(`/pdf/jobs/${jobId}/download`, {
+      responseType: 'blob',
+    })
+  },
 }
 
 export default api